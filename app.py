@@ -1,14 +1,30 @@
+import json
 import os
+import re
 import time
-from flask import Flask, render_template_string, request, send_from_directory, jsonify
-from checker import check_robots, check_ucp_config, check_homepage
-from scorer import calculate_score
-from reporter import generate_report, generate_pdf
+import uuid
+from contextlib import nullcontext
+from functools import lru_cache
+from flask import Flask, Response, render_template_string, request, jsonify, redirect
+from checker import probe_site
+from scorer import score_probes
+from reporter import generate_report, render_pdf, report_view
+from report_shell import report_shell
+from artifacts import send_artifact, write_variants, negotiate, cache_forever
+from config import SCANNER_CONFIG
 from utils import normalize_url
-from logger import logger
+from logger import logger, scan_id_var
+from cancellation import ScanCancelled, ScanIdInUse, disconnect_watcher, cancel_scan
+from cancellation import register as register_scan, unregister as unregister_scan
+import metrics
+import scheduler
+from dnscache import dns_cache
+from profiling import ScanProfiler, requested_mode
+from warmup import readiness, start_warmup
 
 app = Flask(__name__)
 OUTPUT_DIR = "output"
+SCAN_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # HTML Template for the Web UI
@@ -96,6 +112,20 @@ INDEX_HTML = """
         const reportFrame = document.getElementById('reportFrame');
         const downloadLink = document.getElementById('downloadLink');
 
+        // Ensure we use the correct base path for subpath deployment support
+        const currentPath = window.location.pathname;
+        const basePath = currentPath.endsWith('/') ? currentPath : currentPath + '/';
+
+        let activeScanId = null;
+        const newScanId = () => (crypto.randomUUID ? crypto.randomUUID() : String(Date.now()) + Math.random().toString(16).slice(2));
+
+        // Leaving the page cancels the running scan so the server stops probing and rendering
+        window.addEventListener('pagehide', () => {
+            if (activeScanId) {
+                navigator.sendBeacon(`${basePath}scan/${activeScanId}/cancel`);
+            }
+        });
+
         form.addEventListener('submit', async (e) => {
             e.preventDefault();
             
@@ -107,16 +137,13 @@ INDEX_HTML = """
             submitBtn.querySelector('span').textContent = "Scanning...";
             
             const url = document.getElementById('url').value;
+            activeScanId = newScanId();
             
             try {
-                // Ensure we use the correct base path for subpath deployment support
-                const currentPath = window.location.pathname;
-                const basePath = currentPath.endsWith('/') ? currentPath : currentPath + '/';
-
                 const response = await fetch(basePath + 'scan', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ url })
+                    body: JSON.stringify({ url, scan_id: activeScanId, priority: 'interactive' })
                 });
                 
                 const data = await response.json();
@@ -127,13 +154,14 @@ INDEX_HTML = """
                 
                 // Success - use relative paths
                 resultsArea.classList.remove('hidden');
-                reportFrame.src = `${basePath}view/${data.html_file}`;
+                reportFrame.src = `${basePath}${data.report_url}`;
                 downloadLink.href = `${basePath}download/${data.pdf_file}`;
                 
             } catch (err) {
                 errorDiv.textContent = err.message;
                 errorDiv.classList.remove('hidden');
             } finally {
+                activeScanId = null;
                 loading.classList.add('hidden');
                 submitBtn.disabled = false;
                 submitBtn.querySelector('span').textContent = "Run Compliance Scan";
@@ -144,9 +172,25 @@ INDEX_HTML = """
 </html>
 """
 
+@lru_cache(maxsize=1)
+def index_page() -> str:
+    # The page takes no template variables, so it is rendered once per process
+    return render_template_string(INDEX_HTML)
+
 @app.route('/')
 def home():
-    return render_template_string(INDEX_HTML)
+    response = Response(index_page(), mimetype='text/html')
+    cfg = SCANNER_CONFIG['scheduler']
+    # Sent back with the page's /scan calls so they may run as interactive.
+    # Browsers only send it from an iframe on another site as SameSite=None,
+    # which in turn requires Secure.
+    cross_site = cfg['uiCookieCrossSite']
+    response.set_cookie(
+        scheduler.UI_TOKEN_COOKIE, scheduler.issue_ui_token(),
+        max_age=cfg['uiTokenTtlSeconds'], httponly=True,
+        samesite='None' if cross_site else 'Strict', secure=cross_site or request.is_secure
+    )
+    return response
 
 @app.route('/scan', methods=['POST'])
 def scan():
@@ -155,60 +199,177 @@ def scan():
     
     if not target_url:
         return jsonify({'error': 'URL is required'}), 400
-        
+
+    # Clients may pick the id so they can cancel the scan while it is still running
+    scan_id = data.get('scan_id') or uuid.uuid4().hex
+    if not isinstance(scan_id, str) or not SCAN_ID_RE.match(scan_id):
+        return jsonify({'error': 'Invalid scan_id'}), 400
+
+    # The web UI marks its own scans interactive and carries the cookie that allows it
+    try:
+        priority = scheduler.resolve_priority(
+            data.get('priority') or request.headers.get('X-Scan-Priority'),
+            request.cookies.get(scheduler.UI_TOKEN_COOKIE)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    started = time.monotonic()
+    log_context = scan_id_var.set(scan_id)
+    token = None
+    written_files = []
+    # Opt-in profiling, by request header or random sampling
+    profile_mode = requested_mode(request.headers)
+    profiler = ScanProfiler(profile_mode) if profile_mode else nullcontext()
     try:
-        # 1. Normalize
-        raw_url, base_url, host, tld, is_us_guess = normalize_url(target_url)
-        if not base_url:
-            return jsonify({'error': 'Invalid URL format'}), 400
+        token = register_scan(scan_id)
+        with disconnect_watcher(request.environ, token), profiler:
+            # 1. Normalize
+            raw_url, base_url, host, tld, is_us_guess = normalize_url(target_url)
+            if not base_url:
+                return jsonify({'error': 'Invalid URL format'}), 400
+                
+            logger.info("Web Scan initiated for %s", base_url)
             
-        logger.info(f"Web Scan initiated for {base_url}")
-        
-        # 2. Check
-        robots_res = check_robots(base_url)
-        ucp_res = check_ucp_config(base_url)
-        home_res = check_homepage(base_url)
-        
-        # 3. Score
-        result = calculate_score(base_url, host, is_us_guess, robots_res, ucp_res, home_res)
-        
-        # 4. Generate Files
-        sanitized_host = host.replace('.', '_')
-        timestamp = int(time.time())
-        filename_base = f"UCP_Report_{sanitized_host}_{timestamp}"
-        
-        output_html = os.path.join(OUTPUT_DIR, f"{filename_base}.html")
-        output_pdf = os.path.join(OUTPUT_DIR, f"{filename_base}.pdf")
-        
-        html_content = generate_report(result)
-        
-        with open(output_html, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            # 2. Check
+            with scheduler.stage_slot('probe', priority, token):
+                probes = probe_site(base_url, token)
+            
+            # 3. Score
+            result = score_probes(base_url, host, is_us_guess, probes)
             
-        try:
-            generate_pdf(output_html, output_pdf)
-        except Exception as e:
-            logger.error(f"PDF Gen failed key web request: {e}")
-            # Continue without PDF if fails (client handles?)
+            # 4. Generate Files
+            sanitized_host = host.replace('.', '_')
+            timestamp = int(time.time())
+            # Artifacts are cached as immutable, so every scan needs its own names;
+            # host and second alone collide, and clients may reuse a scan_id
+            filename_base = f"UCP_Report_{sanitized_host}_{timestamp}_{uuid.uuid4().hex[:12]}"
             
-        return jsonify({
+            output_json = os.path.join(OUTPUT_DIR, f"{filename_base}.json")
+            output_html = os.path.join(OUTPUT_DIR, f"{filename_base}.html")
+            output_pdf = os.path.join(OUTPUT_DIR, f"{filename_base}.pdf")
+
+            # The report view is a static shell plus this small JSON document
+            written_files.append(output_json)
+            with open(output_json, 'w', encoding='utf-8') as f:
+                json.dump(report_view(result), f, separators=(',', ':'))
+            written_files.extend(write_variants(output_json))
+
+            # The Playwright backend writes the full HTML itself if it runs
+            written_files.append(output_html)
+            if SCANNER_CONFIG['reportFiles']['writeHtml']:
+                html_content = generate_report(result, token)
+                with open(output_html, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+                written_files.extend(write_variants(output_html))
+                
+            try:
+                # The Playwright backend may write the HTML and its variants itself
+                written_files.extend([output_pdf] + [output_html + suffix for suffix in ('.br', '.gz')])
+                with scheduler.stage_slot('render', priority, token):
+                    render_pdf(result, output_html, output_pdf, token)
+            except ScanCancelled:
+                raise
+            except Exception as e:
+                logger.error("PDF Gen failed key web request: %s", e)
+                # Continue without PDF if fails (client handles?)
+
+        response = {
             'status': 'success',
-            'html_file': f"{filename_base}.html",
+            'scan_id': scan_id,
+            'json_file': f"{filename_base}.json",
+            'report_url': f"report/{report_shell().version}/#{filename_base}",
             'pdf_file': f"{filename_base}.pdf",
             'score': result['weightedAverage']
-        })
+        }
+        if os.path.exists(output_html):
+            response['html_file'] = f"{filename_base}.html"
+        if profile_mode:
+            # Saved next to the report and fetched through /download like the PDF
+            profile_path = profiler.save(os.path.join(OUTPUT_DIR, filename_base))
+            write_variants(profile_path)
+            response['profile_file'] = os.path.basename(profile_path)
+            response['profile'] = {
+                'mode': profiler.mode,
+                'seconds': round(profiler.elapsed, 3),
+                'breakdown': profiler.breakdown()
+            }
+        return jsonify(response)
 
+    except ScanIdInUse:
+        return jsonify({'error': 'A scan with this scan_id is already running', 'scan_id': scan_id}), 409
+    except ScanCancelled as e:
+        wasted = time.monotonic() - started
+        metrics.incr('scan.cancelled')
+        metrics.observe('scan.wasted_seconds', wasted)
+        logger.info("Scan cancelled after %.2fs: %s", wasted, e)
+        # Nobody will read a half-finished report
+        for path in written_files:
+            if os.path.exists(path):
+                os.remove(path)
+        return jsonify({'error': 'Scan cancelled', 'scan_id': scan_id}), 499
     except Exception as e:
-        logger.error(f"Scan error: {e}", exc_info=True)
+        logger.error("Scan error: %s", e, exc_info=True)
         return jsonify({'error': str(e)}), 500
+    finally:
+        # The id belongs to another scan if registering it failed
+        if token is not None:
+            unregister_scan(scan_id)
+        scan_id_var.reset(log_context)
+
+@app.route('/scan/<scan_id>/cancel', methods=['POST'])
+def cancel(scan_id):
+    if not SCAN_ID_RE.match(scan_id):
+        return jsonify({'error': 'Invalid scan_id'}), 400
+    if not cancel_scan(scan_id):
+        return jsonify({'error': 'No such scan in progress', 'scan_id': scan_id}), 404
+    return jsonify({'status': 'cancelling', 'scan_id': scan_id}), 202
+
+@app.route('/metrics')
+def metrics_view():
+    snapshot = metrics.snapshot()
+    snapshot['scheduler'] = scheduler.stats()
+    snapshot['dns'] = dns_cache.stats()
+    return jsonify(snapshot)
+
+@app.route('/readyz')
+def readyz():
+    # Under gunicorn each worker starts warming after fork; other servers start on the first probe
+    start_warmup(app)
+    ready, status = readiness()
+    return jsonify(status), 200 if ready else 503
+
+@app.route('/report/<version>/')
+def report_view_shell(version):
+    shell = report_shell()
+    if version != shell.version:
+        # Links to an older shell keep working; browsers carry the #report fragment across redirects
+        return redirect(f"../{shell.version}/")
+
+    encoding = negotiate(shell.encoded)
+    etag = f"{shell.version}-{encoding}" if encoding else shell.version
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(shell.encoded[encoding] if encoding else shell.html, mimetype='text/html')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    cache_forever(response)
+    return response
+
+@app.route('/report-data/<name>.json')
+def report_data(name):
+    return send_artifact(OUTPUT_DIR, f"{name}.json")
 
 @app.route('/download/<filename>')
 def download_file(filename):
-    return send_from_directory(OUTPUT_DIR, filename, as_attachment=True)
+    return send_artifact(OUTPUT_DIR, filename, as_attachment=True)
 
 @app.route('/view/<filename>')
 def view_file(filename):
-    return send_from_directory(OUTPUT_DIR, filename)
+    return send_artifact(OUTPUT_DIR, filename)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5002))
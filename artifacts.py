@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from flask import Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    from .config import SCANNER_CONFIG
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always written
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Report artifacts never change once written, so every representation is
+# served with a content-hash ETag and an immutable cache lifetime.
+# Compressible artifacts get .br/.gz siblings at write time; requests pick one
+# by Accept-Encoding and never pay for compression.
+
+# Preferred first when the client accepts several
+ENCODINGS = ('br', 'gzip')
+_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """Every encoding available in this process that makes `data` smaller."""
+    cfg = SCANNER_CONFIG['artifacts']
+    encoded = {'gzip': gzip.compress(data, cfg['gzipLevel'], mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(data, quality=cfg['brotliQuality'])
+    return {name: body for name, body in encoded.items() if len(body) < len(data)}
+
+
+def write_variants(path: str) -> List[str]:
+    """Write precompressed siblings (path.br, path.gz) of a compressible artifact; returns their paths."""
+    if os.path.splitext(path)[1] not in SCANNER_CONFIG['artifacts']['compressExtensions']:
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for encoding, body in compress(data).items():
+        variant = path + _SUFFIXES[encoding]
+        with open(variant, 'wb') as f:
+            f.write(body)
+        written.append(variant)
+    return written
+
+
+def negotiate(available) -> Optional[str]:
+    """The preferred encoding in `available` that the request accepts, or None for identity."""
+    accepted = request.accept_encodings
+    for encoding in ENCODINGS:
+        if encoding in available and accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _digest(path: str, size: int, mtime_ns: int) -> str:
+    # Keyed on size and mtime too, so a rewritten file gets a fresh hash
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()[:32]
+
+
+def content_etag(path: str) -> str:
+    st = os.stat(path)
+    return _digest(path, st.st_size, st.st_mtime_ns)
+
+
+def cache_forever(response: Response) -> Response:
+    response.cache_control.public = True
+    response.cache_control.max_age = SCANNER_CONFIG['artifacts']['maxAgeSeconds']
+    response.cache_control.immutable = True
+    return response
+
+
+def send_artifact(directory: str, filename: str, as_attachment: bool = False) -> Response:
+    """
+    Serve a report artifact with content negotiation against its precompressed
+    siblings, a strong content ETag (304 on If-None-Match) and byte ranges.
+    Range requests are answered from the uncompressed file, so offsets always
+    refer to the bytes a client would save.
+    """
+    path = safe_join(directory, filename)
+    # Variants are only served through negotiation, with their Content-Encoding
+    if path is None or filename.endswith(tuple(_SUFFIXES.values())) or not os.path.isfile(path):
+        abort(404)
+
+    etag = content_etag(path)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    compressible = os.path.splitext(filename)[1] in SCANNER_CONFIG['artifacts']['compressExtensions']
+
+    encoding = None
+    if compressible and 'Range' not in request.headers:
+        encoding = negotiate([e for e in ENCODINGS if os.path.isfile(path + _SUFFIXES[e])])
+    if encoding:
+        path = path + _SUFFIXES[encoding]
+        etag = f"{etag}-{encoding}"
+        metrics.incr(f"artifacts.served.{encoding}")
+
+    response = send_file(
+        os.path.abspath(path), mimetype=mimetype, as_attachment=as_attachment,
+        download_name=filename, etag=etag, conditional=True,
+        max_age=SCANNER_CONFIG['artifacts']['maxAgeSeconds']
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if compressible:
+        response.vary.add('Accept-Encoding')
+    return cache_forever(response)
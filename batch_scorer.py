@@ -0,0 +1,159 @@
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for batch re-scoring
+    np = None
+
+try:
+    from .config import REPORT_CONFIG
+    from .logger import logger
+    from .scorer import probe_outcomes, build_result
+except ImportError:
+    from config import REPORT_CONFIG
+    from logger import logger
+    from scorer import probe_outcomes, build_result
+
+# Columns score_batch() reads; everything else in probe_outcomes() is only used for finding text.
+NUMERIC_COLUMNS = ('robots_status', 'ucp_status', 'home_status')
+FLAG_COLUMNS = ('robots_error', 'robots_match', 'ucp_error', 'ucp_json_valid', 'home_error', 'header_match')
+OBJECT_COLUMNS = ('ucp_findings', 'matched_headers')
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Batch scoring requires numpy (pip install 'ucp-compliance-scanner[batch]')")
+
+
+def columns_from_results(rows: Sequence[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]) -> Dict[str, Any]:
+    """Turn (robots_res, ucp_res, home_res) tuples into the column dict score_batch() expects."""
+    _require_numpy()
+    outcomes = [probe_outcomes(robots_res, ucp_res, home_res) for robots_res, ucp_res, home_res in rows]
+    columns: Dict[str, Any] = {}
+    for name in NUMERIC_COLUMNS:
+        columns[name] = np.fromiter((o[name] for o in outcomes), dtype=np.int32, count=len(outcomes))
+    for name in FLAG_COLUMNS:
+        columns[name] = np.fromiter((o[name] for o in outcomes), dtype=bool, count=len(outcomes))
+    for name in OBJECT_COLUMNS:
+        columns[name] = [o[name] for o in outcomes]
+    return columns
+
+
+class BatchScores:
+    """Vectorized scores for many hosts; per-host result dicts are built on demand."""
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        hosts: Sequence[str],
+        is_us_guess: Any,
+        columns: Dict[str, Any],
+        component_scores: Any,
+        weighted_average: Any,
+        status: Any,
+        review_date: str,
+        cfg: Dict[str, Any],
+        origins: Optional[Sequence[str]] = None,
+        redirect_chains: Optional[Sequence[List[str]]] = None
+    ):
+        self.base_urls = base_urls
+        self.hosts = hosts
+        self.is_us_guess = is_us_guess
+        self.columns = columns
+        # Shape (n, 3): robots, ucpConfig, headers
+        self.component_scores = component_scores
+        self.weighted_average = weighted_average
+        self.status = status
+        self.review_date = review_date
+        self.cfg = cfg
+        self.origins = origins
+        self.redirect_chains = redirect_chains
+
+    def __len__(self) -> int:
+        return len(self.base_urls)
+
+    def status_counts(self) -> Dict[str, int]:
+        labels, counts = np.unique(self.status, return_counts=True)
+        return {str(label): int(count) for label, count in zip(labels, counts)}
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """The probe outcome flags for host i, in probe_outcomes() form."""
+        row = {name: int(self.columns[name][i]) for name in NUMERIC_COLUMNS}
+        row.update({name: bool(self.columns[name][i]) for name in FLAG_COLUMNS})
+        for name in OBJECT_COLUMNS:
+            values = self.columns.get(name)
+            row[name] = values[i] if values is not None else []
+        return row
+
+    def result(self, i: int) -> Dict[str, Any]:
+        """Materialize the same result dict calculate_score() returns for host i."""
+        scores = tuple(s.item() for s in self.component_scores[i])
+        return build_result(
+            self.base_urls[i], self.hosts[i], bool(self.is_us_guess[i]),
+            self.row(i), scores, self.review_date, self.cfg,
+            self.origins[i] if self.origins is not None else None,
+            self.redirect_chains[i] if self.redirect_chains is not None else None
+        )
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [self.result(i) for i in range(len(self))]
+
+
+def score_batch(
+    base_urls: Sequence[str],
+    hosts: Sequence[str],
+    is_us_guess: Any,
+    columns: Dict[str, Any],
+    cfg: Optional[Dict[str, Any]] = None,
+    review_date: Optional[str] = None,
+    origins: Optional[Sequence[str]] = None,
+    redirect_chains: Optional[Sequence[List[str]]] = None
+) -> BatchScores:
+    """
+    Score many hosts at once from columnar probe outcomes.
+    Applies the same rules as scorer.calculate_score using the weights and
+    thresholds in `cfg` (REPORT_CONFIG by default), so a historical dataset
+    can be re-scored after a config change without touching the network.
+    `is_us_guess` is one flag per host, or a single flag for all of them.
+    """
+    _require_numpy()
+    is_us_guess = np.broadcast_to(np.asarray(is_us_guess, dtype=bool), (len(base_urls),))
+    cfg = cfg or REPORT_CONFIG
+    w = cfg['scoring']['weights']
+    thr = cfg['scoring']['thresholds']
+    review_date = review_date or datetime.utcnow().isoformat()
+
+    robots_status = np.asarray(columns['robots_status'])
+    ucp_status = np.asarray(columns['ucp_status'])
+    home_status = np.asarray(columns['home_status'])
+    # A zero status means the probe never got a response, same as the single-host path
+    robots_error = np.asarray(columns['robots_error'], dtype=bool)
+    ucp_error = np.asarray(columns['ucp_error'], dtype=bool) | (ucp_status == 0)
+    home_error = np.asarray(columns['home_error'], dtype=bool) | (home_status == 0)
+
+    robots_pass = ~robots_error & np.asarray(columns['robots_match'], dtype=bool)
+    ucp_pass = ~ucp_error & (ucp_status == 200) & np.asarray(columns['ucp_json_valid'], dtype=bool)
+    header_pass = ~home_error & (home_status >= 200) & (home_status < 400) & np.asarray(columns['header_match'], dtype=bool)
+
+    weights = np.array([w['robots'], w['ucpConfig'], w['headers']])
+    passed = np.stack([robots_pass, ucp_pass, header_pass], axis=1)
+    component_scores = passed * weights
+    weighted_average = np.clip(np.rint(component_scores.sum(axis=1)), 0, 100).astype(np.int64)
+
+    status = np.select(
+        [weighted_average >= thr['compliantMin'], weighted_average >= thr['partialMin']],
+        ['COMPLIANT', 'PARTIAL'],
+        'NON_COMPLIANT'
+    )
+
+    logger.info("Batch scored %s hosts", len(weighted_average))
+    normalized = dict(columns)
+    normalized.update({
+        'robots_status': robots_status, 'ucp_status': ucp_status, 'home_status': home_status,
+        'robots_error': robots_error, 'ucp_error': ucp_error, 'home_error': home_error
+    })
+    return BatchScores(
+        base_urls, hosts, is_us_guess, normalized,
+        component_scores, weighted_average, status, review_date, cfg,
+        origins, redirect_chains
+    )
@@ -0,0 +1,145 @@
+"""
+Startup benchmark: how long a freshly started server takes to finish its
+first successful scan, with preloading and warmup (warm) and without (cold).
+
+    python benchmark.py
+    python benchmark.py --modes warm --target https://example.com --workers 2
+
+Each mode starts gunicorn with gunicorn.conf.py on a free port, waits for
+/readyz, then scans until one succeeds. Without --target a local site that
+passes every check is served, so the numbers exclude the network.
+"""
+import argparse
+import http.server
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Any, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODES = {'warm': '1', 'cold': '0'}  # -> UCP_WARMUP
+
+
+class _TargetSite(http.server.BaseHTTPRequestHandler):
+    PAGES = {
+        '/robots.txt': ('text/plain', b"User-agent: *\nUCP-Config: /.well-known/ucp\n"),
+        '/.well-known/ucp': ('application/json', b'{"version": "1.0"}'),
+    }
+
+    def do_GET(self):
+        content_type, body = self.PAGES.get(self.path, ('text/html', b"<html><body>ok</body></html>"))
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('UCP-Config', '/.well-known/ucp')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve_target() -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _TargetSite)
+    threading.Thread(target=server.serve_forever, name='benchmark-target', daemon=True).start()
+    return server
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _request(url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 120):
+    """(status, parsed JSON body), or (None, None) while nothing is listening."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b'null')
+        except ValueError:
+            return e.code, None
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def run_mode(mode: str, target: str, workers: int, timeout: float) -> Dict[str, Any]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), UCP_WARMUP=MODES[mode])
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app'],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result: Dict[str, Any] = {'mode': mode, 'workers': workers}
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            status, body = _request(f"{base}/readyz", timeout=5)
+            if status is not None and 'listeningSeconds' not in result:
+                result['listeningSeconds'] = round(time.perf_counter() - started, 3)
+            if status == 200:
+                result['readySeconds'] = round(time.perf_counter() - started, 3)
+                result['warmupSteps'] = body.get('steps', {})
+                break
+            time.sleep(0.02)
+        else:
+            raise TimeoutError(f"{mode}: not ready within {timeout}s")
+
+        attempts = 0
+        while 'firstScanSeconds' not in result:
+            if time.perf_counter() >= deadline:
+                raise TimeoutError(f"{mode}: no successful scan within {timeout}s")
+            attempts += 1
+            scan_started = time.perf_counter()
+            status, body = _request(f"{base}/scan", {'url': target}, timeout=timeout)
+            if status == 200 and body and 'score' in body:
+                result['firstScanSeconds'] = round(time.perf_counter() - started, 3)
+                result['firstScanLatency'] = round(time.perf_counter() - scan_started, 3)
+                result['scanAttempts'] = attempts
+                result['score'] = body['score']
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Measure time to first successful scan after startup')
+    parser.add_argument('--modes', default='warm,cold', help='Comma-separated: warm, cold')
+    parser.add_argument('--target', help='Site to scan (default: a local site that passes every check)')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=180)
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    target = args.target
+    if target is None:
+        site = _serve_target()
+        target = f"http://127.0.0.1:{site.server_address[1]}"
+
+    results = [run_mode(mode, target, args.workers, args.timeout) for mode in modes]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+    from .cancellation import CancelToken, ScanCancelled, check_cancelled
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+    from cancellation import CancelToken, ScanCancelled, check_cancelled
+    import metrics
+
+# One thread runs an asyncio loop that owns the Playwright driver and a
+# long-lived Chromium. Renders are coroutines handed to that loop, so several
+# pages print at once in the one browser (up to the scheduler's render stage
+# capacity). Each render gets a fresh page (and browser context); the browser
+# is only launched again if it dies.
+
+LAUNCH_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
+
+# How often a caller waiting on a render re-checks its cancel token
+WAIT_SLICE_SECONDS = 0.25
+
+
+class BrowserRenderer:
+    """Runs `fn(browser)` coroutines concurrently on a thread that owns a Chromium instance."""
+
+    def __init__(self, launch_args=LAUNCH_ARGS):
+        self.launch_args = list(launch_args)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._launch_error: Optional[BaseException] = None
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._relaunch_lock: Optional[asyncio.Lock] = None
+
+    def start(self) -> None:
+        """Start the render thread and launch the browser, unless already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._launch_error = None
+            self._thread = threading.Thread(target=self._run, name='pdf-browser', daemon=True)
+            self._thread.start()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the browser is up; raises the launch error if it could not start."""
+        if not self._ready.wait(timeout):
+            return False
+        if self._launch_error is not None:
+            raise self._launch_error
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self._launch_error is None
+
+    def submit(self, fn: Callable[[Any], Awaitable[Any]], timeout: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        Schedule `fn(browser)` on the render loop, in a copy of the caller's
+        context; it is cancelled after `timeout` seconds. Cancelling the
+        returned future cancels the render task.
+        """
+        self.start()
+        self.wait_ready()
+        return asyncio.run_coroutine_threadsafe(self._job(fn, timeout), self._loop)
+
+    def run(self, fn: Callable[[Any], Awaitable[Any]], cancel_token: Optional[CancelToken] = None) -> Any:
+        """
+        Wait for the browser (up to warmup.browserTimeoutSeconds) and then for
+        `fn(browser)` (up to pdf.renderTimeoutSeconds), giving up early if
+        `cancel_token` fires.
+        """
+        self.start()
+        launch_timeout = SCANNER_CONFIG['warmup']['browserTimeoutSeconds']
+        deadline = time.monotonic() + launch_timeout
+        while not self.wait_ready(WAIT_SLICE_SECONDS):
+            check_cancelled(cancel_token)
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Chromium did not start within {launch_timeout}s")
+
+        future = self.submit(fn, SCANNER_CONFIG['pdf']['renderTimeoutSeconds'])
+        while True:
+            # Not future.result(timeout=...): the render's own TimeoutError is
+            # the same class as the wait's, so it would be swallowed and retried
+            concurrent.futures.wait([future], WAIT_SLICE_SECONDS)
+            if future.done():
+                return future.result()
+            try:
+                check_cancelled(cancel_token)
+            except ScanCancelled:
+                future.cancel()
+                raise
+
+    def stop(self, timeout: float = 10) -> None:
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if thread is not None and thread.is_alive() and loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+
+    async def _launch(self) -> Any:
+        started = time.monotonic()
+        browser = await self._playwright.chromium.launch(args=self.launch_args)
+        elapsed = time.monotonic() - started
+        metrics.observe('render.browser_launch_seconds', elapsed)
+        logger.info("Launched Chromium in %.2fs", elapsed)
+        return browser
+
+    async def _start_browser(self) -> None:
+        from playwright.async_api import async_playwright
+        self._relaunch_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        self._browser = await self._launch()
+
+    async def _job(self, fn: Callable[[Any], Awaitable[Any]], timeout: Optional[float]) -> Any:
+        if not self._browser.is_connected():
+            async with self._relaunch_lock:
+                # Concurrent renders that saw the same dead browser relaunch it once
+                if not self._browser.is_connected():
+                    metrics.incr('render.browser_relaunched')
+                    self._browser = await self._launch()
+        # A page stuck in goto or pdf would otherwise hold its render slot forever
+        return await asyncio.wait_for(fn(self._browser), timeout)
+
+    async def _shutdown(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await self._browser.close()
+            await self._playwright.stop()
+        except Exception as e:
+            logger.warning("Error while stopping the PDF browser: %s", e)
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._start_browser())
+        except BaseException as e:
+            logger.error("Could not start the PDF browser: %s", e)
+            self._launch_error = e
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self._shutdown())
+            loop.close()
+
+
+_renderer: Optional[BrowserRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def renderer() -> BrowserRenderer:
+    """The process-wide browser renderer (not started until first use or warmup)."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = BrowserRenderer()
+            atexit.register(_renderer.stop)
+        return _renderer
+
+
+def _reset_after_fork() -> None:
+    # The render thread and its browser belong to the parent
+    global _renderer, _renderer_lock
+    _renderer = None
+    _renderer_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
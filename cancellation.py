@@ -0,0 +1,198 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator
+try:
+    from .logger import logger
+except ImportError:
+    from logger import logger
+
+
+class ScanCancelled(Exception):
+    """Raised inside the scan pipeline once its CancelToken has been cancelled."""
+
+
+class ScanIdInUse(Exception):
+    """Raised by register() when another in-flight scan already holds the id."""
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared by every stage of one scan."""
+
+    def __init__(self, scan_id: Optional[str] = None):
+        self.scan_id = scan_id
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = 'cancelled') -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ScanCancelled(self.reason or 'cancelled')
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+
+
+def check_cancelled(token: Optional[CancelToken]) -> None:
+    """raise_if_cancelled() that tolerates a missing token."""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+_active: Dict[str, CancelToken] = {}
+_active_lock = threading.Lock()
+
+# Cancel requests can land on a different gunicorn worker than the scan itself,
+# so they also leave a marker file that every worker's watcher polls for.
+# Workers record their in-flight scans in the same directory, and markers are
+# only written for those, so unknown ids cannot fill the disk.
+CANCEL_MARKER_DIR = os.path.join(tempfile.gettempdir(), 'ucp_scanner_cancel')
+
+# How long an unreadable .running record is assumed to be mid-write
+RUNNING_GRACE_SECONDS = 5.0
+
+def _marker_path(scan_id: str) -> str:
+    return os.path.join(CANCEL_MARKER_DIR, scan_id)
+
+def _running_path(scan_id: str) -> str:
+    return os.path.join(CANCEL_MARKER_DIR, f"{scan_id}.running")
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _owner_alive(running_path: str) -> bool:
+    try:
+        with open(running_path, encoding='utf-8') as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        # Half-written by a worker that is claiming it right now, unless it
+        # has stayed that way long enough that the worker died in between
+        try:
+            return time.time() - os.path.getmtime(running_path) < RUNNING_GRACE_SECONDS
+        except OSError:
+            return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _claim_running(scan_id: str) -> None:
+    """Create the .running record for `scan_id`, unless a live worker holds it."""
+    path = _running_path(scan_id)
+    os.makedirs(CANCEL_MARKER_DIR, exist_ok=True)
+    for _ in range(2):
+        try:
+            with open(path, 'x', encoding='utf-8') as f:
+                f.write(str(os.getpid()))
+            return
+        except FileExistsError:
+            if _owner_alive(path):
+                raise ScanIdInUse(scan_id)
+            # Left behind by a worker that died mid-scan
+            _remove(path)
+    raise ScanIdInUse(scan_id)
+
+def register(scan_id: str) -> CancelToken:
+    """
+    Create and track the token for an in-flight scan. Raises ScanIdInUse if
+    a scan with this (client-chosen) id is already running on any worker,
+    since cancel and unregister could then no longer tell the two apart.
+    """
+    token = CancelToken(scan_id)
+    with _active_lock:
+        if scan_id in _active:
+            raise ScanIdInUse(scan_id)
+        try:
+            _claim_running(scan_id)
+        except OSError as e:
+            logger.warning("Could not record scan %s for cross-worker cancel: %s", scan_id, e)
+        _active[scan_id] = token
+    # A marker left by an earlier scan with this id must not cancel this one
+    _remove(_marker_path(scan_id))
+    return token
+
+def unregister(scan_id: str) -> None:
+    with _active_lock:
+        _active.pop(scan_id, None)
+    _remove(_running_path(scan_id))
+    _remove(_marker_path(scan_id))
+
+def cancel_scan(scan_id: str, reason: str = 'cancel requested') -> bool:
+    """
+    Cancel an in-flight scan by id. Returns False if no worker is running it;
+    if another worker is, a marker is left for that worker's watcher.
+    """
+    with _active_lock:
+        token = _active.get(scan_id)
+    if token is not None:
+        token.cancel(reason)
+        return True
+    if not os.path.exists(_running_path(scan_id)):
+        return False
+    with open(_marker_path(scan_id), 'w', encoding='utf-8') as f:
+        f.write(reason)
+    return True
+
+def _client_socket(environ: Dict[str, Any]) -> Optional[socket.socket]:
+    # gunicorn and the werkzeug dev server both expose the raw client socket
+    sock = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    return sock if isinstance(sock, socket.socket) else None
+
+def _peer_closed(sock: socket.socket) -> bool:
+    try:
+        data = sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+    except (BlockingIOError, InterruptedError):
+        return False
+    except ValueError:
+        # TLS sockets do not support MSG_PEEK; we cannot tell, so assume connected
+        return False
+    except OSError:
+        return True
+    return data == b''
+
+@contextmanager
+def disconnect_watcher(environ: Dict[str, Any], token: CancelToken, interval: float = 0.5) -> Iterator[None]:
+    """
+    Cancel `token` if the HTTP client goes away while the block runs, or if a
+    cancel request for this scan arrived at another worker.
+    Polls the request socket from a background thread; a peer that closed
+    its end (tab closed, proxy timeout) reads as EOF.
+    """
+    sock = _client_socket(environ)
+    marker = _marker_path(token.scan_id) if token.scan_id else None
+    done = threading.Event()
+
+    def watch() -> None:
+        while not done.wait(interval) and not token.cancelled:
+            if sock is not None and _peer_closed(sock):
+                logger.info("Client disconnected, cancelling scan %s", token.scan_id)
+                token.cancel('client disconnected')
+                return
+            if marker and os.path.exists(marker):
+                token.cancel('cancel requested')
+                return
+
+    watcher = threading.Thread(target=watch, name=f"disconnect-watch-{token.scan_id}", daemon=True)
+    watcher.start()
+    try:
+        yield
+    finally:
+        done.set()
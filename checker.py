@@ -1,67 +1,413 @@
+import contextvars
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError, ReadTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+from urllib.parse import urlparse
 try:
+    from .config import SCANNER_CONFIG
     from .logger import logger
+    from .cancellation import CancelToken, ScanCancelled, check_cancelled
+    from .ratelimit import limiter, parse_retry_after, backoff_delay
+    from .checks import HOME, RESOURCES, Check, Resource, active_checks, required_resources
+    from .dnscache import dns_cache
+    from . import metrics
 except ImportError:
+    from config import SCANNER_CONFIG
     from logger import logger
+    from cancellation import CancelToken, ScanCancelled, check_cancelled
+    from ratelimit import limiter, parse_retry_after, backoff_delay
+    from checks import HOME, RESOURCES, Check, Resource, active_checks, required_resources
+    from dnscache import dns_cache
+    import metrics
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 
-def make_request(url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+# base_url -> (expires_at, {'origin', 'homeUrl', 'redirectChain'})
+_origin_cache: Dict[str, Any] = {}
+_origin_lock = threading.Lock()
+
+# Body read granularity; cancellation is checked between chunks
+READ_CHUNK_SIZE = 64 * 1024
+
+# Statuses that mean "slow down / try again", not "this endpoint is missing"
+RETRYABLE_STATUSES = (429, 503)
+
+# Per-attempt connect/read timeout; each probe, retries included, also has
+# an overall deadline (rateLimit.probeDeadlineSeconds)
+REQUEST_TIMEOUT_SECONDS = 30
+
+def _read_text(
+    response: requests.Response, cancel_token: Optional[CancelToken], max_bytes: Optional[int] = None
+) -> Tuple[str, bool]:
     """
-    Perform an HTTP GET request and return a standardized response dict.
+    Read a streamed response body chunk by chunk so a cancelled scan stops early.
+    Returns (text, truncated); reading stops once the body passes `max_bytes`.
     """
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in response.iter_content(READ_CHUNK_SIZE):
+        check_cancelled(cancel_token)
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            truncated = True
+            break
+    content = b''.join(chunks)
+    # Same decoding rules as requests.Response.text; apparent_encoding would
+    # re-read the already consumed stream, so detect on the bytes directly.
+    # chardet is None when neither chardet nor charset_normalizer is installed.
+    encoding = response.encoding
+    if not encoding and content and chardet is not None:
+        encoding = chardet.detect(content)['encoding']
+    encoding = encoding or 'utf-8'
     try:
-        logger.debug(f"Requesting URL: {url}")
-        with requests.Session() as session:
-            response = session.get(url, headers=headers, timeout=30, allow_redirects=True)
-            
-        return {
-            "statusCode": response.status_code,
-            "body": response.text,
-            "headers": dict(response.headers),
-            "error": None
-        }
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"Request failed for {url}: {e}")
-        return {
-            "statusCode": 0,
-            "body": "",
-            "headers": {},
-            "error": str(e)
-        }
-    except Exception as e:
-        logger.error(f"Unexpected error for {url}: {e}", exc_info=True)
-        return {
-            "statusCode": 0,
-            "body": "",
-            "headers": {},
-            "error": str(e)
+        return str(content, encoding, errors='replace'), truncated
+    except LookupError:
+        return str(content, errors='replace'), truncated
+
+def _sleep(seconds: float, cancel_token: Optional[CancelToken]) -> None:
+    if cancel_token is not None:
+        cancel_token.wait(seconds)
+        check_cancelled(cancel_token)
+    else:
+        time.sleep(seconds)
+
+def _is_retryable_error(e: Exception) -> bool:
+    """Only failures to connect are retried; a host that accepted and then stalled would stall again."""
+    # SSLError is a ConnectionError too, but a bad certificate or handshake fails the same way every time
+    if isinstance(e, (requests.exceptions.ReadTimeout, requests.exceptions.SSLError)):
+        return False
+    cause = e.args[0] if e.args else None
+    # A read timeout while streaming the body surfaces as a ConnectionError
+    if isinstance(cause, ReadTimeoutError):
+        return False
+    # A host that does not resolve will not resolve a second later either
+    return not isinstance(getattr(cause, 'reason', None), NameResolutionError)
+
+def _retry_delay(response: requests.Response, attempt: int) -> Optional[float]:
+    """How long to wait before retrying a 429/503, or None if we should not retry."""
+    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    if retry_after is None:
+        return backoff_delay(attempt)
+    if retry_after > SCANNER_CONFIG['rateLimit']['maxRetryAfterSeconds']:
+        # Not worth holding a worker for; report the status as-is
+        return None
+    return retry_after
+
+class _CachedDNSConnectionMixin:
+    """Resolve through dnscache.dns_cache instead of a getaddrinfo call per new connection."""
+
+    def _new_conn(self):
+        try:
+            addresses = dns_cache.getaddrinfo(self._dns_host, self.port, allowed_gai_family())
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        # Connect to each address in turn, as urllib3 does; TLS still verifies self.host
+        dns_host = self._dns_host
+        error = None
+        try:
+            for _, _, _, _, sockaddr in addresses:
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+        finally:
+            self._dns_host = dns_host
+        raise error
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+class CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve hosts through the shared DNS cache."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CachedDNSHTTPConnectionPool,
+            'https': _CachedDNSHTTPSConnectionPool,
         }
 
-def check_robots(base_url: str) -> Dict[str, Any]:
-    """Check availability and content of robots.txt."""
-    url = f"{base_url}/robots.txt"
+_adapter: Optional[HTTPAdapter] = None
+_adapter_lock = threading.Lock()
+
+def http_adapter() -> HTTPAdapter:
+    """The process-wide connection pool every probe goes through."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            cfg = SCANNER_CONFIG['httpPool']
+            _adapter = CachedDNSAdapter(pool_connections=cfg['hosts'], pool_maxsize=cfg['connectionsPerHost'])
+        return _adapter
+
+def _session() -> requests.Session:
+    # A fresh session per request keeps cookies from leaking between scans;
+    # connections are kept alive in the shared adapter. Not closed, since
+    # closing a session closes its adapters.
+    session = requests.Session()
+    adapter = http_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def make_request(
+    url: str,
+    headers: Dict[str, str],
+    cancel_token: Optional[CancelToken] = None,
+    max_bytes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Perform an HTTP GET request and return a standardized response dict.
+    A body longer than `max_bytes` is cut short and the dict marked `truncated`.
+    Requests pass through the outbound rate limiter; 429/503 responses and
+    connection errors are retried with Retry-After or exponential backoff,
+    as long as the retry fits in the probe's overall deadline.
+    Raises ScanCancelled if `cancel_token` is cancelled before or during the read.
+    """
+    cfg = SCANNER_CONFIG['rateLimit']
+    max_retries = cfg['maxRetries']
+    deadline = time.monotonic() + cfg['probeDeadlineSeconds']
+    attempt = 0
+    while True:
+        check_cancelled(cancel_token)
+        limiter.acquire(url, cancel_token)
+        try:
+            logger.debug("Requesting URL: %s", url)
+            timeout = max(1.0, min(REQUEST_TIMEOUT_SECONDS, deadline - time.monotonic()))
+            with _session().get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=True) as response:
+                if response.status_code in RETRYABLE_STATUSES and attempt < max_retries:
+                    delay = _retry_delay(response, attempt)
+                    if delay is not None and time.monotonic() + delay < deadline:
+                        # The limiter holds every request to this host until the delay passes
+                        limiter.penalize(url, delay)
+                        metrics.incr('requests.retried')
+                        attempt += 1
+                        continue
+                body, truncated = _read_text(response, cancel_token, max_bytes)
+                if truncated:
+                    logger.warning("Stopped reading %s past %d bytes", url, max_bytes)
+
+            return {
+                "statusCode": response.status_code,
+                "body": body,
+                "headers": dict(response.headers),
+                "url": response.url,
+                "redirects": [r.url for r in response.history],
+                "error": None,
+                "truncated": truncated
+            }
+        except ScanCancelled:
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            delay = backoff_delay(attempt)
+            if attempt < max_retries and _is_retryable_error(e) and time.monotonic() + delay < deadline:
+                logger.info("Transient failure for %s (%s); retrying in %.2fs", url, e, delay)
+                metrics.incr('requests.retried')
+                attempt += 1
+                _sleep(delay, cancel_token)
+                continue
+            logger.warning("Request failed for %s: %s", url, e)
+            return {
+                "statusCode": 0,
+                "body": "",
+                "headers": {},
+                "url": url,
+                "redirects": [],
+                "error": str(e)
+            }
+        except requests.exceptions.RequestException as e:
+            logger.warning("Request failed for %s: %s", url, e)
+            return {
+                "statusCode": 0,
+                "body": "",
+                "headers": {},
+                "url": url,
+                "redirects": [],
+                "error": str(e)
+            }
+        except Exception as e:
+            logger.error("Unexpected error for %s: %s", url, e, exc_info=True)
+            return {
+                "statusCode": 0,
+                "body": "",
+                "headers": {},
+                "url": url,
+                "redirects": [],
+                "error": str(e)
+            }
+
+def fetch_resource(resource: Resource, base_url: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """Fetch a registered check resource relative to base_url (the homepage URL for the homepage itself)."""
+    url = base_url if resource.path is None else f"{base_url}{resource.path}"
     headers = {
         "User-Agent": USER_AGENT,
-        "Accept": "text/plain, */*"
+        "Accept": resource.accept
     }
-    return make_request(url, headers)
+    return make_request(url, headers, cancel_token, resource.max_bytes)
+
+def check_robots(base_url: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """Check availability and content of robots.txt."""
+    return fetch_resource(RESOURCES['robots'], base_url, cancel_token)
 
-def check_ucp_config(base_url: str) -> Dict[str, Any]:
+def check_ucp_config(base_url: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
     """Check availability and content of /.well-known/ucp."""
-    url = f"{base_url}/.well-known/ucp"
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/json, */*"
-    }
-    return make_request(url, headers)
+    return fetch_resource(RESOURCES['ucp'], base_url, cancel_token)
 
-def check_homepage(base_url: str) -> Dict[str, Any]:
+def check_homepage(base_url: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
     """Check homepage availability and headers."""
-    url = base_url
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+    return fetch_resource(RESOURCES[HOME], base_url, cancel_token)
+
+_fetch_pool: Optional[ThreadPoolExecutor] = None
+_fetch_pool_lock = threading.Lock()
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(
+                max_workers=SCANNER_CONFIG['probeFetch']['workers'], thread_name_prefix='probe-fetch'
+            )
+        return _fetch_pool
+
+def _reset_after_fork() -> None:
+    # Pool threads and pooled sockets must not be shared with the parent
+    # (gunicorn preload); children build their own on first use
+    global _fetch_pool, _fetch_pool_lock, _adapter, _adapter_lock
+    _fetch_pool = None
+    _fetch_pool_lock = threading.Lock()
+    _adapter = None
+    _adapter_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def fetch_all(
+    fetches: Sequence[Tuple[Resource, str]],
+    cancel_token: Optional[CancelToken] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch (resource, base_url) pairs concurrently; returns responses by resource name.
+    Fetches run in copies of the caller's context, so their log lines keep the scan id.
+    A cancelled scan raises ScanCancelled once every fetch has stopped.
+    """
+    metrics.incr('probe.fetches', len(fetches))
+    if len(fetches) <= 1:
+        return {resource.name: fetch_resource(resource, base, cancel_token) for resource, base in fetches}
+    pool = _get_fetch_pool()
+    futures = [
+        (resource.name, pool.submit(contextvars.copy_context().run, fetch_resource, resource, base, cancel_token))
+        for resource, base in fetches
+    ]
+    # Wait for every fetch before raising so no request outlives the scan
+    errors = [f.exception() for _, f in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return {name: f.result() for name, f in futures}
+
+def origin_of(url: str) -> str:
+    """Return scheme://netloc for a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def get_cached_origin(base_url: str) -> Optional[Dict[str, Any]]:
+    """Return the cached canonical origin for base_url if it has not expired."""
+    with _origin_lock:
+        entry = _origin_cache.get(base_url)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del _origin_cache[base_url]
+            return None
+        return value
+
+def cache_origin(base_url: str, origin: str, home_url: str, redirect_chain: List[str]) -> None:
+    """Remember where base_url ends up so later scans skip the redirect chain."""
+    cfg = SCANNER_CONFIG['originCache']
+    with _origin_lock:
+        _origin_cache.pop(base_url, None)
+        while len(_origin_cache) >= cfg['maxEntries']:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del _origin_cache[next(iter(_origin_cache))]
+        _origin_cache[base_url] = (
+            time.monotonic() + cfg['ttlSeconds'],
+            {'origin': origin, 'homeUrl': home_url, 'redirectChain': list(redirect_chain)}
+        )
+
+def clear_origin_cache() -> None:
+    with _origin_lock:
+        _origin_cache.clear()
+
+def probe_site(
+    base_url: str,
+    cancel_token: Optional[CancelToken] = None,
+    checks: Optional[Sequence[Check]] = None
+) -> Dict[str, Any]:
+    """
+    Fetch every resource the active checks (or `checks`) need, each exactly once.
+    The homepage probe resolves the canonical origin (following http->https,
+    www and locale redirects once); the other resources are then requested
+    from that origin directly and concurrently. Resolved origins are cached
+    per base_url with a TTL, and with a cached origin the homepage is fetched
+    alongside everything else.
+    """
+    checks = active_checks() if checks is None else checks
+    resources = [r for r in required_resources(checks) if r.name != HOME]
+
+    cached = get_cached_origin(base_url)
+    if cached:
+        logger.debug("Using cached origin %s for %s", cached['origin'], base_url)
+        origin = cached['origin']
+        redirect_chain = cached['redirectChain']
+        responses = fetch_all(
+            [(RESOURCES[HOME], cached['homeUrl'])] + [(r, origin) for r in resources], cancel_token
+        )
+        home_res = responses[HOME]
+        # The site may have moved or gone down since we cached it; re-resolve on the next scan
+        if home_res['redirects'] or home_res['error'] or not home_res['statusCode']:
+            with _origin_lock:
+                _origin_cache.pop(base_url, None)
+    else:
+        home_res = check_homepage(base_url, cancel_token)
+        metrics.incr('probe.fetches')
+        if home_res['error'] or not home_res['statusCode']:
+            origin = base_url
+            redirect_chain = []
+        else:
+            origin = origin_of(home_res['url'])
+            redirect_chain = home_res['redirects'] + [home_res['url']] if home_res['redirects'] else []
+            cache_origin(base_url, origin, home_res['url'], redirect_chain)
+        if origin != base_url:
+            logger.info("Resolved canonical origin %s -> %s", base_url, origin)
+        responses = fetch_all([(r, origin) for r in resources], cancel_token)
+        responses[HOME] = home_res
+
+    return {
+        'responses': responses,
+        'home': home_res,
+        'origin': origin,
+        'redirectChain': redirect_chain,
+        'originCached': cached is not None
     }
-    return make_request(url, headers)
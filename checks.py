@@ -0,0 +1,246 @@
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+try:
+    from .config import REPORT_CONFIG, SCANNER_CONFIG
+    from .validator import validate_ucp_config
+    from .header_index import match_ucp_headers
+except ImportError:
+    from config import REPORT_CONFIG, SCANNER_CONFIG
+    from validator import validate_ucp_config
+    from header_index import match_ucp_headers
+
+# A scan is a set of checks over a few fetched resources. Each check names the
+# resources it reads; checker.probe_site fetches every distinct resource once
+# per scan, concurrently, and every check reads from the same responses.
+# A registered check is active when REPORT_CONFIG['scoring']['weights'] has a
+# weight for its key. Checks are scored and reported in registration order.
+
+HOME = 'home'
+
+Responses = Dict[str, Dict[str, Any]]
+
+
+class Resource(NamedTuple):
+    name: str
+    path: Optional[str]  # appended to the canonical origin; None is the homepage itself
+    accept: str
+    max_bytes: Optional[int] = None  # stop downloading the body past this many bytes
+
+
+class CheckContext(NamedTuple):
+    base_url: str
+    origin: str
+    cfg: Dict[str, Any]
+
+
+class Check(NamedTuple):
+    key: str  # weight / componentsCopy key in REPORT_CONFIG, and the component key in results
+    title: str
+    resources: Tuple[str, ...]
+    # responses -> outcome flags; keys are prefixed per check since all outcomes share one dict
+    evaluate: Callable[[Responses], Dict[str, Any]]
+    passed: Callable[[Dict[str, Any]], bool]
+    # (outcome, context) -> (finding, detail, extra component fields)
+    describe: Callable[[Dict[str, Any], CheckContext], Tuple[str, str, Dict[str, Any]]]
+
+
+RESOURCES: Dict[str, Resource] = {}
+CHECKS: Dict[str, Check] = {}
+
+
+def register_resource(name: str, path: Optional[str], accept: str, max_bytes: Optional[int] = None) -> Resource:
+    resource = Resource(name, path, accept, max_bytes)
+    RESOURCES[name] = resource
+    return resource
+
+
+def register_check(
+    key: str,
+    title: str,
+    resources: Iterable[str],
+    evaluate: Callable[[Responses], Dict[str, Any]],
+    passed: Callable[[Dict[str, Any]], bool],
+    describe: Callable[[Dict[str, Any], CheckContext], Tuple[str, str, Dict[str, Any]]]
+) -> Check:
+    resources = tuple(resources)
+    unknown = [name for name in resources if name not in RESOURCES]
+    if unknown:
+        raise ValueError(f"Check {key!r} needs unregistered resources: {', '.join(unknown)}")
+    check = Check(key, title, resources, evaluate, passed, describe)
+    CHECKS[key] = check
+    return check
+
+
+def active_checks(cfg: Optional[Dict[str, Any]] = None) -> List[Check]:
+    """Registered checks that have a weight in the scoring config."""
+    weights = (cfg or REPORT_CONFIG)['scoring']['weights']
+    return [check for key, check in CHECKS.items() if key in weights]
+
+
+def checks_for(keys: Iterable[str]) -> List[Check]:
+    return [CHECKS[key] for key in keys]
+
+
+def required_resources(checks: Iterable[Check]) -> List[Resource]:
+    """Every distinct resource the checks read, in order of first use."""
+    seen: Dict[str, Resource] = {}
+    for check in checks:
+        for name in check.resources:
+            seen.setdefault(name, RESOURCES[name])
+    return list(seen.values())
+
+
+def evaluate_checks(responses: Responses, checks: Iterable[Check]) -> Dict[str, Any]:
+    """Merge every check's outcome flags into one dict."""
+    outcome: Dict[str, Any] = {}
+    for check in checks:
+        outcome.update(check.evaluate(responses))
+    return outcome
+
+
+def check_scores(outcome: Dict[str, Any], checks: Iterable[Check], weights: Dict[str, int]) -> Tuple[int, ...]:
+    """Points earned per check: its full weight when it passes, else nothing."""
+    return tuple(weights[check.key] if check.passed(outcome) else 0 for check in checks)
+
+
+def build_component(check: Check, outcome: Dict[str, Any], score: int, ctx: CheckContext) -> Dict[str, Any]:
+    weight = ctx.cfg['scoring']['weights'][check.key]
+    finding, detail, extra = check.describe(outcome, ctx)
+    copy = ctx.cfg['scoring'].get('componentsCopy', {}).get(check.key)
+    component = {
+        'key': check.key,
+        'component': check.title,
+        'weight': f"{weight}%",
+        'score': score,
+        'maxScore': weight,
+        'status': 'pass' if score > 0 else 'fail',
+        'finding': finding,
+        'detail': f"{copy}. {detail}" if copy else detail
+    }
+    component.update(extra)
+    return component
+
+
+register_resource(HOME, None, "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8")
+register_resource('robots', '/robots.txt', "text/plain, */*")
+# Twice the validation limit, since a UTF-16 body takes about half its size once re-encoded as UTF-8
+register_resource('ucp', '/.well-known/ucp', "application/json, */*", 2 * SCANNER_CONFIG['ucpValidation']['maxBytes'])
+
+
+# --- Robots.txt ---
+
+def _robots_evaluate(responses: Responses) -> Dict[str, Any]:
+    res = responses['robots']
+    body = res.get('body', '') or ''
+    return {
+        'robots_status': res.get('statusCode', 0) or 0,
+        'robots_error': bool(res.get('error')) or not body,
+        'robots_match': 'ucp' in body.lower()
+    }
+
+
+def _robots_passed(outcome: Dict[str, Any]) -> bool:
+    return not outcome['robots_error'] and outcome['robots_match']
+
+
+def _robots_describe(outcome: Dict[str, Any], ctx: CheckContext) -> Tuple[str, str, Dict[str, Any]]:
+    status = outcome['robots_status']
+    if outcome['robots_error']:
+        finding = 'robots.txt unreachable or empty'
+    elif outcome['robots_match']:
+        finding = 'UCP reference found in robots.txt'
+    else:
+        finding = 'No UCP directive in robots.txt'
+    return finding, f"Endpoint: {ctx.origin}/robots.txt; Status: {status or 'N/A'}", {}
+
+
+# --- /.well-known/ucp ---
+
+def _ucp_evaluate(responses: Responses) -> Dict[str, Any]:
+    res = responses['ucp']
+    status = res.get('statusCode', 0) or 0
+    outcome = {
+        'ucp_status': status,
+        'ucp_error': bool(res.get('error')) or status == 0,
+        'ucp_json_valid': False,
+        'ucp_findings': []
+    }
+    if not outcome['ucp_error'] and status == 200:
+        validation = validate_ucp_config(res.get('body', '') or '', truncated=bool(res.get('truncated')))
+        outcome['ucp_json_valid'] = validation['valid']
+        outcome['ucp_findings'] = validation['findings']
+    return outcome
+
+
+def _ucp_passed(outcome: Dict[str, Any]) -> bool:
+    return not outcome['ucp_error'] and outcome['ucp_status'] == 200 and outcome['ucp_json_valid']
+
+
+def _ucp_describe(outcome: Dict[str, Any], ctx: CheckContext) -> Tuple[str, str, Dict[str, Any]]:
+    status = outcome['ucp_status']
+    json_valid = outcome['ucp_json_valid']
+    endpoint = f"{ctx.origin}/.well-known/ucp"
+
+    if outcome['ucp_error']:
+        finding = 'UCP config unreachable (timeout or error)'
+        detail = f"Endpoint: {endpoint}; Status: {status or 'N/A'}"
+    elif status == 200:
+        if json_valid:
+            finding = 'UCP config found (valid JSON)'
+        else:
+            finding = 'UCP config found but invalid (JSON validation error)'
+        detail = f"Endpoint: {endpoint}; Status: {status}; JSON: {'valid' if json_valid else 'invalid/unknown'}"
+    else:
+        finding = f"UCP config missing or blocked (HTTP {status})"
+        detail = f"Endpoint: {endpoint}; Status: {status}"
+    return finding, detail, {'findings': list(outcome.get('ucp_findings') or [])}
+
+
+# --- HTTP headers ---
+
+def _headers_evaluate(responses: Responses) -> Dict[str, Any]:
+    res = responses[HOME]
+    status = res.get('statusCode', 0) or 0
+    outcome = {
+        'home_status': status,
+        'home_error': bool(res.get('error')) or status == 0,
+        'header_match': False,
+        'matched_headers': []
+    }
+    if not outcome['home_error'] and 200 <= status < 400:
+        matched = [m['header'] for m in match_ucp_headers(res.get('headers', {}) or {})]
+        outcome['matched_headers'] = matched
+        outcome['header_match'] = bool(matched)
+    return outcome
+
+
+def _headers_passed(outcome: Dict[str, Any]) -> bool:
+    home_ok = not outcome['home_error'] and 200 <= outcome['home_status'] < 400
+    return home_ok and outcome['header_match']
+
+
+def _headers_describe(outcome: Dict[str, Any], ctx: CheckContext) -> Tuple[str, str, Dict[str, Any]]:
+    status = outcome['home_status']
+    matched = list(outcome.get('matched_headers') or [])
+
+    if outcome['home_error']:
+        finding = 'Homepage unreachable (timeout or error)'
+        detail = f"Endpoint: {ctx.base_url}; Status: {status or 'N/A'}"
+    elif 200 <= status < 400:
+        has_ucp_header = outcome['header_match']
+        finding = 'UCP-related headers detected' if has_ucp_header else 'No UCP-related headers detected'
+        detail = f"Endpoint: {ctx.base_url}; Status: {status}"
+        if has_ucp_header and matched:
+            detail += f"; Matched: {', '.join(matched)}"
+    else:
+        finding = f"Homepage returned unexpected status (HTTP {status})"
+        detail = f"Endpoint: {ctx.base_url}; Status: {status}"
+    return finding, detail, {'matchedHeaders': matched}
+
+
+register_check('robots', 'Robots.txt UCP directive', ['robots'], _robots_evaluate, _robots_passed, _robots_describe)
+register_check('ucpConfig', 'UCP configuration file', ['ucp'], _ucp_evaluate, _ucp_passed, _ucp_describe)
+register_check('headers', 'UCP HTTP headers', [HOME], _headers_evaluate, _headers_passed, _headers_describe)
+
+# The checks the scanner shipped with, in their original order. probe_outcomes()
+# and batch_scorer.score_batch() cover exactly these.
+BUILTIN_CHECKS = ('robots', 'ucpConfig', 'headers')
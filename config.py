@@ -69,3 +69,87 @@ REPORT_CONFIG = {
     "crossBorderTemplateGeneric": "Cross-border note: This assessment is executed from the Netherlands (EU) while reviewing websites hosted in other jurisdictions. The scan is limited to public technical endpoints and performed in a compliance-oriented manner."
   }
 }
+
+SCANNER_CONFIG = {
+  "ucpValidation": {
+    "maxBytes": 65536,
+    "maxDepth": 16
+  },
+  "originCache": {
+    "ttlSeconds": 3600,
+    "maxEntries": 10000
+  },
+  "probeFetch": {
+    "workers": 32
+  },
+  "dns": {
+    "resolver": "system",
+    "maxEntries": 10000,
+    "defaultTtlSeconds": 300,
+    "minTtlSeconds": 5,
+    "maxTtlSeconds": 3600,
+    "negativeTtlSeconds": 60
+  },
+  "httpPool": {
+    "hosts": 256,
+    "connectionsPerHost": 4
+  },
+  "scheduler": {
+    "agingSeconds": 30,
+    "uiTokenTtlSeconds": 43200,
+    "uiCookieCrossSite": False,
+    "stages": {
+      "probe": {"capacity": 8, "budgets": {"interactive": 8, "bulk": 6}},
+      "render": {"capacity": 2, "budgets": {"interactive": 2, "bulk": 1}}
+    }
+  },
+  "rateLimit": {
+    "perHost": {"rate": 2, "burst": 4},
+    "perNetwork": {"rate": 10, "burst": 20},
+    "global": {"rate": 50, "burst": 100},
+    "maxRetries": 2,
+    "backoffBaseSeconds": 0.5,
+    "backoffMaxSeconds": 8,
+    "maxRetryAfterSeconds": 30,
+    "probeDeadlineSeconds": 45,
+    "maxBuckets": 10000
+  },
+  "reportFiles": {
+    "writeHtml": False
+  },
+  "artifacts": {
+    "compressExtensions": [".html", ".json", ".folded"],
+    "gzipLevel": 9,
+    "brotliQuality": 11,
+    "maxAgeSeconds": 31536000
+  },
+  "pdf": {
+    "backend": "native",
+    "fallback": "playwright",
+    "optimize": True,
+    "renderTimeoutSeconds": 45
+  },
+  "logging": {
+    "level": "INFO",
+    "format": "text",
+    "queueSize": 10000,
+    "sampling": {
+      "enabled": True,
+      "windowSeconds": 60,
+      "maxPerWindow": 10
+    }
+  },
+  "warmup": {
+    "enabled": True,
+    "browser": "auto",
+    "browserTimeoutSeconds": 60
+  },
+  "profiling": {
+    "enabled": False,
+    "header": "X-UCP-Profile",
+    "tokenHeader": "X-UCP-Profile-Token",
+    "sampleRate": 0.0,
+    "defaultMode": "sample",
+    "samplingIntervalMs": 5
+  }
+}
@@ -0,0 +1,256 @@
+import ipaddress
+import os
+import socket
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+    import metrics
+
+try:
+    import dns.exception
+    import dns.resolver as dns_resolver
+except ImportError:  # without dnspython, answers come from getaddrinfo with a fixed TTL
+    dns_resolver = None
+
+# One DNS answer per host per TTL, shared by the rate limiter and every probe
+# connection in the process. Concurrent lookups of the same host wait on a
+# single resolver call, and names that do not exist are remembered for a
+# short while too, so a batch of dead domains does not hammer the resolver.
+
+# Errors that mean "this name has no addresses", as opposed to "try again later"
+_NEGATIVE_ERRNOS = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+
+class Answer(NamedTuple):
+    addresses: Tuple[Tuple[int, str], ...]  # (address family, IP)
+    ttl: Optional[float]  # seconds, or None when the resolver does not say
+
+
+Resolver = Callable[[str], Answer]
+
+
+def _family_of(ip: str) -> int:
+    return socket.AF_INET6 if ':' in ip else socket.AF_INET
+
+
+def system_resolver(host: str) -> Answer:
+    """The platform resolver (hosts file, nsswitch, DNS). It does not report TTLs."""
+    addresses = []
+    for family, _, _, _, sockaddr in socket.getaddrinfo(host, None, 0, socket.SOCK_STREAM):
+        address = (family, sockaddr[0])
+        if address not in addresses:
+            addresses.append(address)
+    return Answer(tuple(addresses), None)
+
+
+def dnspython_resolver(host: str) -> Answer:
+    """
+    A and AAAA records straight from the configured nameservers, with their
+    TTLs. Names DNS does not know fall back to the system resolver, which also
+    reads the hosts file.
+    """
+    addresses: List[Tuple[int, str]] = []
+    ttls = []
+    try:
+        for rdtype, family in (('A', socket.AF_INET), ('AAAA', socket.AF_INET6)):
+            answer = dns_resolver.resolve(host, rdtype, raise_on_no_answer=False)
+            if answer.rrset is not None:
+                ttls.append(answer.rrset.ttl)
+                addresses.extend((family, record.address) for record in answer.rrset)
+    except dns_resolver.NXDOMAIN:
+        pass
+    except (dns.exception.Timeout, dns_resolver.NoNameservers) as e:
+        raise socket.gaierror(socket.EAI_AGAIN, f"Temporary failure in name resolution: {e}") from e
+    if not addresses:
+        return system_resolver(host)
+    return Answer(tuple(addresses), min(ttls))
+
+
+class StubResolver:
+    """
+    Answers from a fixed table and counts lookups per host; for tests and local
+    benchmarks. Unknown names fail like a real NXDOMAIN.
+    """
+
+    def __init__(self, records: Optional[Dict[str, Iterable[str]]] = None, ttl: Optional[float] = 60, delay: float = 0.0):
+        self.records = {host.lower(): list(ips) for host, ips in (records or {}).items()}
+        self.ttl = ttl
+        self.delay = delay
+        self.calls: Counter = Counter()
+
+    def add(self, host: str, *ips: str) -> None:
+        self.records[host.lower()] = list(ips)
+
+    def __call__(self, host: str) -> Answer:
+        self.calls[host] += 1
+        if self.delay:
+            time.sleep(self.delay)
+        ips = self.records.get(host)
+        if not ips:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        return Answer(tuple((_family_of(ip), ip) for ip in ips), self.ttl)
+
+
+class _Entry(NamedTuple):
+    expires: float
+    addresses: Tuple[Tuple[int, str], ...]
+    error: Optional[socket.gaierror]
+
+
+class _Lookup:
+    """An in-flight resolution other callers for the same host wait on."""
+
+    __slots__ = ('done', 'addresses', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.addresses: Tuple[Tuple[int, str], ...] = ()
+        self.error: Optional[BaseException] = None
+
+
+class DNSCache:
+    """
+    Size-bounded, TTL-respecting cache in front of a resolver function.
+    Answers live for the resolver's TTL clamped to [minTtlSeconds,
+    maxTtlSeconds] (defaultTtlSeconds when it reports none); "no such name"
+    answers for negativeTtlSeconds. Temporary failures are not cached.
+    The least recently used entry is dropped once maxEntries is reached.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], resolver: Optional[Resolver] = None, clock: Callable[[], float] = time.monotonic):
+        self.cfg = cfg
+        if resolver is None:
+            use_dnspython = cfg['resolver'] == 'dnspython' and dns_resolver is not None
+            if cfg['resolver'] == 'dnspython' and dns_resolver is None:
+                logger.warning("dnspython is not installed; using the system resolver")
+            resolver = dnspython_resolver if use_dnspython else system_resolver
+        self.resolver = resolver
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._inflight: Dict[str, _Lookup] = {}
+        self._counts: Counter = Counter()
+        self._resolve_seconds = 0.0
+
+    def _ttl(self, answer: Answer) -> float:
+        if answer.ttl is None:
+            return self.cfg['defaultTtlSeconds']
+        return min(self.cfg['maxTtlSeconds'], max(self.cfg['minTtlSeconds'], answer.ttl))
+
+    def _count(self, name: str) -> None:
+        # Caller holds self._lock
+        self._counts[name] += 1
+        metrics.incr(f"dns.{name}")
+
+    def lookup(self, host: str) -> Tuple[Tuple[int, str], ...]:
+        """(family, IP) pairs for `host`; raises socket.gaierror like getaddrinfo."""
+        host = host.lower().rstrip('.')
+        try:
+            ipaddress.ip_address(host)
+            return ((_family_of(host), host),)
+        except ValueError:
+            pass
+
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry.expires > self._clock():
+                self._entries.move_to_end(host)
+                if entry.error is not None:
+                    self._count('negative_hits')
+                    raise socket.gaierror(entry.error.errno, entry.error.strerror)
+                self._count('hits')
+                return entry.addresses
+            lookup = self._inflight.get(host)
+            owner = lookup is None
+            if owner:
+                lookup = self._inflight[host] = _Lookup()
+                self._count('misses')
+            else:
+                self._count('coalesced')
+
+        if not owner:
+            lookup.done.wait()
+            if lookup.error is not None:
+                raise lookup.error
+            return lookup.addresses
+
+        started = time.perf_counter()
+        try:
+            answer = self.resolver(host)
+            if not answer.addresses:
+                raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+            lookup.addresses = answer.addresses
+        except BaseException as e:
+            lookup.error = e
+        elapsed = time.perf_counter() - started
+        metrics.observe('dns.resolve_seconds', elapsed)
+
+        with self._lock:
+            self._resolve_seconds += elapsed
+            del self._inflight[host]
+            entry = None
+            if lookup.error is None:
+                entry = _Entry(self._clock() + self._ttl(answer), lookup.addresses, None)
+            elif isinstance(lookup.error, socket.gaierror) and lookup.error.errno in _NEGATIVE_ERRNOS:
+                entry = _Entry(self._clock() + self.cfg['negativeTtlSeconds'], (), lookup.error)
+                self._count('negative')
+            else:
+                self._count('failures')
+            if entry is not None:
+                self._entries[host] = entry
+                self._entries.move_to_end(host)
+                while len(self._entries) > self.cfg['maxEntries']:
+                    self._entries.popitem(last=False)
+        lookup.done.set()
+
+        if lookup.error is not None:
+            raise lookup.error
+        return lookup.addresses
+
+    def getaddrinfo(self, host: str, port: int, family: int = 0, type: int = socket.SOCK_STREAM) -> List[tuple]:
+        """socket.getaddrinfo-shaped results for `host` from the cache."""
+        results = []
+        for af, ip in self.lookup(host):
+            if family not in (0, socket.AF_UNSPEC, af):
+                continue
+            sockaddr = (ip, port) if af == socket.AF_INET else (ip, port, 0, 0)
+            results.append((af, type, socket.IPPROTO_TCP, '', sockaddr))
+        if not results:
+            raise socket.gaierror(socket.EAI_NONAME, f"No address of the requested family for {host}")
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            lookups = counts.get('hits', 0) + counts.get('negative_hits', 0) + counts.get('misses', 0) + counts.get('coalesced', 0)
+            answered = lookups - counts.get('misses', 0)
+            return {
+                'entries': len(self._entries),
+                'inflight': len(self._inflight),
+                **counts,
+                'hitRate': round(answered / lookups, 4) if lookups else 0.0,
+                'resolveSeconds': round(self._resolve_seconds, 4),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _reset_after_fork(self) -> None:
+        # A lookup in flight in the parent will never finish here
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+
+dns_cache = DNSCache(SCANNER_CONFIG['dns'])
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=dns_cache._reset_after_fork)
@@ -0,0 +1,236 @@
+import hashlib
+import ipaddress
+import math
+import os
+import re
+import sqlite3
+import tempfile
+from typing import Dict, Any, List, Optional, Iterable, Iterator, NamedTuple, Callable, Tuple
+from urllib.parse import urlsplit
+try:
+    from .logger import logger
+except ImportError:
+    from logger import logger
+
+_LABEL_RE = re.compile(r'^(?!-)[a-z0-9-]{1,63}(?<!-)$')
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class CanonicalDomain(NamedTuple):
+    key: str         # origin key used for dedupe: host without "www.", plus any non-default port
+    base_url: str    # what we scan: scheme://host[:port], https unless the input said otherwise
+    host: str
+    raw: str
+    line_no: int
+
+
+class Reject(NamedTuple):
+    raw: str
+    line_no: int
+    reason: str
+
+
+def canonicalize(raw: str, line_no: int = 0) -> Tuple[Optional[CanonicalDomain], Optional[str]]:
+    """
+    Turn one user-supplied URL or domain into a CanonicalDomain.
+    Returns (entry, None) on success or (None, reason) if the input is not a scannable domain.
+    Paths, queries and fragments are dropped; we scan origins.
+    """
+    text = raw.strip()
+    if not text:
+        return None, 'empty'
+    if any(c.isspace() for c in text):
+        return None, 'contains whitespace'
+
+    if '://' not in text:
+        text = f"https://{text}"
+    try:
+        parts = urlsplit(text)
+        port = parts.port
+    except ValueError as e:
+        return None, f"unparseable ({e})"
+
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        return None, f"unsupported scheme {scheme!r}"
+    if parts.username or parts.password:
+        return None, 'credentials in URL'
+
+    host = (parts.hostname or '').rstrip('.')
+    if not host:
+        return None, 'missing host'
+    try:
+        ipaddress.ip_address(host)
+        return None, 'IP address, not a domain'
+    except ValueError:
+        pass
+    try:
+        host = host.encode('idna').decode('ascii').lower()
+    except UnicodeError:
+        return None, 'invalid internationalized domain'
+
+    labels = host.split('.')
+    if len(host) > 253 or len(labels) < 2:
+        return None, 'not a fully qualified domain'
+    if not all(_LABEL_RE.match(label) for label in labels):
+        return None, 'invalid hostname characters'
+    if labels[-1].isdigit():
+        return None, 'numeric top-level domain'
+
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    key_host = host[4:] if host.startswith('www.') and len(labels) > 2 else host
+    key = key_host if netloc == host else f"{key_host}:{port}"
+    # The key ignores the scheme: http:// and https:// variants are the same site for dedupe
+    return CanonicalDomain(key, f"{scheme}://{netloc}", host, raw.strip(), line_no), None
+
+
+class ExactDeduper:
+    """
+    Exact set membership with bounded memory. Keys are kept in an in-memory set
+    until `max_memory_keys`, then flushed to a temporary SQLite file on disk.
+    """
+
+    def __init__(self, max_memory_keys: int = 1_000_000, spill_dir: Optional[str] = None):
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self._memory = set()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[str] = None
+
+    def _spill(self) -> None:
+        if self._db is None:
+            fd, self._db_path = tempfile.mkstemp(prefix='ucp_dedupe_', suffix='.sqlite', dir=self.spill_dir)
+            os.close(fd)
+            self._db = sqlite3.connect(self._db_path)
+            self._db.execute('PRAGMA journal_mode=OFF')
+            self._db.execute('PRAGMA synchronous=OFF')
+            self._db.execute('CREATE TABLE keys (k TEXT PRIMARY KEY) WITHOUT ROWID')
+            logger.info("Dedupe set exceeded %s keys; spilling to %s", self.max_memory_keys, self._db_path)
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO keys VALUES (?)', ((k,) for k in self._memory))
+        self._memory.clear()
+
+    def add(self, key: str) -> bool:
+        """Add `key`; returns True if it was not seen before."""
+        if key in self._memory:
+            return False
+        if self._db is not None and self._db.execute('SELECT 1 FROM keys WHERE k = ?', (key,)).fetchone():
+            return False
+        self._memory.add(key)
+        if len(self._memory) >= self.max_memory_keys:
+            self._spill()
+        return True
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            os.remove(self._db_path)
+            self._db = None
+
+
+class BloomDeduper:
+    """
+    Fixed-size Bloom filter. Uses ~1.8 MB per million keys at the default
+    0.1% error rate, however long the list is. A false positive drops a key
+    that was really new.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> bool:
+        """Add `key`; returns True if it was (probably) not seen before."""
+        new = False
+        bits = self._bits
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        return new
+
+    def close(self) -> None:
+        pass
+
+
+class DomainListReport:
+    """Counts for one pass over a domain list, plus a bounded sample of rejects."""
+
+    def __init__(self, max_reject_samples: int = 1000):
+        self.max_reject_samples = max_reject_samples
+        self.total = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.reject_reasons: Dict[str, int] = {}
+        self.reject_samples: List[Reject] = []
+
+    def add_reject(self, reject: Reject) -> None:
+        self.rejected += 1
+        reason = reject.reason.split(' (')[0]
+        self.reject_reasons[reason] = self.reject_reasons.get(reason, 0) + 1
+        if len(self.reject_samples) < self.max_reject_samples:
+            self.reject_samples.append(reject)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+            'rejectReasons': dict(self.reject_reasons),
+            'rejectSamples': [r._asdict() for r in self.reject_samples]
+        }
+
+
+def stream_domains(
+    lines: Iterable[str],
+    mode: str = 'exact',
+    report: Optional[DomainListReport] = None,
+    on_reject: Optional[Callable[[Reject], None]] = None,
+    **dedupe_options: Any
+) -> Iterator[CanonicalDomain]:
+    """
+    Canonicalize and dedupe a domain list lazily, one line at a time.
+    Yields the first entry seen for each origin. Rejects are recorded in
+    `report` and passed to `on_reject`. `mode` is 'exact' (set with disk
+    spill) or 'bloom' (fixed memory, small false-positive rate).
+    Blank lines and lines starting with '#' are skipped.
+    """
+    if mode == 'exact':
+        deduper = ExactDeduper(**dedupe_options)
+    elif mode == 'bloom':
+        deduper = BloomDeduper(**dedupe_options)
+    else:
+        raise ValueError(f"Unknown dedupe mode: {mode}")
+    report = report if report is not None else DomainListReport()
+
+    try:
+        for line_no, line in enumerate(lines, start=1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            report.total += 1
+            entry, reason = canonicalize(stripped, line_no)
+            if entry is None:
+                reject = Reject(stripped, line_no, reason)
+                report.add_reject(reject)
+                if on_reject:
+                    on_reject(reject)
+                continue
+            if not deduper.add(entry.key):
+                report.duplicates += 1
+                continue
+            report.accepted += 1
+            yield entry
+    finally:
+        deduper.close()
@@ -0,0 +1,29 @@
+# Gunicorn settings, read from the working directory: `gunicorn app:app`
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+# Threaded workers let the priority scheduler interleave interactive and bulk
+# scans within each worker.
+worker_class = 'gthread'
+threads = 8
+timeout = 120
+
+# Import the app once in the master so workers fork with modules, templates
+# and caches already loaded. UCP_WARMUP=0 restores a cold start.
+preload_app = os.environ.get('UCP_WARMUP', '1') not in ('0', 'false', 'off')
+
+
+def when_ready(server):
+    # Master, after the app is loaded and before the first fork
+    if server.cfg.preload_app:
+        from app import app
+        from warmup import warm_process
+        warm_process(app)
+
+
+def post_fork(server, worker):
+    # HTTP pool and browser thread are per process; /readyz turns 200 once done
+    from app import app
+    from warmup import start_warmup
+    start_warmup(app)
@@ -0,0 +1,51 @@
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+# Header names that advertise UCP support (e.g. "UCP-Config", "X-UCP-Version").
+UCP_HEADER_NAME_PATTERNS = (
+    r'ucp',
+    r'universal-content-protocol',
+)
+
+# Header values that reference UCP (e.g. "X-Robots-Tag: UCP-Enabled"). "ucp" must stand
+# alone as a token so random tokens in cookies or ids do not count as a match.
+UCP_HEADER_VALUE_PATTERNS = (
+    r'(?<![a-z0-9])ucp(?![a-z0-9])',
+    r'universal-content-protocol',
+)
+
+_NAME_RE = re.compile('|'.join(UCP_HEADER_NAME_PATTERNS))
+_VALUE_RE = re.compile('|'.join(UCP_HEADER_VALUE_PATTERNS), re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _name_matches(lower_name: str) -> bool:
+    # Header names repeat heavily across hosts, so the result is cached per name.
+    return _NAME_RE.search(lower_name) is not None
+
+
+class HeaderIndex:
+    """Header dict indexed by lower-cased name, for case-insensitive matching."""
+
+    __slots__ = ('_entries',)
+
+    def __init__(self, headers: Optional[Dict[str, Any]]):
+        self._entries = {}
+        for name, value in (headers or {}).items():
+            self._entries[name.lower()] = (name, '' if value is None else str(value))
+
+    def match_ucp(self) -> List[Dict[str, str]]:
+        """Return the headers whose name or value matches a UCP pattern."""
+        matches = []
+        for lower_name, (name, value) in self._entries.items():
+            if _name_matches(lower_name):
+                matches.append({'header': name, 'value': value, 'matchedOn': 'name'})
+            elif value and _VALUE_RE.search(value):
+                matches.append({'header': name, 'value': value, 'matchedOn': 'value'})
+        return matches
+
+
+def match_ucp_headers(headers: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Index a header dict and return its UCP matches."""
+    return HeaderIndex(headers).match_ucp()
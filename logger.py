@@ -1,19 +1,207 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+try:
+    from .config import SCANNER_CONFIG
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    import metrics
+
+# Correlation id of the scan the current thread (or context) is working on
+scan_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('scan_id', default=None)
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'scan_id', 'suppressed'}
+
+
+@contextmanager
+def scan_context(scan_id: Optional[str]):
+    """Tag every record logged inside the block with `scan_id`."""
+    reset = scan_id_var.set(scan_id)
+    try:
+        yield
+    finally:
+        scan_id_var.reset(reset)
+
+
+class ScanContextFilter(logging.Filter):
+    """Copies the current scan id onto the record in the thread that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.scan_id = scan_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets at most `max_per_window` WARNING records per message template
+    through each window; other levels always pass. Templates are grouped
+    before %-formatting, so 'Request failed for %s' counts as one message
+    whatever the URL. The next record let through carries the number dropped
+    as `suppressed`.
+    """
+
+    def __init__(self, window_seconds: float = 60, max_per_window: int = 10):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.max_per_window = max_per_window
+        self._lock = threading.Lock()
+        self._windows: Dict[Tuple[str, Any], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                if len(self._windows) >= 10_000:
+                    self._windows.clear()
+                suppressed = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+            if window[1] >= self.max_per_window:
+                window[2] += 1
+                metrics.incr('log.suppressed')
+                return False
+            window[1] += 1
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line format, with the scan id and suppression count appended when set."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        scan_id = getattr(record, 'scan_id', None)
+        suppressed = getattr(record, 'suppressed', 0)
+        if scan_id:
+            line = f"{line} [scan {scan_id}]"
+        if suppressed:
+            line = f"{line} ({suppressed} similar messages suppressed)"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for log shippers. Extra record attributes are included as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        scan_id = getattr(record, 'scan_id', None)
+        if scan_id:
+            entry['scan_id'] = scan_id
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without waiting on stderr. When the
+    queue is full the record is dropped and counted, rather than stalling a scan.
+    """
+
+    def __init__(self, log_queue: queue.Queue, formatter: logging.Formatter):
+        super().__init__(log_queue)
+        self._exc_formatter = formatter
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks here, while the objects they refer to
+        # are still alive, but leave line formatting to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.incr('log.dropped')
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _build_formatter(fmt: str) -> logging.Formatter:
+    if fmt == 'json':
+        return JsonFormatter()
+    return TextFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+
+def _start_listener(handler: NonBlockingQueueHandler, output: logging.Handler) -> None:
+    global _listener
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread (also runs at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logger(name: str = "ucp_scanner") -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
+    cfg = SCANNER_CONFIG['logging']
+    logger.setLevel(os.environ.get('UCP_LOG_LEVEL', cfg['level']).upper())
+
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stderr)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
+        formatter = _build_formatter(os.environ.get('UCP_LOG_FORMAT', cfg['format']))
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(formatter)
+
+        handler = NonBlockingQueueHandler(queue.Queue(cfg['queueSize']), formatter)
+        # Filters run in the logging thread: the context var is read there, and
+        # sampled-out records are never copied onto the queue
+        handler.addFilter(ScanContextFilter())
+        sampling = cfg['sampling']
+        if sampling['enabled']:
+            handler.addFilter(SamplingFilter(sampling['windowSeconds'], sampling['maxPerWindow']))
         logger.addHandler(handler)
-        
+
+        _start_listener(handler, output)
+        atexit.register(stop_logging)
+        # The listener thread does not survive fork (gunicorn workers); give each child its own
+        if hasattr(os, 'register_at_fork'):
+            def _restart_in_child():
+                handler.queue = queue.Queue(cfg['queueSize'])
+                _start_listener(handler, output)
+            os.register_at_fork(after_in_child=_restart_in_child)
+
     return logger
 
 logger = setup_logger()
@@ -0,0 +1,53 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+# In-process counters and timings, exposed as JSON on /metrics.
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+_suppressed: contextvars.ContextVar = contextvars.ContextVar('metrics_suppressed', default=False)
+
+@contextmanager
+def suppressed() -> Iterator[None]:
+    """Drop everything recorded in this context (e.g. warmup work on canned data)."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+def incr(name: str, value: float = 1) -> None:
+    """Add `value` to a counter."""
+    if _suppressed.get():
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration sample; count, total and max are kept per name."""
+    if _suppressed.get():
+        return
+    with _lock:
+        t = _timings.get(name)
+        if t is None:
+            t = _timings[name] = {'count': 0, 'sum': 0.0, 'max': 0.0}
+        t['count'] += 1
+        t['sum'] += seconds
+        if seconds > t['max']:
+            t['max'] = seconds
+
+def snapshot() -> Dict[str, Any]:
+    """Return a copy of all counters and timings (with averages)."""
+    with _lock:
+        timings = {
+            name: dict(t, avg=(t['sum'] / t['count']) if t['count'] else 0.0)
+            for name, t in _timings.items()
+        }
+        return {'counters': dict(_counters), 'timings': timings}
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _timings.clear()
@@ -0,0 +1,574 @@
+import math
+import time
+import zlib
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+try:
+    from .logger import logger
+    from .cancellation import CancelToken, check_cancelled
+    from .reporter import report_status, recommendation_copy, format_review_date
+except ImportError:
+    from logger import logger
+    from cancellation import CancelToken, check_cancelled
+    from reporter import report_status, recommendation_copy, format_review_date
+
+# Draws the same layout as reporter.generate_report (header, gauge, component
+# cards, recommendations, disclaimer) directly as PDF vector operators, with
+# the standard Helvetica and Courier fonts every PDF viewer ships. No browser,
+# no font files, no third-party packages.
+
+PAGE_WIDTH = 595.28   # A4 in points
+PAGE_HEIGHT = 841.89
+PAD = 30              # page padding, matches the 40px HTML padding at 0.75pt/px
+BOTTOM_MARGIN = 36
+
+REGULAR = 'F1'
+BOLD = 'F2'
+MONO = 'F3'
+_BASE_FONTS = {REGULAR: 'Helvetica', BOLD: 'Helvetica-Bold', MONO: 'Courier'}
+
+# Advance widths (1/1000 em) for WinAnsi codes 32..126, from the Adobe core font metrics
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Bullet, dashes and curly quotes; other non-ASCII letters use an average width
+_WINANSI_EXTRA_WIDTHS = {0x91: 222, 0x92: 222, 0x93: 333, 0x94: 333, 0x95: 350, 0x96: 556, 0x97: 1000}
+_DEFAULT_WIDTH = 556
+
+# Colours from the HTML report stylesheet
+DARK = '#0f172a'
+SLATE_800 = '#1e293b'
+TEXT_MAIN = '#1f2937'
+TEXT_MUTED = '#6b7280'
+SLATE_500 = '#64748b'
+SLATE_400 = '#94a3b8'
+BORDER = '#e5e7eb'
+SOFT_BG = '#f8fafc'
+SOFT_BORDER = '#e2e8f0'
+AMBER = '#fbbf24'
+AMBER_DARK = '#d97706'
+BLUE_400 = '#60a5fa'
+
+
+def _encode(text: str) -> bytes:
+    return str(text).encode('cp1252', 'replace')
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """Width of `text` in points when set in `font` at `size`."""
+    data = _encode(text)
+    if font == MONO:
+        return len(data) * 0.6 * size
+    table = _HELVETICA_BOLD_WIDTHS if font == BOLD else _HELVETICA_WIDTHS
+    total = 0
+    for code in data:
+        if 32 <= code <= 126:
+            total += table[code - 32]
+        else:
+            total += _WINANSI_EXTRA_WIDTHS.get(code, _DEFAULT_WIDTH)
+    return total * size / 1000
+
+
+Run = Tuple[str, str]  # (text, font)
+
+
+def wrap_runs(runs: List[Run], size: float, width: float) -> List[List[Run]]:
+    """
+    Greedy word wrap of mixed-font text into lines no wider than `width`.
+    Explicit newlines start a new line; words longer than a line are split.
+    """
+    lines: List[List[Run]] = [[]]
+    line_width = 0.0
+    space = {font: text_width(' ', font, size) for font in _BASE_FONTS}
+
+    def push(word: str, font: str) -> None:
+        nonlocal line_width
+        w = text_width(word, font, size)
+        gap = space[font] if lines[-1] else 0
+        if lines[-1] and line_width + gap + w > width:
+            lines.append([])
+            line_width, gap = 0.0, 0
+        while w > width and len(word) > 1:
+            # Hard-break a long token (URLs) at the last character that still fits
+            room = width - line_width - gap
+            cut, used = 0, 0.0
+            while cut < len(word) - 1:
+                used += text_width(word[cut], font, size)
+                if used > room:
+                    break
+                cut += 1
+            cut = max(cut, 1)
+            lines[-1].append(((' ' if gap else '') + word[:cut], font))
+            lines.append([])
+            line_width, gap = 0.0, 0
+            word = word[cut:]
+            w = text_width(word, font, size)
+        lines[-1].append(((' ' if gap else '') + word, font))
+        line_width += gap + w
+
+    for text, font in runs:
+        for i, paragraph in enumerate(str(text).split('\n')):
+            if i:
+                lines.append([])
+                line_width = 0.0
+            for word in paragraph.split():
+                push(word, font)
+    return lines
+
+
+def wrap(text: str, font: str, size: float, width: float) -> List[str]:
+    return [''.join(t for t, _ in line) for line in wrap_runs([(text, font)], size, width)]
+
+
+def hard_wrap(text: str, font: str, size: float, width: float) -> List[str]:
+    """Break preformatted text (code) into pieces no wider than `width`, keeping its spacing."""
+    pieces: List[str] = []
+    start, used = 0, 0.0
+    for i, ch in enumerate(text):
+        w = text_width(ch, font, size)
+        if used + w > width and i > start:
+            pieces.append(text[start:i])
+            start, used = i, 0.0
+        used += w
+    pieces.append(text[start:])
+    return pieces
+
+
+def _rgb(color: str) -> str:
+    color = color.lstrip('#')
+    return ' '.join(f"{int(color[i:i + 2], 16) / 255:.3f}" for i in (0, 2, 4))
+
+
+def _tint(color: str, alpha: float, over: str = '#ffffff') -> str:
+    """Blend `color` at `alpha` over a solid background, standing in for CSS transparency."""
+    fg = [int(color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)]
+    bg = [int(over.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)]
+    return '#' + ''.join(f"{round(f * alpha + b * (1 - alpha)):02x}" for f, b in zip(fg, bg))
+
+
+def _pdf_string(text: str) -> str:
+    data = _encode(text).replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return '(' + data.decode('latin-1') + ')'
+
+
+class PdfCanvas:
+    """
+    Collects drawing operators per page. Coordinates are in points from the
+    top-left corner, as in the HTML layout; they are flipped to PDF space here.
+    """
+
+    def __init__(self):
+        self.pages: List[List[str]] = []
+        self.new_page()
+
+    def new_page(self) -> None:
+        self.pages.append([])
+        self.ops = self.pages[-1]
+
+    def _y(self, y: float) -> float:
+        return PAGE_HEIGHT - y
+
+    def _path_rect(self, x: float, y: float, w: float, h: float, r: float) -> None:
+        if r <= 0:
+            self.ops.append(f"{x:.2f} {self._y(y + h):.2f} {w:.2f} {h:.2f} re")
+            return
+        r = min(r, w / 2, h / 2)
+        k = r * 0.5523
+        top, bottom = self._y(y), self._y(y + h)
+        self.ops.append(
+            f"{x + r:.2f} {top:.2f} m {x + w - r:.2f} {top:.2f} l "
+            f"{x + w - r + k:.2f} {top:.2f} {x + w:.2f} {top - r + k:.2f} {x + w:.2f} {top - r:.2f} c "
+            f"{x + w:.2f} {bottom + r:.2f} l "
+            f"{x + w:.2f} {bottom + r - k:.2f} {x + w - r + k:.2f} {bottom:.2f} {x + w - r:.2f} {bottom:.2f} c "
+            f"{x + r:.2f} {bottom:.2f} l "
+            f"{x + r - k:.2f} {bottom:.2f} {x:.2f} {bottom + r - k:.2f} {x:.2f} {bottom + r:.2f} c "
+            f"{x:.2f} {top - r:.2f} l "
+            f"{x:.2f} {top - r + k:.2f} {x + r - k:.2f} {top:.2f} {x + r:.2f} {top:.2f} c h"
+        )
+
+    def rect(
+        self, x: float, y: float, w: float, h: float,
+        fill: Optional[str] = None, stroke: Optional[str] = None,
+        line_width: float = 0.75, radius: float = 0
+    ) -> None:
+        if fill:
+            self.ops.append(f"{_rgb(fill)} rg")
+        if stroke:
+            self.ops.append(f"{_rgb(stroke)} RG {line_width:.2f} w")
+        self._path_rect(x, y, w, h, radius)
+        self.ops.append('B' if fill and stroke else 'f' if fill else 'S')
+
+    def circle(self, cx: float, cy: float, r: float, fill: str) -> None:
+        self.rect(cx - r, cy - r, 2 * r, 2 * r, fill=fill, radius=r)
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, color: str, line_width: float = 0.75, cap: int = 0) -> None:
+        self.ops.append(
+            f"{_rgb(color)} RG {line_width:.2f} w {cap} J "
+            f"{x1:.2f} {self._y(y1):.2f} m {x2:.2f} {self._y(y2):.2f} l S"
+        )
+
+    def polyline(self, points: List[Tuple[float, float]], color: str, line_width: float) -> None:
+        path = ' '.join(
+            f"{x:.2f} {self._y(y):.2f} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(points)
+        )
+        self.ops.append(f"{_rgb(color)} RG {line_width:.2f} w 1 J 1 j {path} S")
+
+    def arc(self, cx: float, cy: float, r: float, start: float, end: float, color: str, line_width: float) -> None:
+        """Stroke a circular arc; angles in degrees, counter-clockwise from 3 o'clock."""
+        segments = max(1, math.ceil(abs(end - start) / 90))
+        step = math.radians(end - start) / segments
+        k = 4 / 3 * math.tan(step / 4)
+        cy_pdf = self._y(cy)
+        a = math.radians(start)
+        path = [f"{cx + r * math.cos(a):.2f} {cy_pdf + r * math.sin(a):.2f} m"]
+        for _ in range(segments):
+            b = a + step
+            x0, y0 = cx + r * math.cos(a), cy_pdf + r * math.sin(a)
+            x3, y3 = cx + r * math.cos(b), cy_pdf + r * math.sin(b)
+            x1, y1 = x0 - k * r * math.sin(a), y0 + k * r * math.cos(a)
+            x2, y2 = x3 + k * r * math.sin(b), y3 - k * r * math.cos(b)
+            path.append(f"{x1:.2f} {y1:.2f} {x2:.2f} {y2:.2f} {x3:.2f} {y3:.2f} c")
+            a = b
+        self.ops.append(f"{_rgb(color)} RG {line_width:.2f} w 1 J {' '.join(path)} S")
+
+    def text(self, x: float, baseline: float, runs, size: float, color: str, align: str = 'left') -> None:
+        """Draw one line of text; `runs` is a string (regular) or a list of (text, font) runs."""
+        if isinstance(runs, str):
+            runs = [(runs, REGULAR)]
+        if align != 'left':
+            width = sum(text_width(t, f, size) for t, f in runs)
+            x -= width / 2 if align == 'center' else width
+        parts = []
+        for t, font in runs:
+            parts.append(f"/{font} {size:.2f} Tf {_pdf_string(t)} Tj")
+        self.ops.append(f"BT {_rgb(color)} rg {x:.2f} {self._y(baseline):.2f} Td {' '.join(parts)} ET")
+
+
+def _build_document(pages: List[List[str]], title: str) -> bytes:
+    """Serialize pages of operators into a PDF file with Flate-compressed content streams."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b'')  # filled in once the page tree exists
+    pages_id = add(b'')
+    font_ids = {
+        name: add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode())
+        for name, base in _BASE_FONTS.items()
+    }
+    fonts = ' '.join(f"/{name} {oid} 0 R" for name, oid in font_ids.items())
+    page_ids = []
+    for ops in pages:
+        stream = zlib.compress('\n'.join(ops).encode('latin-1'), 9)
+        content_id = add(
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R >>".encode()
+        ))
+    kids = ' '.join(f"{pid} 0 R" for pid in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+    info = add(f"<< /Title {_pdf_string(title)} /Producer (UCP Compliance Scanner) >>".encode())
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for oid, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{oid} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += ''.join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R /Info {info} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+# A block is a fixed-height slice of the page: (height, draw(top_y))
+Block = Tuple[float, Callable[[float], None]]
+
+
+class _Flow:
+    """Stacks blocks down the page, starting a new page when the next one does not fit."""
+
+    def __init__(self, canvas: PdfCanvas, cancel_token: Optional[CancelToken]):
+        self.canvas = canvas
+        self.cancel_token = cancel_token
+        self.y = 0.0
+
+    def fits(self, height: float) -> bool:
+        return self.y + height <= PAGE_HEIGHT - BOTTOM_MARGIN
+
+    def break_page(self) -> None:
+        check_cancelled(self.cancel_token)
+        self.canvas.new_page()
+        self.y = PAD
+
+    def place(self, block: Block) -> float:
+        height, draw = block
+        if not self.fits(height) and self.y > PAD:
+            self.break_page()
+        top = self.y
+        draw(top)
+        self.y += height
+        return top
+
+    def space(self, height: float) -> None:
+        self.y = min(self.y + height, PAGE_HEIGHT - BOTTOM_MARGIN)
+
+    def boxed(self, blocks: List[Block], x: float, w: float, stroke: str, radius: float = 9) -> None:
+        """Place blocks and outline each contiguous run of them, splitting the box at page breaks."""
+        run_top = None
+        for block in blocks:
+            if not self.fits(block[0]) and self.y > PAD and run_top is not None:
+                self.canvas.rect(x, run_top, w, self.y - run_top, stroke=stroke, radius=radius)
+                run_top = None
+            top = self.place(block)
+            if run_top is None:
+                run_top = top
+        if run_top is not None:
+            self.canvas.rect(x, run_top, w, self.y - run_top, stroke=stroke, radius=radius)
+
+
+def _text_blocks(
+    canvas: PdfCanvas, lines: List[List[Run]], x: float, size: float, color: str,
+    leading: float = 1.5, background: Optional[Callable[[float, float], None]] = None
+) -> List[Block]:
+    """One block per wrapped line, so long text can continue on the next page."""
+    line_height = size * leading
+    blocks = []
+    for line in lines:
+        def draw(top: float, line=line) -> None:
+            if background:
+                background(top, line_height)
+            canvas.text(x, top + (line_height + size * 0.7) / 2, line, size, color)
+        blocks.append((line_height, draw))
+    return blocks
+
+
+def build_pdf(data: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> bytes:
+    """Lay out a scored result (as returned by calculate_score) as an A4 PDF."""
+    check_cancelled(cancel_token)
+    cfg = data.get('report', {})
+    if not cfg:
+        from config import REPORT_CONFIG
+        cfg = REPORT_CONFIG
+
+    score = data.get('weightedAverage', 0)
+    host = str(data.get('host') or '')
+    status_color, status_bg, status_text = report_status(score, cfg)
+
+    canvas = PdfCanvas()
+    flow = _Flow(canvas, cancel_token)
+    content_w = PAGE_WIDTH - 2 * PAD
+
+    # Header
+    header_h = 96
+    canvas.rect(0, 0, PAGE_WIDTH, header_h, fill=DARK)
+    dot = _tint('#6366f1', 0.1, DARK)
+    for gx in range(8, int(PAGE_WIDTH), 15):
+        for gy in range(8, header_h, 15):
+            canvas.circle(gx, gy, 0.75, dot)
+    canvas.text(PAD, PAD + 21, [('UCP ', BOLD)], 21, '#ffffff')
+    canvas.text(PAD + text_width('UCP ', BOLD, 21), PAD + 21, [('SCANNER', BOLD)], 21, BLUE_400)
+    canvas.text(PAD, PAD + 40, 'Universal Content Protocol Assessment', 9.75, SLATE_400)
+    pill_w = text_width(status_text, BOLD, 9.75) + 40
+    pill_x = PAGE_WIDTH - PAD - pill_w
+    canvas.rect(pill_x, PAD, pill_w, 24, fill=_tint('#ffffff', 0.1, DARK), stroke=_tint('#ffffff', 0.2, DARK), radius=12)
+    canvas.circle(pill_x + 15, PAD + 12, 3, status_color)
+    canvas.text(pill_x + 25, PAD + 15.5, [(status_text, BOLD)], 9.75, status_color)
+    flow.y = header_h + PAD
+
+    # Executive summary: gauge on the left, summary and metrics on the right
+    top = flow.y
+    cx, cy, r = PAD + 75, top + 75, 60
+    canvas.arc(cx, cy, r, 180, 0, BORDER, 15)
+    if score > 0:
+        canvas.arc(cx, cy, r, 180, 180 - 180 * min(score, 100) / 100, status_color, 15)
+    canvas.text(cx, cy - 8, [(str(score), BOLD)], 27, TEXT_MAIN, align='center')
+    canvas.text(cx, cy + 7, [('SCORE', BOLD)], 9, TEXT_MUTED, align='center')
+
+    col_x = PAD + 180
+    col_w = PAGE_WIDTH - PAD - col_x
+    canvas.text(col_x, top + 14, [('Executive Summary', BOLD)], 13.5, TEXT_MAIN)
+    summary = wrap_runs([
+        ('This assessment evaluates', REGULAR), (host, BOLD),
+        ('against the Universal Content Protocol (UCP) standards. The site currently has a readiness score of', REGULAR),
+        (f"{score}/100.", BOLD)
+    ], 10.5, col_w)
+    y = top + 24
+    for line in summary:
+        canvas.text(col_x, y + 12, line, 10.5, TEXT_MUTED)
+        y += 16.8
+    y += 8
+    metrics = [
+        ('REVIEW DATE', format_review_date(data.get('reviewDate', ''))),
+        ('TARGET HOST', host),
+        ('PROTOCOL VER', 'v1.0'),
+    ]
+    cell_w = (col_w - 18) / 3
+    value_lines = [wrap(value, BOLD, 10, cell_w - 18) for _, value in metrics]
+    cell_h = 30 + 13 * max(len(lines) for lines in value_lines)
+    for i, ((label, _), lines) in enumerate(zip(metrics, value_lines)):
+        x = col_x + i * (cell_w + 9)
+        canvas.rect(x, y, cell_w, cell_h, fill=SOFT_BG, stroke=SOFT_BORDER, radius=6)
+        canvas.text(x + 9, y + 16, [(label, BOLD)], 8, SLATE_500)
+        for j, text in enumerate(lines):
+            canvas.text(x + 9, y + 31 + 13 * j, [(text, BOLD)], 10, DARK)
+    flow.y = max(top + 150, y + cell_h) + PAD
+    canvas.line(PAD, flow.y, PAGE_WIDTH - PAD, flow.y, BORDER)
+    flow.y += PAD
+
+    # Technical breakdown
+    def section_title(top: float) -> None:
+        canvas.text(PAD, top + 12, [('TECHNICAL BREAKDOWN', BOLD)], 12, SLATE_500)
+        canvas.line(PAD, top + 22, PAGE_WIDTH - PAD, top + 22, SOFT_BORDER, 1.5)
+    flow.place((37, section_title))
+
+    for c in data.get('components', []):
+        check_cancelled(cancel_token)
+        flow.boxed(_component_blocks(canvas, c, data), PAD, content_w, BORDER)
+        flow.space(15)
+
+    # Footer with the privacy notice
+    flow.space(PAD - 15)
+    paragraphs = cfg['disclaimer']['paragraphs'] + [data.get('disclaimerComputed', {}).get('crossBorder', '')]
+    footer_blocks: List[Block] = [
+        (22, lambda top: canvas.text(PAD, top + 12, [(cfg['disclaimer']['title'].upper(), BOLD)], 9, SLATE_500))
+    ]
+    for p in paragraphs:
+        if p:
+            footer_blocks += _text_blocks(canvas, wrap_runs([(p, REGULAR)], 9, content_w), PAD, 9, SLATE_400)
+            footer_blocks.append((4.5, lambda top: None))
+
+    def footer_meta(top: float) -> None:
+        canvas.line(PAD, top + 8, PAGE_WIDTH - PAD, top + 8, SOFT_BORDER)
+        canvas.text(PAD, top + 28, f"Generated by UCP Compliance Scanner v{cfg['meta']['version']}", 9, SLATE_400)
+        canvas.text(PAGE_WIDTH - PAD, top + 28, f"ID: {int(time.time())}", 9, SLATE_400, align='right')
+    footer_blocks.append((36, footer_meta))
+    for block in footer_blocks:
+        page_before = len(canvas.pages)
+        top = flow.place(block)
+        if len(canvas.pages) != page_before or block is footer_blocks[0]:
+            # The footer band runs to the bottom of every page it appears on
+            canvas.ops.insert(0, f"{_rgb(SOFT_BG)} rg 0 0 {PAGE_WIDTH:.2f} {PAGE_HEIGHT - top + 15:.2f} re f")
+
+    check_cancelled(cancel_token)
+    return _build_document(canvas.pages, f"UCP Compliance Report - {host}")
+
+
+def _component_blocks(canvas: PdfCanvas, c: Dict[str, Any], data: Dict[str, Any]) -> List[Block]:
+    """The card for one scored component, as page-breakable blocks."""
+    x = PAD
+    w = PAGE_WIDTH - 2 * PAD
+    inner_x = x + 15
+    inner_w = w - 30
+    status_pass = c.get('status') == 'pass'
+    row_color = '#10b981' if status_pass else '#ef4444'
+
+    badge = f"{c.get('score')} / {c.get('maxScore')} pts"
+    badge_w = text_width(badge, BOLD, 9) + 16
+    title_w = w - 15 - 40 - badge_w - 20
+    subtitle_lines = wrap(str(c.get('finding') or ''), REGULAR, 9.75, title_w)
+    header_h = max(45, 30 + 13 * len(subtitle_lines))
+
+    def header(top: float) -> None:
+        canvas.rect(x, top, w, header_h, fill=SOFT_BG, radius=9)
+        canvas.rect(x, top + header_h - 9, w, 9, fill=SOFT_BG)
+        canvas.line(x, top + header_h, x + w, top + header_h, BORDER)
+        ix, iy = x + 15, top + header_h / 2
+        if status_pass:
+            canvas.polyline([(ix + 2, iy), (ix + 6, iy + 4), (ix + 14, iy - 5)], row_color, 1.5)
+        else:
+            canvas.polyline([(ix + 2, iy - 6), (ix + 14, iy + 6)], row_color, 1.5)
+            canvas.polyline([(ix + 2, iy + 6), (ix + 14, iy - 6)], row_color, 1.5)
+        canvas.text(x + 40, top + 18, [(str(c.get('component') or ''), BOLD)], 11.25, SLATE_800)
+        for i, line in enumerate(subtitle_lines):
+            canvas.text(x + 40, top + 32 + 13 * i, line, 9.75, SLATE_500)
+        bx = x + w - 15 - badge_w
+        canvas.rect(bx, top + header_h / 2 - 9, badge_w, 18, fill=_tint(row_color, 0x15 / 255), radius=4.5)
+        canvas.text(bx + 8, top + header_h / 2 + 3.2, [(badge, BOLD)], 9, row_color)
+
+    blocks: List[Block] = [(header_h, header), (12, lambda top: None)]
+    detail = wrap_runs([('Endpoint Analysis:', BOLD), (str(c.get('detail') or ''), REGULAR)], 9.75, inner_w)
+    blocks += _text_blocks(canvas, detail, inner_x, 9.75, '#334155')
+
+    findings = c.get('findings') or []
+    if findings:
+        blocks.append((6, lambda top: None))
+        for f in findings:
+            lines = wrap_runs([
+                (str(f.get('field')), MONO), (f"({f.get('severity')}): {f.get('message')}", REGULAR)
+            ], 9, inner_w - 14)
+            item = _text_blocks(canvas, lines, inner_x + 14, 9, '#475569')
+            first_h, first_draw = item[0]
+            def bullet(top: float, first_draw=first_draw, first_h=first_h) -> None:
+                canvas.circle(inner_x + 5, top + first_h / 2, 1.5, '#475569')
+                first_draw(top)
+            blocks += [(first_h, bullet)] + item[1:]
+
+    rec = None if status_pass else recommendation_copy(c.get('key'), data.get('website', ''), data.get('host', ''))
+    if rec:
+        box_x, box_w = inner_x, inner_w
+        text_x, text_w = box_x + 15, box_w - 27
+
+        # Fills overlap neighbouring slices by half a point so no anti-aliasing seam shows between lines
+        def box_edge(top: float, height: float) -> None:
+            canvas.rect(box_x, top, box_w, height + 0.5, fill='#ffffff')
+            canvas.rect(box_x, top, 3, height + 0.5, fill=AMBER)
+            canvas.line(box_x + box_w, top, box_x + box_w, top + height, AMBER)
+
+        def rec_top(top: float) -> None:
+            box_edge(top, 30)
+            canvas.line(box_x, top, box_x + box_w, top, AMBER)
+            canvas.text(text_x, top + 20, [('ACTION REQUIRED', BOLD)], 8.25, AMBER_DARK)
+
+        intro = [(rec['text'], REGULAR)] + ([(rec['path'] + ':', MONO)] if rec['path'] else [])
+        # Long hostnames in the snippets would otherwise run off the code box
+        code_lines = [
+            [(piece, MONO)] for line in rec['code'].split('\n') for piece in hard_wrap(line, MONO, 9, text_w - 18)
+        ]
+
+        def code_bg(top: float, height: float) -> None:
+            box_edge(top, height)
+            canvas.rect(text_x, top - 0.5, text_w, height + 1, fill=SLATE_800)
+
+        def code_pad(top: float) -> None:
+            code_bg(top, 9)
+
+        blocks += [(12, lambda top: None), (30, rec_top)]
+        blocks += _text_blocks(canvas, wrap_runs(intro, 9.75, text_w), text_x, 9.75, '#4b5563', background=box_edge)
+        blocks += [(6, lambda top: box_edge(top, 6)), (9, code_pad)]
+        blocks += _text_blocks(canvas, code_lines, text_x + 9, 9, SOFT_BORDER, background=code_bg)
+
+        def rec_bottom(top: float) -> None:
+            code_bg(top, 9)
+            box_edge(top + 9, 12)
+            canvas.line(box_x, top + 21, box_x + box_w, top + 21, AMBER)
+        blocks.append((21, rec_bottom))
+
+    blocks.append((15, lambda top: None))
+    return blocks
+
+
+def render_pdf(data: Dict[str, Any], output_pdf_path: str, cancel_token: Optional[CancelToken] = None) -> None:
+    """Write the report for a scored result straight to `output_pdf_path`."""
+    logger.info("Generating native PDF report at: %s", output_pdf_path)
+    pdf = build_pdf(data, cancel_token)
+    with open(output_pdf_path, 'wb') as f:
+        f.write(pdf)
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import time
+from typing import Dict, Any, Optional
+
+try:
+    from .logger import logger
+    from .cancellation import CancelToken, check_cancelled
+    from . import metrics
+except ImportError:
+    from logger import logger
+    from cancellation import CancelToken, check_cancelled
+    import metrics
+
+try:
+    import pikepdf
+except ImportError:  # PDFs are left as rendered without pikepdf
+    pikepdf = None
+
+# Chromium already embeds only the glyphs a page uses (subset fonts), and the
+# native backend embeds none, so there is nothing left to subset here. What
+# Chromium output does carry is loosely compressed streams, repeated streams
+# (the same font program or image per page) and objects nothing points at.
+
+
+def _value_key(value: Any) -> Any:
+    # Identify indirect references by object number, without following them
+    if isinstance(value, pikepdf.Object) and value.is_indirect:
+        return ('ref', value.objgen)
+    return repr(value)
+
+
+def _stream_key(stream: Any) -> tuple:
+    data = hashlib.sha256(stream.read_raw_bytes()).digest()
+    attrs = tuple(sorted((k, _value_key(v)) for k, v in stream.stream_dict.items() if k != '/Length'))
+    return data, attrs
+
+
+def _replace_refs(container: Any, mapping: Dict[tuple, Any]) -> None:
+    """Point every reference to a duplicate at its canonical copy, descending into direct containers."""
+    if isinstance(container, pikepdf.Array):
+        items = enumerate(list(container))
+    elif isinstance(container, (pikepdf.Dictionary, pikepdf.Stream)):
+        items = list(container.items())
+    else:
+        return
+    for key, value in items:
+        if not isinstance(value, pikepdf.Object):
+            continue  # numbers and booleans come back as plain Python values
+        if value.is_indirect:
+            canonical = mapping.get(value.objgen)
+            if canonical is not None:
+                container[key] = canonical
+        else:
+            _replace_refs(value, mapping)
+
+
+def dedupe_streams(pdf: Any) -> int:
+    """Merge byte-identical streams with identical attributes; returns the number removed."""
+    canonical: Dict[tuple, Any] = {}
+    mapping: Dict[tuple, Any] = {}
+    for obj in pdf.objects:
+        if isinstance(obj, pikepdf.Stream):
+            key = _stream_key(obj)
+            first = canonical.setdefault(key, obj)
+            if first.objgen != obj.objgen:
+                mapping[obj.objgen] = first
+    if mapping:
+        for obj in list(pdf.objects):
+            _replace_refs(obj, mapping)
+        _replace_refs(pdf.trailer, mapping)
+    return len(mapping)
+
+
+def optimize_pdf(path: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """
+    Rewrite the PDF at `path` in place: drop resources pages do not use,
+    merge duplicate streams, recompress every stream at the highest Flate
+    level and pack objects into object streams. Objects unreachable from the
+    document are not written. The original is kept if the result is not smaller.
+    Returns sizes before and after.
+    """
+    before = os.path.getsize(path)
+    stats = {'bytesBefore': before, 'bytesAfter': before, 'optimized': False}
+    if pikepdf is None:
+        stats['reason'] = 'pikepdf not installed'
+        return stats
+
+    check_cancelled(cancel_token)
+    started = time.monotonic()
+    tmp_path = f"{path}.opt"
+    try:
+        with pikepdf.open(path) as pdf:
+            pdf.remove_unreferenced_resources()
+            stats['duplicateStreams'] = dedupe_streams(pdf)
+            check_cancelled(cancel_token)
+            pdf.save(
+                tmp_path,
+                compress_streams=True,
+                recompress_flate=True,
+                stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate
+            )
+        after = os.path.getsize(tmp_path)
+        if after < before:
+            os.replace(tmp_path, path)
+            stats.update(bytesAfter=after, optimized=True)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    elapsed = time.monotonic() - started
+    metrics.observe('pdf.optimize_seconds', elapsed)
+    metrics.incr('pdf.bytes_saved', before - stats['bytesAfter'])
+    logger.info(
+        "Optimized PDF %s: %d -> %d bytes (%.0f%% smaller, %d duplicate streams) in %.2fs",
+        os.path.basename(path), before, stats['bytesAfter'],
+        100 * (before - stats['bytesAfter']) / before if before else 0,
+        stats['duplicateStreams'], elapsed
+    )
+    return stats
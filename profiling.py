@@ -0,0 +1,195 @@
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Optional, Mapping
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+
+SAMPLE = 'sample'
+CPROFILE = 'cprofile'
+PROFILE_MODES = (SAMPLE, CPROFILE)
+
+# cProfile is process-wide on Python 3.12+ (sys.monitoring); one scan at a time
+_cprofile_lock = threading.Lock()
+
+# Where scan time usually goes, keyed by substrings of the source file path.
+# A sample or function counts toward the category of its innermost matching frame.
+CATEGORIES = {
+    'http': ('requests', 'urllib3', 'http/client', 'ssl.py', 'socket.py'),
+    'json': ('json', 'orjson', 'validator.py'),
+    'render': ('pdf_native.py', 'pdf_optimize.py'),
+    'report': ('reporter.py',),
+    # browser.py is where a scan waits for the thread that drives Chromium
+    'playwright': ('playwright', 'greenlet', 'browser.py'),
+}
+
+# PDF rendering functions that live in reporter.py next to the HTML report code
+RENDER_FUNCTIONS = ('render_pdf', 'generate_pdf', '_print_pdf', '_optimize_pdf')
+
+
+def _authorized(headers: Mapping[str, str], cfg: Dict[str, Any]) -> bool:
+    secret = os.environ.get('UCP_PROFILE_TOKEN')
+    if not secret:
+        return False
+    return hmac.compare_digest((headers.get(cfg['tokenHeader']) or '').encode(), secret.encode())
+
+
+def requested_mode(headers: Mapping[str, str]) -> Optional[str]:
+    """
+    Decide whether to profile this request: explicitly via the configured
+    header (value 'sample', 'cprofile' or any truthy value for the default
+    mode), or at random at the configured sampling rate. The header is only
+    honoured alongside the secret from UCP_PROFILE_TOKEN in the token header,
+    since profiles expose the server's internals (cProfile sees every scan).
+    """
+    cfg = SCANNER_CONFIG['profiling']
+    if not cfg['enabled']:
+        return None
+    value = (headers.get(cfg['header']) or '').strip().lower()
+    if value and _authorized(headers, cfg):
+        if value in PROFILE_MODES:
+            return value
+        if value not in ('0', 'false', 'off'):
+            return cfg['defaultMode']
+    if cfg['sampleRate'] > 0 and random.random() < cfg['sampleRate']:
+        return cfg['defaultMode']
+    return None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _frame_category(filename: str, function: str) -> Optional[str]:
+    if function in RENDER_FUNCTIONS and filename.endswith('reporter.py'):
+        return 'render'
+    for category, needles in CATEGORIES.items():
+        if any(needle in filename for needle in needles):
+            return category
+    return None
+
+
+def _categorize(frames) -> Optional[str]:
+    """Category of the innermost frame that has one; `frames` runs innermost first."""
+    for filename, function in frames:
+        category = _frame_category(filename, function)
+        if category is not None:
+            return category
+    return None
+
+
+class ScanProfiler:
+    """
+    Profile the calling thread for the duration of a `with` block.
+    'sample' mode polls the thread's stack from a background thread and
+    writes collapsed stacks (flamegraph.pl / speedscope input). 'cprofile'
+    mode runs cProfile deterministically and writes a pstats file. cProfile
+    hooks the whole interpreter, so it sees every thread's work and only one
+    scan per process can hold it; a scan asking for it while it is taken is
+    sampled instead (`mode` says which ran).
+    """
+
+    def __init__(self, mode: str = SAMPLE, interval_ms: Optional[float] = None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.interval = (interval_ms or SCANNER_CONFIG['profiling']['samplingIntervalMs']) / 1000
+        self.elapsed = 0.0
+        self._stacks: Counter = Counter()
+        self._category_samples: Counter = Counter()
+        self._samples = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def _sample(self, thread_id: int) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            labels = []
+            frames = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frames.append((frame.f_code.co_filename, frame.f_code.co_name))
+                frame = frame.f_back
+            labels.reverse()
+            self._stacks[';'.join(labels)] += 1
+            self._category_samples[_categorize(frames) or 'other'] += 1
+            self._samples += 1
+
+    def _start_cprofile(self) -> bool:
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler or debugger already owns the interpreter's hooks
+            _cprofile_lock.release()
+            return False
+        self._profile = profile
+        return True
+
+    def __enter__(self) -> 'ScanProfiler':
+        self._started = time.perf_counter()
+        if self.mode == CPROFILE and not self._start_cprofile():
+            logger.info("cProfile is busy in this process; sampling this scan instead")
+            self.mode = SAMPLE
+        if self.mode == SAMPLE:
+            self._sampler = threading.Thread(
+                target=self._sample, args=(threading.get_ident(),), name='scan-profiler', daemon=True
+            )
+            self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            _cprofile_lock.release()
+        else:
+            self._stop.set()
+            self._sampler.join()
+        self.elapsed = time.perf_counter() - self._started
+
+    def breakdown(self) -> Dict[str, float]:
+        """Share of wall time (sample) or seconds of own time (cprofile) per category."""
+        if self.mode == SAMPLE:
+            total = self._samples or 1
+            return {category: round(count / total, 3) for category, count in self._category_samples.items()}
+        seconds: Counter = Counter()
+        for (filename, _, function), (_, _, own_time, _, callers) in pstats.Stats(self._profile).stats.items():
+            category = _frame_category(filename, function)
+            if category is None and filename == '~' and callers:
+                # Builtins (str.join, socket reads, ...) count toward the functions calling them
+                total = sum(entry[2] for entry in callers.values()) or 1
+                for (caller_file, _, caller_function), entry in callers.items():
+                    caller_category = _frame_category(caller_file, caller_function) or 'other'
+                    seconds[caller_category] += own_time * entry[2] / total
+                continue
+            seconds[category or 'other'] += own_time
+        return {category: round(value, 4) for category, value in seconds.items() if value > 0}
+
+    def save(self, path_base: str) -> str:
+        """Write the profile next to the report; returns the artifact path."""
+        if self.mode == CPROFILE:
+            path = f"{path_base}.prof"
+            self._profile.dump_stats(path)
+        else:
+            path = f"{path_base}.folded"
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        logger.info("Saved %s profile (%.2fs) to %s", self.mode, self.elapsed, path)
+        return path
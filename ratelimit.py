@@ -0,0 +1,167 @@
+import ipaddress
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+    from .cancellation import CancelToken, check_cancelled
+    from .dnscache import dns_cache
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+    from cancellation import CancelToken, check_cancelled
+    from dnscache import dns_cache
+    import metrics
+
+# How long a queued request sleeps between cancellation checks
+_WAIT_SLICE_SECONDS = 0.25
+
+
+class TokenBucket:
+    """Classic token bucket; `blocked_until` lets a server's Retry-After pause it."""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst and self.blocked_until <= now
+
+
+def network_key(ip: str) -> str:
+    """
+    Group addresses that are likely to share an operator. Without an ASN
+    database we approximate with the /24 (IPv4) or /48 (IPv6) prefix, which is
+    what shared hosting and CDN edges usually rate limit on.
+    """
+    addr = ipaddress.ip_address(ip)
+    prefix = 24 if addr.version == 4 else 48
+    return str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+
+
+class RateLimiter:
+    """
+    Per-host, per-network and global token buckets for outbound probes.
+    A request proceeds only once every bucket it maps to has a token, and it
+    then consumes one from each. Limits apply per process.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], resolver=None):
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._global = TokenBucket(cfg['global']['rate'], cfg['global']['burst'])
+        self._resolver = resolver or self._resolve
+
+    def _resolve(self, host: str) -> Optional[str]:
+        # Same cache the probe connections use, so this costs no extra lookup
+        try:
+            return dns_cache.lookup(host)[0][1]
+        except OSError:
+            return None
+
+    def _bucket(self, key: str, limits: Dict[str, float]) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.cfg['maxBuckets']:
+                self._evict_idle()
+            bucket = self._buckets[key] = TokenBucket(limits['rate'], limits['burst'])
+        return bucket
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, b in self._buckets.items() if b.idle(now)]:
+            del self._buckets[key]
+
+    def _keys_for(self, url: str) -> List[Tuple[str, Dict[str, float]]]:
+        host = (urlparse(url).hostname or '').lower()
+        keys = [(f"host:{host}", self.cfg['perHost'])]
+        ip = self._resolver(host) if host else None
+        if ip:
+            keys.append((f"net:{network_key(ip)}", self.cfg['perNetwork']))
+        return keys
+
+    def acquire(self, url: str, cancel_token: Optional[CancelToken] = None) -> float:
+        """Block until `url` may be requested; returns the time spent waiting."""
+        keys = self._keys_for(url)
+        started = time.monotonic()
+        while True:
+            check_cancelled(cancel_token)
+            with self._lock:
+                now = time.monotonic()
+                buckets = [self._bucket(key, limits) for key, limits in keys] + [self._global]
+                delay = max(b.delay(now) for b in buckets)
+                if delay <= 0:
+                    for b in buckets:
+                        b.take()
+                    break
+            if cancel_token is not None:
+                cancel_token.wait(min(delay, _WAIT_SLICE_SECONDS))
+            else:
+                time.sleep(min(delay, _WAIT_SLICE_SECONDS))
+        waited = time.monotonic() - started
+        metrics.observe('ratelimit.wait_seconds', waited)
+        return waited
+
+    def penalize(self, url: str, seconds: float) -> None:
+        """Pause every request to the host of `url` for `seconds` (e.g. from Retry-After)."""
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            bucket = self._bucket(f"host:{host}", self.cfg['perHost'])
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+        metrics.incr('ratelimit.penalties')
+        logger.info("Backing off %s for %.1fs", host, seconds)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for retry number `attempt` (0-based)."""
+    cfg = SCANNER_CONFIG['rateLimit']
+    ceiling = min(cfg['backoffMaxSeconds'], cfg['backoffBaseSeconds'] * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+limiter = RateLimiter(SCANNER_CONFIG['rateLimit'])
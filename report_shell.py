@@ -0,0 +1,201 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+try:
+    from .reporter import REPORT_CSS
+    from .artifacts import compress
+except ImportError:
+    from reporter import REPORT_CSS
+    from artifacts import compress
+
+# One static page that renders any scan's report in the browser from the
+# compact JSON written by reporter.report_view. The page is the same for every
+# scan, so it is served from a versioned URL with a year-long cache lifetime;
+# the scan to show is named in the URL fragment, which never reaches the
+# server or the cache key: report/<version>/#<report name>
+
+_SHELL_SCRIPT = r"""
+(function () {
+    const root = document.getElementById('report');
+    const esc = (s) => String(s == null ? '' : s).replace(/[&<>"']/g, (c) => (
+        { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]
+    ));
+
+    function gauge(value, color) {
+        const circumference = 3.14159 * 80;
+        const offset = circumference - (value / 100) * circumference;
+        return `
+        <svg viewBox="0 0 200 110" class="gauge">
+            <path d="M 20 100 A 80 80 0 0 1 180 100" fill="none" stroke="#e5e7eb" stroke-width="20" stroke-linecap="round"/>
+            <path d="M 20 100 A 80 80 0 0 1 180 100" fill="none" stroke="${esc(color)}" stroke-width="20" stroke-linecap="round"
+                  stroke-dasharray="${circumference}" stroke-dashoffset="${offset}" class="gauge-fill"/>
+            <text x="100" y="85" text-anchor="middle" font-size="36" font-weight="bold" fill="#1f2937">${esc(value)}</text>
+            <text x="100" y="105" text-anchor="middle" font-size="12" fill="#6b7280" font-weight="600">SCORE</text>
+        </svg>`;
+    }
+
+    function recommendation(rec) {
+        if (!rec) return '';
+        const intro = rec.path ? `${esc(rec.text)} <code>${esc(rec.path)}</code>:` : esc(rec.text);
+        return `<div class="recommendation">
+              <div class="rec-title">&#9889; ACTION REQUIRED</div>
+              <p>${intro}</p>
+              <div class="code-block">${esc(rec.code)}</div>
+            </div>`;
+    }
+
+    function findingsList(findings) {
+        if (!findings || !findings.length) return '';
+        const items = findings.map((f) =>
+            `<li><code>${esc(f.field)}</code> (${esc(f.severity)}): ${esc(f.message)}</li>`).join('');
+        return `<ul class="findings-list">${items}</ul>`;
+    }
+
+    function componentCard(c) {
+        const pass = c.status === 'pass';
+        const color = pass ? '#10b981' : '#ef4444';
+        const icon = pass
+            ? '<svg class="w-6 h-6" fill="none" stroke="#10b981" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path></svg>'
+            : '<svg class="w-6 h-6" fill="none" stroke="#ef4444" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12"></path></svg>';
+        return `
+        <div class="component-card">
+            <div class="card-header">
+                <div class="card-title-group">
+                    <div class="icon-box">${icon}</div>
+                    <div>
+                        <h3 class="card-title">${esc(c.component)}</h3>
+                        <div class="card-subtitle">${esc(c.finding)}</div>
+                    </div>
+                </div>
+                <div class="score-badge" style="background-color: ${color}15; color: ${color};">
+                    ${esc(c.score)} / ${esc(c.maxScore)} pts
+                </div>
+            </div>
+            <div class="card-body">
+                <div class="detail-row">
+                    <span class="detail-label">Endpoint Analysis:</span>
+                    <span class="detail-value">${esc(c.detail)}</span>
+                </div>
+                ${findingsList(c.findings)}
+                ${recommendation(c.recommendation)}
+            </div>
+        </div>`;
+    }
+
+    function render(d) {
+        document.title = `UCP Compliance Report - ${d.host}`;
+        document.documentElement.style.setProperty('--status-color', d.status.color);
+        root.innerHTML = `
+      <div class="header-hero">
+          <div class="header-bg-pattern"></div>
+          <div class="report-header">
+              <div class="brand-title">
+                  <h1>UCP <span>SCANNER</span></h1>
+                  <div class="report-meta">Universal Content Protocol Assessment</div>
+              </div>
+              <div class="status-pill">
+                  <div class="status-dot"></div>
+                  ${esc(d.status.text)}
+              </div>
+          </div>
+      </div>
+      <div class="content-body">
+          <div class="executive-section">
+              <div class="gauge-container">${gauge(d.score, d.status.color)}</div>
+              <div class="summary-text">
+                  <h2>Executive Summary</h2>
+                  <p class="summary-desc">
+                      This assessment evaluates <strong>${esc(d.host)}</strong> against the Universal Content Protocol (UCP) standards.
+                      The site currently has a readiness score of <strong>${esc(d.score)}/100</strong>.
+                  </p>
+                  <div class="metrics-grid">
+                      <div class="metric-item">
+                          <div class="metric-label">Review Date</div>
+                          <div class="metric-value">${esc(d.reviewDate)}</div>
+                      </div>
+                      <div class="metric-item">
+                          <div class="metric-label">Target Host</div>
+                          <div class="metric-value">${esc(d.host)}</div>
+                      </div>
+                      <div class="metric-item">
+                          <div class="metric-label">Protocol Ver</div>
+                          <div class="metric-value">v1.0</div>
+                      </div>
+                  </div>
+              </div>
+          </div>
+          <div class="component-section">
+              <h3 class="section-title">Technical Breakdown</h3>
+              ${d.components.map(componentCard).join('')}
+          </div>
+      </div>
+      <div class="footer">
+          <div class="disclaimer-box">
+              <div class="disclaimer-title">${esc(d.disclaimer.title)}</div>
+              ${d.disclaimer.paragraphs.map((p) => `<p class='disclaimer-text'>${esc(p)}</p>`).join('')}
+          </div>
+          <div class="footer-meta">
+              <span>Generated by UCP Compliance Scanner v${esc(d.version)}</span>
+              <span>ID: ${esc(d.generatedAt)}</span>
+          </div>
+      </div>`;
+    }
+
+    function showError(message) {
+        root.innerHTML = `<div class="content-body"><p class="summary-desc">${esc(message)}</p></div>`;
+    }
+
+    async function load() {
+        const name = decodeURIComponent(location.hash.slice(1));
+        if (!/^[A-Za-z0-9_.-]+$/.test(name)) {
+            showError('No report selected.');
+            return;
+        }
+        try {
+            // The shell lives at <base>/report/<version>/, report data at <base>/report-data/
+            const response = await fetch(`../../report-data/${encodeURIComponent(name)}.json`);
+            if (!response.ok) throw new Error(`Report not found (${response.status})`);
+            render(await response.json());
+        } catch (err) {
+            showError(err.message);
+        }
+    }
+
+    window.addEventListener('hashchange', load);
+    load();
+})();
+"""
+
+
+class ReportShell(NamedTuple):
+    version: str
+    html: bytes
+    encoded: Dict[str, bytes]  # content-encoding -> precompressed body
+
+
+def _shell_html() -> str:
+    return f"""<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>UCP Compliance Report</title>
+  <style>
+{REPORT_CSS}
+    :root {{ --status-color: #6b7280; }}
+  </style>
+</head>
+<body>
+  <div class="container" id="report"></div>
+  <script>{_SHELL_SCRIPT}</script>
+</body>
+</html>"""
+
+
+@lru_cache(maxsize=1)
+def report_shell() -> ReportShell:
+    """The shell page, its content-hash version and precompressed copies, built once per process."""
+    html = _shell_html().encode('utf-8')
+    version = hashlib.sha256(html).hexdigest()[:12]
+    return ReportShell(version, html, compress(html))
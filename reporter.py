@@ -2,15 +2,398 @@ import html
 import time
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 try:
+    from .config import SCANNER_CONFIG
     from .logger import logger
+    from .cancellation import CancelToken, ScanCancelled, check_cancelled
+    from .browser import renderer
+    from . import metrics
 except ImportError:
+    from config import SCANNER_CONFIG
     from logger import logger
+    from cancellation import CancelToken, ScanCancelled, check_cancelled
+    from browser import renderer
+    import metrics
 
-def generate_report(data: Dict[str, Any]) -> str:
+RENDER_LOAD_TIMEOUT_SECONDS = 30
+
+# Report stylesheet, shared by the server-rendered report and the static report shell.
+# The status colour comes from the --status-color variable set per report.
+REPORT_CSS = """
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
+    
+    :root {
+        --primary: #2563eb;
+        --text-main: #1f2937;
+        --text-muted: #6b7280;
+        --bg-body: #f3f4f6;
+        --bg-card: #ffffff;
+        --border: #e5e7eb;
+    }
+
+    @page { margin: 0; size: A4; }
+    
+    * { box-sizing: border-box; }
+    
+    body { 
+        font-family: 'Inter', sans-serif;
+        background-color: var(--bg-body);
+        color: var(--text-main);
+        margin: 0;
+        padding: 0;
+        -webkit-print-color-adjust: exact;
+    }
+    
+    .container {
+        max-width: 210mm;
+        margin: 0 auto;
+        background: white;
+        min-height: 297mm;
+        padding: 0;
+        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
+    }
+
+    .header-hero {
+        background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%);
+        color: white;
+        padding: 40px;
+        position: relative;
+        overflow: hidden;
+    }
+    
+    .header-bg-pattern {
+        position: absolute;
+        top: 0; right: 0; bottom: 0; left: 0;
+        opacity: 0.1;
+        background-image: radial-gradient(#6366f1 1px, transparent 1px);
+        background-size: 20px 20px;
+    }
+
+    .report-header {
+        position: relative;
+        z-index: 10;
+        display: flex;
+        justify-content: space-between;
+        align-items: flex-start;
+    }
+
+    .brand-title h1 {
+        font-size: 28px;
+        font-weight: 800;
+        margin: 0;
+        letter-spacing: -0.5px;
+    }
+    
+    .brand-title span { color: #60a5fa; }
+    .report-meta { font-size: 13px; color: #94a3b8; margin-top: 8px; }
+
+    .status-pill {
+        background: rgba(255,255,255,0.1);
+        backdrop-filter: blur(4px);
+        padding: 8px 16px;
+        border-radius: 99px;
+        font-weight: 600;
+        font-size: 13px;
+        border: 1px solid rgba(255,255,255,0.2);
+        color: var(--status-color);
+        display: flex;
+        align-items: center;
+        gap: 6px;
+    }
+    
+    .status-dot {
+        width: 8px; height: 8px;
+        border-radius: 50%;
+        background-color: var(--status-color);
+        box-shadow: 0 0 8px var(--status-color);
+    }
+
+    .content-body { padding: 40px; }
+
+    .executive-section {
+        display: grid;
+        grid-template-columns: 200px 1fr;
+        gap: 40px;
+        margin-bottom: 40px;
+        background: #fff;
+        padding-bottom: 40px;
+        border-bottom: 1px solid var(--border);
+    }
+
+    .gauge-container {
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+    }
+    
+    .gauge-fill {
+        transition: stroke-dashoffset 1s ease-out;
+    }
+
+    .summary-text h2 {
+        font-size: 18px;
+        font-weight: 700;
+        margin: 0 0 12px 0;
+        color: var(--text-main);
+    }
+    
+    .summary-desc {
+        font-size: 14px;
+        color: var(--text-muted);
+        line-height: 1.6;
+        margin-bottom: 20px;
+    }
+    
+    .metrics-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 12px;
+    }
+    
+    .metric-item {
+        background: #f8fafc;
+        padding: 12px;
+        border-radius: 8px;
+        border: 1px solid #e2e8f0;
+    }
+    
+    .metric-label {
+        font-size: 11px;
+        text-transform: uppercase;
+        color: #64748b;
+        font-weight: 600;
+        margin-bottom: 4px;
+    }
+    
+    .metric-value {
+        font-size: 14px;
+        font-weight: 600;
+        color: #0f172a;
+    }
+
+    .section-title {
+        font-size: 16px;
+        font-weight: 700;
+        text-transform: uppercase;
+        letter-spacing: 0.05em;
+        color: #64748b;
+        margin-bottom: 20px;
+        padding-bottom: 10px;
+        border-bottom: 2px solid #e2e8f0;
+    }
+
+    .component-card {
+        background: white;
+        border: 1px solid var(--border);
+        border-radius: 12px;
+        margin-bottom: 20px;
+        overflow: hidden;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.02);
+    }
+
+    .card-header {
+        padding: 16px 20px;
+        background: #f8fafc;
+        border-bottom: 1px solid var(--border);
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+    }
+    
+    .card-title-group {
+        display: flex;
+        align-items: center;
+        gap: 12px;
+    }
+    
+    .card-title {
+        font-size: 15px;
+        font-weight: 700;
+        margin: 0;
+        color: #1e293b;
+    }
+    
+    .card-subtitle {
+        font-size: 13px;
+        color: #64748b;
+        margin-top: 2px;
+    }
+
+    .score-badge {
+        font-size: 12px;
+        font-weight: 700;
+        padding: 4px 10px;
+        border-radius: 6px;
+    }
+
+    .card-body { padding: 20px; }
+    
+    .detail-row {
+        font-size: 13px;
+        color: #334155;
+        margin-bottom: 12px;
+    }
+    
+    .detail-label { font-weight: 600; color: #64748b; margin-right: 6px; }
+
+    .findings-list {
+        font-size: 12px;
+        color: #475569;
+        margin: 0 0 12px 0;
+        padding-left: 18px;
+        line-height: 1.6;
+    }
+
+    .recommendation {
+        background: #ffffff;
+        border: 1px solid #fbbf24;
+        border-left-width: 4px;
+        border-radius: 6px;
+        padding: 16px;
+        margin-top: 16px;
+    }
+    
+    .rec-title {
+        color: #d97706;
+        font-size: 11px;
+        font-weight: 800;
+        text-transform: uppercase;
+        margin-bottom: 8px;
+    }
+    
+    .recommendation p {
+        font-size: 13px;
+        margin: 0 0 8px 0;
+        color: #4b5563;
+    }
+
+    .code-block {
+        background: #1e293b;
+        color: #e2e8f0;
+        padding: 12px;
+        border-radius: 6px;
+        font-family: 'Monaco', monospace;
+        font-size: 12px;
+        line-height: 1.5;
+        white-space: pre-wrap;
+    }
+
+    .footer {
+        padding: 40px;
+        background: #f8fafc;
+        border-top: 1px solid var(--border);
+        font-size: 12px;
+        color: #94a3b8;
+    }
+    
+    .disclaimer-box {
+        margin-bottom: 20px;
+    }
+    
+    .disclaimer-title {
+        font-weight: 700;
+        text-transform: uppercase;
+        margin-bottom: 8px;
+        color: #64748b;
+    }
+    
+    .disclaimer-text {
+        margin-bottom: 6px;
+        line-height: 1.5;
+    }
+    
+    .footer-meta {
+        border-top: 1px solid #e2e8f0;
+        padding-top: 20px;
+        display: flex;
+        justify-content: space-between;
+    }
+"""
+
+def report_status(score: float, cfg: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Status colour, background tint and label for a weighted score."""
+    if score >= cfg['scoring']['thresholds']['compliantMin']:
+        return "#10b981", "#ecfdf5", "COMPLIANT" # Emerald 500
+    if score >= cfg['scoring']['thresholds']['partialMin']:
+        return "#f59e0b", "#fffbeb", "PARTIAL" # Amber 500
+    return "#ef4444", "#fef2f2", "NON-COMPLIANT" # Red 500
+
+def format_review_date(iso: str) -> str:
+    try:
+        dt = datetime.fromisoformat(iso)
+        return dt.strftime("%B %d, %Y • %H:%M UTC")
+    except Exception:
+        return iso
+
+def recommendation_copy(key: Optional[str], website: str, host: str) -> Optional[Dict[str, str]]:
+    """
+    Remediation advice for a failing component, shared by every report format:
+    `text` (followed by `path` in code style when set) and a `code` snippet.
+    """
+    recs = {
+        'robots': {
+            'text': "Add the following UCP directive to",
+            'path': f"{website}/robots.txt",
+            'code': "User-agent: *\nAllow: /.well-known/ucp\nUCP-Config: /.well-known/ucp"
+        },
+        'ucpConfig': {
+            'text': "Deploy a valid JSON configuration at",
+            'path': f"{website}/.well-known/ucp",
+            'code': f'{{\n  "version": "1.0",\n  "publisher": "{host}",\n  "contact": "admin@{host}",\n  "ai_training": "opt-out"\n}}'
+        },
+        'headers': {
+            'text': "Configure your server to send these headers on the homepage:",
+            'path': '',
+            'code': "UCP-Config: /.well-known/ucp\nX-Robots-Tag: UCP-Enabled"
+        }
+    }
+    return recs.get(key)
+
+def report_view(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Everything the static report shell needs to draw one report, as a compact
+    JSON-ready dict: status, display strings and per-component advice are
+    resolved here so the browser only lays them out.
+    """
+    cfg = data.get('report', {})
+    if not cfg:
+        from config import REPORT_CONFIG
+        cfg = REPORT_CONFIG
+    score = data.get('weightedAverage', 0)
+    status_color, status_bg, status_text = report_status(score, cfg)
+    website, host = data.get('website', ''), data.get('host', '')
+    components = []
+    for c in data.get('components', []):
+        components.append({
+            'key': c.get('key'),
+            'component': c.get('component'),
+            'finding': c.get('finding'),
+            'detail': c.get('detail'),
+            'score': c.get('score'),
+            'maxScore': c.get('maxScore'),
+            'status': c.get('status'),
+            'findings': c.get('findings') or [],
+            'recommendation': None if c.get('status') == 'pass' else recommendation_copy(c.get('key'), website, host)
+        })
+    paragraphs = cfg['disclaimer']['paragraphs'] + [data.get('disclaimerComputed', {}).get('crossBorder', '')]
+    return {
+        'host': host,
+        'website': website,
+        'score': score,
+        'status': {'color': status_color, 'text': status_text},
+        'reviewDate': format_review_date(data.get('reviewDate', '')),
+        'components': components,
+        'disclaimer': {'title': cfg['disclaimer']['title'], 'paragraphs': [p for p in paragraphs if p]},
+        'version': cfg['meta']['version'],
+        'generatedAt': int(time.time())
+    }
+
+def generate_report(data: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> str:
     """Generate HTML Report String with Professional Design"""
+    check_cancelled(cancel_token)
     cfg = data.get('report', {})
     if not cfg:
         from config import REPORT_CONFIG
@@ -21,31 +404,9 @@ def generate_report(data: Dict[str, Any]) -> str:
     def esc(s: Any) -> str:
         return html.escape(str(s) if s is not None else '')
 
-    def format_date(iso: str) -> str:
-        try:
-            dt = datetime.fromisoformat(iso)
-            return dt.strftime("%B %d, %Y • %H:%M UTC")
-        except Exception:
-            return iso
-
     score = data.get('weightedAverage', 0)
     
-    # Determine Status Colors and Icons
-    if score >= cfg['scoring']['thresholds']['compliantMin']:
-        status_color = "#10b981" # Emerald 500
-        status_bg = "#ecfdf5"
-        status_text = "COMPLIANT"
-        status_icon = "shield-check"
-    elif score >= cfg['scoring']['thresholds']['partialMin']:
-        status_color = "#f59e0b" # Amber 500
-        status_bg = "#fffbeb"
-        status_text = "PARTIAL"
-        status_icon = "alert-triangle"
-    else:
-        status_color = "#ef4444" # Red 500
-        status_bg = "#fef2f2"
-        status_text = "NON-COMPLIANT"
-        status_icon = "shield-off"
+    status_color, status_bg, status_text = report_status(score, cfg)
 
     # SVG Gauge Generator
     def generate_gauge(value):
@@ -67,36 +428,23 @@ def generate_report(data: Dict[str, Any]) -> str:
 
     def recommendation_for(c: Dict[str, Any]) -> str:
         if c.get('status') == 'pass': return ''
-        
-        website = data.get('website', '')
-        host = data.get('host', '')
-        
-        recs = {
-            'robots': f"""<div class="recommendation">
-              <div class="rec-title">⚡ ACTION REQUIRED</div>
-              <p>Add the following UCP directive to <code>{esc(website)}/robots.txt</code>:</p>
-              <div class="code-block">User-agent: *
-Allow: /.well-known/ucp
-UCP-Config: /.well-known/ucp</div>
-            </div>""",
-            'ucpConfig': f"""<div class="recommendation">
-              <div class="rec-title">⚡ ACTION REQUIRED</div>
-              <p>Deploy a valid JSON configuration at <code>{esc(website)}/.well-known/ucp</code>:</p>
-              <div class="code-block">{{
-  "version": "1.0",
-  "publisher": "{esc(host)}",
-  "contact": "admin@{esc(host)}",
-  "ai_training": "opt-out"
-}}</div>
-            </div>""",
-            'headers': f"""<div class="recommendation">
+        rec = recommendation_copy(c.get('key'), data.get('website', ''), data.get('host', ''))
+        if not rec: return ''
+        intro = f"{esc(rec['text'])} <code>{esc(rec['path'])}</code>:" if rec['path'] else esc(rec['text'])
+        return f"""<div class="recommendation">
               <div class="rec-title">⚡ ACTION REQUIRED</div>
-              <p>Configure your server to send these headers on the homepage:</p>
-              <div class="code-block">UCP-Config: /.well-known/ucp
-X-Robots-Tag: UCP-Enabled</div>
+              <p>{intro}</p>
+              <div class="code-block">{html.escape(rec['code'], quote=False)}</div>
             </div>"""
-        }
-        return recs.get(c.get('key'), '')
+
+    def findings_list(c: Dict[str, Any]) -> str:
+        findings = c.get('findings') or []
+        if not findings: return ''
+        items = "".join([
+            f"<li><code>{esc(f.get('field'))}</code> ({esc(f.get('severity'))}): {esc(f.get('message'))}</li>"
+            for f in findings
+        ])
+        return f"""<ul class="findings-list">{items}</ul>"""
 
     def component_row(c: Dict[str, Any]) -> str:
         status_pass = c.get('status') == 'pass'
@@ -124,6 +472,7 @@ X-Robots-Tag: UCP-Enabled</div>
                     <span class="detail-label">Endpoint Analysis:</span>
                     <span class="detail-value">{esc(c.get('detail'))}</span>
                 </div>
+                {findings_list(c)}
                 {recommendation_for(c)}
             </div>
         </div>"""
@@ -135,287 +484,8 @@ X-Robots-Tag: UCP-Enabled</div>
 
     css = f"""
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
-        
-        :root {{
-            --primary: #2563eb;
-            --text-main: #1f2937;
-            --text-muted: #6b7280;
-            --bg-body: #f3f4f6;
-            --bg-card: #ffffff;
-            --border: #e5e7eb;
-        }}
-
-        @page {{ margin: 0; size: A4; }}
-        
-        * {{ box-sizing: border-box; }}
-        
-        body {{ 
-            font-family: 'Inter', sans-serif;
-            background-color: var(--bg-body);
-            color: var(--text-main);
-            margin: 0;
-            padding: 0;
-            -webkit-print-color-adjust: exact;
-        }}
-        
-        .container {{
-            max-width: 210mm;
-            margin: 0 auto;
-            background: white;
-            min-height: 297mm;
-            padding: 0;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-        }}
-
-        .header-hero {{
-            background: linear-gradient(135deg, #1e293b 0%, #0f172a 100%);
-            color: white;
-            padding: 40px;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .header-bg-pattern {{
-            position: absolute;
-            top: 0; right: 0; bottom: 0; left: 0;
-            opacity: 0.1;
-            background-image: radial-gradient(#6366f1 1px, transparent 1px);
-            background-size: 20px 20px;
-        }}
-
-        .report-header {{
-            position: relative;
-            z-index: 10;
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-        }}
-
-        .brand-title h1 {{
-            font-size: 28px;
-            font-weight: 800;
-            margin: 0;
-            letter-spacing: -0.5px;
-        }}
-        
-        .brand-title span {{ color: #60a5fa; }}
-        .report-meta {{ font-size: 13px; color: #94a3b8; margin-top: 8px; }}
-
-        .status-pill {{
-            background: rgba(255,255,255,0.1);
-            backdrop-filter: blur(4px);
-            padding: 8px 16px;
-            border-radius: 99px;
-            font-weight: 600;
-            font-size: 13px;
-            border: 1px solid rgba(255,255,255,0.2);
-            color: {status_color};
-            display: flex;
-            align-items: center;
-            gap: 6px;
-        }}
-        
-        .status-dot {{
-            width: 8px; height: 8px;
-            border-radius: 50%;
-            background-color: {status_color};
-            box-shadow: 0 0 8px {status_color};
-        }}
-
-        .content-body {{ padding: 40px; }}
-
-        .executive-section {{
-            display: grid;
-            grid-template-columns: 200px 1fr;
-            gap: 40px;
-            margin-bottom: 40px;
-            background: #fff;
-            padding-bottom: 40px;
-            border-bottom: 1px solid var(--border);
-        }}
-
-        .gauge-container {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .gauge-fill {{
-            transition: stroke-dashoffset 1s ease-out;
-        }}
-
-        .summary-text h2 {{
-            font-size: 18px;
-            font-weight: 700;
-            margin: 0 0 12px 0;
-            color: var(--text-main);
-        }}
-        
-        .summary-desc {{
-            font-size: 14px;
-            color: var(--text-muted);
-            line-height: 1.6;
-            margin-bottom: 20px;
-        }}
-        
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(3, 1fr);
-            gap: 12px;
-        }}
-        
-        .metric-item {{
-            background: #f8fafc;
-            padding: 12px;
-            border-radius: 8px;
-            border: 1px solid #e2e8f0;
-        }}
-        
-        .metric-label {{
-            font-size: 11px;
-            text-transform: uppercase;
-            color: #64748b;
-            font-weight: 600;
-            margin-bottom: 4px;
-        }}
-        
-        .metric-value {{
-            font-size: 14px;
-            font-weight: 600;
-            color: #0f172a;
-        }}
-
-        .section-title {{
-            font-size: 16px;
-            font-weight: 700;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            color: #64748b;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #e2e8f0;
-        }}
-
-        .component-card {{
-            background: white;
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            margin-bottom: 20px;
-            overflow: hidden;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.02);
-        }}
-
-        .card-header {{
-            padding: 16px 20px;
-            background: #f8fafc;
-            border-bottom: 1px solid var(--border);
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .card-title-group {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }}
-        
-        .card-title {{
-            font-size: 15px;
-            font-weight: 700;
-            margin: 0;
-            color: #1e293b;
-        }}
-        
-        .card-subtitle {{
-            font-size: 13px;
-            color: #64748b;
-            margin-top: 2px;
-        }}
-
-        .score-badge {{
-            font-size: 12px;
-            font-weight: 700;
-            padding: 4px 10px;
-            border-radius: 6px;
-        }}
-
-        .card-body {{ padding: 20px; }}
-        
-        .detail-row {{
-            font-size: 13px;
-            color: #334155;
-            margin-bottom: 12px;
-        }}
-        
-        .detail-label {{ font-weight: 600; color: #64748b; margin-right: 6px; }}
-
-        .recommendation {{
-            background: #ffffff;
-            border: 1px solid #fbbf24;
-            border-left-width: 4px;
-            border-radius: 6px;
-            padding: 16px;
-            margin-top: 16px;
-        }}
-        
-        .rec-title {{
-            color: #d97706;
-            font-size: 11px;
-            font-weight: 800;
-            text-transform: uppercase;
-            margin-bottom: 8px;
-        }}
-        
-        .recommendation p {{
-            font-size: 13px;
-            margin: 0 0 8px 0;
-            color: #4b5563;
-        }}
-
-        .code-block {{
-            background: #1e293b;
-            color: #e2e8f0;
-            padding: 12px;
-            border-radius: 6px;
-            font-family: 'Monaco', monospace;
-            font-size: 12px;
-            line-height: 1.5;
-            white-space: pre-wrap;
-        }}
-
-        .footer {{
-            padding: 40px;
-            background: #f8fafc;
-            border-top: 1px solid var(--border);
-            font-size: 12px;
-            color: #94a3b8;
-        }}
-        
-        .disclaimer-box {{
-            margin-bottom: 20px;
-        }}
-        
-        .disclaimer-title {{
-            font-weight: 700;
-            text-transform: uppercase;
-            margin-bottom: 8px;
-            color: #64748b;
-        }}
-        
-        .disclaimer-text {{
-            margin-bottom: 6px;
-            line-height: 1.5;
-        }}
-        
-        .footer-meta {{
-            border-top: 1px solid #e2e8f0;
-            padding-top: 20px;
-            display: flex;
-            justify-content: space-between;
-        }}
+{REPORT_CSS}
+        :root {{ --status-color: {status_color}; }}
     </style>
     """
     
@@ -457,7 +527,7 @@ X-Robots-Tag: UCP-Enabled</div>
                   <div class="metrics-grid">
                       <div class="metric-item">
                           <div class="metric-label">Review Date</div>
-                          <div class="metric-value">{esc(format_date(data.get('reviewDate', '')))}</div>
+                          <div class="metric-value">{esc(format_review_date(data.get('reviewDate', '')))}</div>
                       </div>
                       <div class="metric-item">
                           <div class="metric-label">Target Host</div>
@@ -492,40 +562,113 @@ X-Robots-Tag: UCP-Enabled</div>
 </html>"""
     return html_content
 
-def generate_pdf(html_file_path: str, output_pdf_path: str) -> None:
-    """Generate PDF from HTML string using Playwright."""
-    logger.info(f"Generating PDF report at: {output_pdf_path}")
+async def _print_pdf(browser: Any, html_file_path: str, output_pdf_path: str) -> None:
+    # Runs on the browser thread; a cancelled scan cancels this task (see BrowserRenderer.run)
+    page = await browser.new_page()
     try:
-        from playwright.sync_api import sync_playwright
-        
-        with sync_playwright() as p:
-            # Add args for better compatibility in some environments
-            browser = p.chromium.launch(
-                args=['--no-sandbox', '--disable-setuid-sandbox']
-            )
-            page = browser.new_page()
-            
-            # Convert file path to URI if not already
-            if not html_file_path.startswith("file://"):
-                file_uri = f"file://{os.path.abspath(html_file_path)}"
-            else:
-                file_uri = html_file_path
-                
-            page.goto(file_uri, wait_until="networkidle")
-            
-            # Add print styling
-            page.add_style_tag(content="""
-                @page { size: A4; margin: 0; }
-                body { -webkit-print-color-adjust: exact; }
-            """)
-            
-            page.pdf(
-                path=output_pdf_path, 
-                format="A4", 
-                print_background=True,
-                margin={"top": "0", "right": "0", "bottom": "0", "left": "0"}
-            )
-            browser.close()
+        # Convert file path to URI if not already
+        if not html_file_path.startswith("file://"):
+            file_uri = f"file://{os.path.abspath(html_file_path)}"
+        else:
+            file_uri = html_file_path
+
+        await page.goto(file_uri, wait_until="load")
+        await page.wait_for_load_state("networkidle", timeout=RENDER_LOAD_TIMEOUT_SECONDS * 1000)
+
+        # Add print styling
+        await page.add_style_tag(content="""
+            @page { size: A4; margin: 0; }
+            body { -webkit-print-color-adjust: exact; }
+        """)
+
+        await page.pdf(
+            path=output_pdf_path, 
+            format="A4", 
+            print_background=True,
+            margin={"top": "0", "right": "0", "bottom": "0", "left": "0"}
+        )
+    finally:
+        # Closing the page also closes its browser context, freeing it immediately on cancel
+        await page.close()
+
+def generate_pdf(html_file_path: str, output_pdf_path: str, cancel_token: Optional[CancelToken] = None) -> None:
+    """Generate PDF from an HTML file in the shared Chromium instance (see browser.py)."""
+    logger.info("Generating PDF report at: %s", output_pdf_path)
+    started = time.monotonic()
+    try:
+        check_cancelled(cancel_token)
+        renderer().run(lambda browser: _print_pdf(browser, html_file_path, output_pdf_path), cancel_token)
+    except ScanCancelled:
+        wasted = time.monotonic() - started
+        metrics.incr('render.cancelled')
+        metrics.observe('render.wasted_seconds', wasted)
+        logger.info("PDF generation cancelled after %.2fs: %s", wasted, output_pdf_path)
+        raise
     except Exception as e:
-        logger.error(f"PDF generation failed: {e}", exc_info=True)
+        logger.error("PDF generation failed: %s", e, exc_info=True)
+        raise
+
+def render_pdf(
+    data: Dict[str, Any], html_file_path: str, output_pdf_path: str,
+    cancel_token: Optional[CancelToken] = None
+) -> str:
+    """
+    Render the PDF report with the configured backend ('native' draws it from
+    `data`, 'playwright' prints `html_file_path` in Chromium), trying the
+    fallback backend if the first one fails, then optionally optimize it.
+    Returns the backend that succeeded.
+    """
+    cfg = SCANNER_CONFIG['pdf']
+    backends = [cfg['backend']]
+    if cfg.get('fallback') and cfg['fallback'] != cfg['backend']:
+        backends.append(cfg['fallback'])
+
+    for i, backend in enumerate(backends):
+        started = time.monotonic()
+        try:
+            if backend == 'native':
+                try:
+                    from .pdf_native import render_pdf as render_native
+                except ImportError:
+                    from pdf_native import render_pdf as render_native
+                render_native(data, output_pdf_path, cancel_token)
+            elif backend == 'playwright':
+                if not os.path.exists(html_file_path):
+                    # Chromium prints from a file; write the full HTML report if the scan skipped it
+                    with open(html_file_path, 'w', encoding='utf-8') as f:
+                        f.write(generate_report(data, cancel_token))
+                    # It is served under /view like any other artifact, so it needs its variants too
+                    try:
+                        from .artifacts import write_variants
+                    except ImportError:
+                        from artifacts import write_variants
+                    write_variants(html_file_path)
+                generate_pdf(html_file_path, output_pdf_path, cancel_token)
+            else:
+                raise ValueError(f"Unknown PDF backend: {backend}")
+        except ScanCancelled:
+            raise
+        except Exception as e:
+            metrics.incr(f"render.{backend}.failed")
+            if i == len(backends) - 1:
+                raise
+            logger.warning("PDF backend %s failed (%s); falling back to %s", backend, e, backends[i + 1])
+            continue
+        metrics.observe(f"render.{backend}.seconds", time.monotonic() - started)
+        if cfg.get('optimize'):
+            _optimize_pdf(output_pdf_path, cancel_token)
+        return backend
+
+def _optimize_pdf(output_pdf_path: str, cancel_token: Optional[CancelToken]) -> None:
+    """Shrink a rendered PDF; a failure here keeps the PDF as rendered."""
+    try:
+        from .pdf_optimize import optimize_pdf
+    except ImportError:
+        from pdf_optimize import optimize_pdf
+    try:
+        optimize_pdf(output_pdf_path, cancel_token)
+    except ScanCancelled:
         raise
+    except Exception as e:
+        metrics.incr('pdf.optimize_failed')
+        logger.warning("PDF optimization failed for %s: %s", output_pdf_path, e)
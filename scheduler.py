@@ -0,0 +1,178 @@
+import hashlib
+import hmac
+import itertools
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+    from .cancellation import CancelToken, check_cancelled
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+    from cancellation import CancelToken, check_cancelled
+    import metrics
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITY_CLASSES = (INTERACTIVE, BULK)
+
+# Lower runs first. A waiter gains one level per `agingSeconds` spent queued,
+# so bulk work that has waited that long competes evenly with fresh interactive work.
+_BASE_PRIORITY = {INTERACTIVE: 0.0, BULK: 1.0}
+
+# How often a queued waiter wakes up to check for cancellation
+_WAIT_SLICE_SECONDS = 0.25
+
+# Interactive priority is only honoured alongside a token the web UI gets
+# from the server. Anyone can fetch the page and get one, so this is a hint
+# that keeps plain API calls in the bulk class, not access control.
+# Without UCP_UI_SECRET each process signs with its own random key; gunicorn
+# forks workers after preloading the app, so they still share it.
+UI_TOKEN_COOKIE = 'ucp_ui'
+_ui_secret = (os.environ.get('UCP_UI_SECRET') or secrets.token_hex(32)).encode()
+
+
+class _Waiter:
+    __slots__ = ('priority_class', 'enqueued_at', 'seq', 'granted')
+
+    def __init__(self, priority_class: str, seq: int):
+        self.priority_class = priority_class
+        self.enqueued_at = time.monotonic()
+        self.seq = seq
+        self.granted = threading.Event()
+
+
+class StageScheduler:
+    """
+    Admission control for one pipeline stage (probe or render).
+    `capacity` caps concurrent work in the stage; `budgets` caps each priority
+    class within it, so bulk work can never take the slots kept for interactive scans.
+    """
+
+    def __init__(self, name: str, capacity: int, budgets: Dict[str, int], aging_seconds: float):
+        self.name = name
+        self.capacity = capacity
+        self.budgets = dict(budgets)
+        self.aging_seconds = aging_seconds
+        self._lock = threading.Lock()
+        self._running = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        waited = now - waiter.enqueued_at
+        return _BASE_PRIORITY[waiter.priority_class] - waited / self.aging_seconds
+
+    def _dispatch(self) -> None:
+        # Caller holds self._lock
+        now = time.monotonic()
+        while self._waiters and sum(self._running.values()) < self.capacity:
+            eligible = [w for w in self._waiters if self._running[w.priority_class] < self.budgets[w.priority_class]]
+            if not eligible:
+                return
+            best = min(eligible, key=lambda w: (self._effective_priority(w, now), w.seq))
+            self._waiters.remove(best)
+            self._running[best.priority_class] += 1
+            best.granted.set()
+
+    def acquire(self, priority_class: str, cancel_token: Optional[CancelToken] = None) -> float:
+        """Block until a slot is granted; returns the time spent queued."""
+        if priority_class not in _BASE_PRIORITY:
+            raise ValueError(f"Unknown priority class: {priority_class}")
+        waiter = _Waiter(priority_class, next(self._seq))
+        with self._lock:
+            self._waiters.append(waiter)
+            self._dispatch()
+
+        while not waiter.granted.wait(_WAIT_SLICE_SECONDS):
+            if cancel_token is not None and cancel_token.cancelled:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        check_cancelled(cancel_token)
+                # Granted while we were giving up: hand the slot back
+                self.release(priority_class)
+                check_cancelled(cancel_token)
+
+        waited = time.monotonic() - waiter.enqueued_at
+        metrics.observe(f"scheduler.{self.name}.{priority_class}.queue_wait_seconds", waited)
+        return waited
+
+    def release(self, priority_class: str) -> None:
+        with self._lock:
+            self._running[priority_class] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority_class: str, cancel_token: Optional[CancelToken] = None) -> Iterator[None]:
+        waited = self.acquire(priority_class, cancel_token)
+        if waited > 1:
+            logger.info("%s work waited %.2fs for a %s slot", priority_class, waited, self.name)
+        try:
+            yield
+        finally:
+            self.release(priority_class)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = {cls: 0 for cls in PRIORITY_CLASSES}
+            for w in self._waiters:
+                queued[w.priority_class] += 1
+            return {
+                'capacity': self.capacity,
+                'budgets': dict(self.budgets),
+                'running': dict(self._running),
+                'queued': queued
+            }
+
+
+def _build_stages() -> Dict[str, StageScheduler]:
+    cfg = SCANNER_CONFIG['scheduler']
+    return {
+        name: StageScheduler(name, stage['capacity'], stage['budgets'], cfg['agingSeconds'])
+        for name, stage in cfg['stages'].items()
+    }
+
+_stages = _build_stages()
+
+def stage_slot(stage: str, priority_class: str, cancel_token: Optional[CancelToken] = None):
+    """Context manager holding a slot in `stage` ('probe' or 'render') for the block."""
+    return _stages[stage].slot(priority_class, cancel_token)
+
+def stats() -> Dict[str, Any]:
+    return {name: s.stats() for name, s in _stages.items()}
+
+def _ui_signature(expires: str) -> str:
+    return hmac.new(_ui_secret, expires.encode(), hashlib.sha256).hexdigest()
+
+def issue_ui_token(now: Optional[float] = None) -> str:
+    """A signed, expiring token that lets the holder request interactive priority."""
+    now = time.time() if now is None else now
+    expires = str(int(now + SCANNER_CONFIG['scheduler']['uiTokenTtlSeconds']))
+    return f"{expires}.{_ui_signature(expires)}"
+
+def _valid_ui_token(token: Optional[str], now: float) -> bool:
+    expires, _, signature = (token or '').partition('.')
+    if not expires.isdigit() or int(expires) < now:
+        return False
+    return hmac.compare_digest(signature.encode(), _ui_signature(expires).encode())
+
+def resolve_priority(requested: Optional[str], ui_token: Optional[str], now: Optional[float] = None) -> str:
+    """
+    The priority class to schedule a scan under. Callers are bulk unless
+    they ask otherwise; interactive without a valid UI token is downgraded
+    to bulk. Raises ValueError for an unknown class.
+    """
+    priority = requested or BULK
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITY_CLASSES)}")
+    if priority == INTERACTIVE and not _valid_ui_token(ui_token, time.time() if now is None else now):
+        metrics.incr('scheduler.interactive_downgraded')
+        return BULK
+    return priority
@@ -1,160 +1,76 @@
-import json
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 try:
     from .config import REPORT_CONFIG
     from .logger import logger
+    from .checks import (
+        HOME, BUILTIN_CHECKS, Check, CheckContext, active_checks, build_component,
+        check_scores, checks_for, evaluate_checks
+    )
 except ImportError:
     from config import REPORT_CONFIG
     from logger import logger
+    from checks import (
+        HOME, BUILTIN_CHECKS, Check, CheckContext, active_checks, build_component,
+        check_scores, checks_for, evaluate_checks
+    )
 
-def calculate_score(
-    base_url: str,
-    host: str,
-    is_us_guess: bool,
+def probe_outcomes(
     robots_res: Dict[str, Any],
     ucp_res: Dict[str, Any],
     home_res: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
-    Calculate the UCP compliance score based on check results.
+    Reduce the three built-in probe results to the flags scoring depends on.
+    The keys double as the column names accepted by batch_scorer.score_batch.
     """
-    logger.info(f"Calculating compliance score for {host}")
-    cfg = REPORT_CONFIG
-    w = cfg['scoring']['weights']
-    thr = cfg['scoring']['thresholds']
-    pen = cfg['scoring']['penalties']
-    
-    review_date = datetime.utcnow().isoformat()
-    
-    # --- Component 1: Robots.txt ---
-    robots_score = 0
-    robots_finding = ''
-    robots_detail = ''
-    robots_body = robots_res.get('body', '') or ''
-    robots_status = robots_res.get('statusCode', 0)
-    
-    # Defensive programming against None
-    if robots_body is None: robots_body = ""
-    
-    if robots_res.get('error') or not robots_body:
-        robots_score = 0
-        robots_finding = 'robots.txt unreachable or empty'
-        robots_detail = f"Endpoint: {base_url}/robots.txt; Status: {robots_status or 'N/A'}"
-    elif 'ucp' in robots_body.lower() or '.well-known/ucp' in robots_body.lower():
-        robots_score = w['robots']
-        robots_finding = 'UCP reference found in robots.txt'
-        robots_detail = f"Endpoint: {base_url}/robots.txt; Status: {robots_status or 'N/A'}"
-    else:
-        robots_score = 0
-        robots_finding = 'No UCP directive in robots.txt'
-        robots_detail = f"Endpoint: {base_url}/robots.txt; Status: {robots_status or 'N/A'}"
-        
-    component_robots = {
-        'key': 'robots',
-        'component': 'Robots.txt UCP directive',
-        'weight': f"{w['robots']}%",
-        'score': robots_score,
-        'maxScore': w['robots'],
-        'status': 'pass' if robots_score > 0 else 'fail',
-        'finding': robots_finding,
-        'detail': f"{cfg['scoring']['componentsCopy']['robots']}. {robots_detail}"
-    }
-
-    # --- Component 2: /.well-known/ucp ---
-    ucp_score = 0
-    ucp_finding = ''
-    ucp_detail = ''
-    ucp_json_valid = False
-    ucp_body = ucp_res.get('body', '') or ''
-    ucp_status = ucp_res.get('statusCode', 0)
-
-    # Defensive programming
-    if ucp_body is None: ucp_body = ""
-
-    if ucp_res.get('error') or ucp_status == 0:
-        ucp_score = 0
-        ucp_finding = 'UCP config unreachable (timeout or error)'
-        ucp_detail = f"Endpoint: {base_url}/.well-known/ucp; Status: {ucp_status or 'N/A'}"
-    elif ucp_status == 200:
-        try:
-            parsed = json.loads(ucp_body)
-            ucp_json_valid = isinstance(parsed, dict)
-        except Exception as e:
-            logger.debug(f"JSON parsing failed for UCP config: {e}")
-            ucp_json_valid = False
-            
-        if ucp_json_valid:
-            ucp_score = w['ucpConfig']
-            ucp_finding = 'UCP config found (valid JSON)'
-        else:
-            ucp_score = 0
-            ucp_finding = 'UCP config found but invalid (JSON validation error)'
-            
-        ucp_detail = f"Endpoint: {base_url}/.well-known/ucp; Status: {ucp_status}; JSON: {'valid' if ucp_json_valid else 'invalid/unknown'}"
-    else:
-        ucp_score = 0
-        ucp_finding = f"UCP config missing or blocked (HTTP {ucp_status})"
-        ucp_detail = f"Endpoint: {base_url}/.well-known/ucp; Status: {ucp_status}"
-        
-    component_ucp = {
-        'key': 'ucpConfig',
-        'component': 'UCP configuration file',
-        'weight': f"{w['ucpConfig']}%",
-        'score': ucp_score,
-        'maxScore': w['ucpConfig'],
-        'status': 'pass' if ucp_score > 0 else 'fail',
-        'finding': ucp_finding,
-        'detail': f"{cfg['scoring']['componentsCopy']['ucpConfig']}. {ucp_detail}"
-    }
+    responses = {'robots': robots_res, 'ucp': ucp_res, HOME: home_res}
+    return evaluate_checks(responses, checks_for(BUILTIN_CHECKS))
 
-    # --- Component 3: HTTP Headers ---
-    header_score = 0
-    header_finding = ''
-    header_detail = ''
-    home_status = home_res.get('statusCode', 0)
-    home_headers = home_res.get('headers', {}) or {}
-    home_headers_text = json.dumps(home_headers).lower()
+def component_scores(
+    outcome: Dict[str, Any],
+    weights: Dict[str, int],
+    checks: Optional[Sequence[Check]] = None
+) -> Tuple[int, ...]:
+    """Points earned per check; the built-in robots, UCP config and headers checks by default."""
+    return check_scores(outcome, checks_for(BUILTIN_CHECKS) if checks is None else checks, weights)
 
-    if home_res.get('error') or home_status == 0:
-        header_score = 0
-        header_finding = 'Homepage unreachable (timeout or error)'
-        header_detail = f"Endpoint: {base_url}; Status: {home_status or 'N/A'}"
-    elif 200 <= home_status < 400:
-        has_ucp_header = 'ucp' in home_headers_text or 'universal-content-protocol' in home_headers_text
-        header_score = w['headers'] if has_ucp_header else 0
-        header_finding = 'UCP-related headers detected' if has_ucp_header else 'No UCP-related headers detected'
-        header_detail = f"Endpoint: {base_url}; Status: {home_status}"
-    else:
-        header_score = 0
-        header_finding = f"Homepage returned unexpected status (HTTP {home_status})"
-        header_detail = f"Endpoint: {base_url}; Status: {home_status}"
-        
-    component_headers = {
-        'key': 'headers',
-        'component': 'UCP HTTP headers',
-        'weight': f"{w['headers']}%",
-        'score': header_score,
-        'maxScore': w['headers'],
-        'status': 'pass' if header_score > 0 else 'fail',
-        'finding': header_finding,
-        'detail': f"{cfg['scoring']['componentsCopy']['headers']}. {header_detail}"
-    }
+def build_result(
+    base_url: str,
+    host: str,
+    is_us_guess: bool,
+    outcome: Dict[str, Any],
+    scores: Tuple[int, ...],
+    review_date: str,
+    cfg: Optional[Dict[str, Any]] = None,
+    origin: Optional[str] = None,
+    redirect_chain: Optional[List[str]] = None,
+    checks: Optional[Sequence[Check]] = None
+) -> Dict[str, Any]:
+    """Materialize the full result dict (findings, details, status) for one host."""
+    cfg = cfg or REPORT_CONFIG
+    # robots.txt and the UCP config are probed on the canonical origin when it is known
+    origin = origin or base_url
+    thr = cfg['scoring']['thresholds']
+    checks = checks_for(BUILTIN_CHECKS) if checks is None else checks
+    ctx = CheckContext(base_url, origin, cfg)
 
-    components = [component_robots, component_ucp, component_headers]
-    weighted_average = max(0, min(100, round(robots_score + ucp_score + header_score)))
+    components = [build_component(check, outcome, score, ctx) for check, score in zip(checks, scores)]
+    weighted_average = max(0, min(100, round(sum(scores))))
 
     status = 'NON_COMPLIANT'
     if weighted_average >= thr['compliantMin']:
         status = 'COMPLIANT'
     elif weighted_average >= thr['partialMin']:
         status = 'PARTIAL'
-        
+
     cross_border = cfg['disclaimer']['crossBorderTemplateUS'] if is_us_guess else cfg['disclaimer']['crossBorderTemplateGeneric']
-    
+
     return {
-        'website': base_url, 
+        'website': base_url,
         'host': host,
+        'canonicalOrigin': origin,
+        'redirectChain': list(redirect_chain or []),
         'reviewDate': review_date,
         'weightedAverage': weighted_average,
         'status': status,
@@ -163,5 +79,48 @@ def calculate_score(
             'reviewerLocation': cfg['disclaimer']['reviewerLocation'],
             'crossBorder': cross_border
         },
-        'report': cfg 
+        'report': cfg
     }
+
+def score_probes(
+    base_url: str,
+    host: str,
+    is_us_guess: bool,
+    probes: Dict[str, Any],
+    checks: Optional[Sequence[Check]] = None
+) -> Dict[str, Any]:
+    """
+    Score the output of checker.probe_site with every active check (or `checks`).
+    """
+    logger.info("Calculating compliance score for %s", host)
+    cfg = REPORT_CONFIG
+    checks = active_checks(cfg) if checks is None else checks
+    review_date = datetime.utcnow().isoformat()
+
+    outcome = evaluate_checks(probes['responses'], checks)
+    scores = check_scores(outcome, checks, cfg['scoring']['weights'])
+    return build_result(
+        base_url, host, is_us_guess, outcome, scores, review_date, cfg,
+        probes['origin'], probes['redirectChain'], checks
+    )
+
+def calculate_score(
+    base_url: str,
+    host: str,
+    is_us_guess: bool,
+    robots_res: Dict[str, Any],
+    ucp_res: Dict[str, Any],
+    home_res: Dict[str, Any],
+    origin: Optional[str] = None,
+    redirect_chain: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Calculate the UCP compliance score from the three built-in probe results.
+    """
+    logger.info("Calculating compliance score for %s", host)
+    cfg = REPORT_CONFIG
+    review_date = datetime.utcnow().isoformat()
+
+    outcome = probe_outcomes(robots_res, ucp_res, home_res)
+    scores = component_scores(outcome, cfg['scoring']['weights'])
+    return build_result(base_url, host, is_us_guess, outcome, scores, review_date, cfg, origin, redirect_chain)
@@ -0,0 +1,44 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from artifacts import send_artifact, write_variants
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+
+    @app.route('/view/<filename>')
+    def view(filename):
+        return send_artifact(str(tmp_path), filename)
+
+    html = tmp_path / 'report.html'
+    html.write_text('<html>' + 'compliance ' * 500 + '</html>')
+    write_variants(str(html))
+    return app.test_client()
+
+
+def test_negotiates_gzip(client):
+    res = client.get('/view/report.html', headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(res.data).startswith(b'<html>')
+    assert 'immutable' in res.headers['Cache-Control']
+
+
+def test_identity_and_conditional_get(client):
+    res = client.get('/view/report.html', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in res.headers and res.data.startswith(b'<html>')
+    again = client.get('/view/report.html', headers={'If-None-Match': res.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_range_is_served_from_the_uncompressed_file(client):
+    res = client.get('/view/report.html', headers={'Range': 'bytes=0-5', 'Accept-Encoding': 'gzip'})
+    assert res.status_code == 206 and res.data == b'<html>'
+
+
+@pytest.mark.parametrize('name', ['report.html.gz', 'report.html.br', 'missing.html'])
+def test_variants_are_not_served_by_name(client, name):
+    assert client.get(f"/view/{name}").status_code == 404
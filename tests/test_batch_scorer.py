@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch_scorer import columns_from_results, score_batch
+from scorer import calculate_score
+
+
+def _res(status, body='', headers=None, error=None):
+    return {'statusCode': status, 'body': body, 'headers': headers or {}, 'url': 'https://example.com', 'redirects': [], 'error': error}
+
+
+ROWS = [
+    (_res(200, 'User-agent: *\nAllow: /'), _res(200, '{"version": "1.0"}'), _res(200)),
+    (_res(404), _res(404), _res(200)),
+    (_res(0, error='timeout'), _res(0, error='timeout'), _res(0, error='timeout')),
+]
+
+
+def _score(is_us_guess):
+    urls = [f"https://site{i}.example" for i in range(len(ROWS))]
+    hosts = [f"site{i}.example" for i in range(len(ROWS))]
+    return urls, hosts, score_batch(urls, hosts, is_us_guess, columns_from_results(ROWS), review_date='2026-01-01')
+
+
+@pytest.mark.parametrize('is_us_guess', [True, False, [True, False, True]])
+def test_matches_calculate_score(is_us_guess):
+    urls, hosts, batch = _score(is_us_guess)
+    flags = np.broadcast_to(is_us_guess, (len(ROWS),))
+    for i, (robots, ucp, home) in enumerate(ROWS):
+        expected = calculate_score(urls[i], hosts[i], bool(flags[i]), robots, ucp, home)
+        got = batch.result(i)
+        expected['reviewDate'] = got['reviewDate']
+        assert got == expected
+
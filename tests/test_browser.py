@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+import browser
+from browser import BrowserRenderer
+from cancellation import CancelToken, ScanCancelled
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+class FakeRenderer(BrowserRenderer):
+    async def _start_browser(self):
+        self._relaunch_lock = asyncio.Lock()
+        self._browser = FakeBrowser()
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.setitem(browser.SCANNER_CONFIG['pdf'], 'renderTimeoutSeconds', 0.5)
+    r = FakeRenderer()
+    yield r
+    r.stop()
+
+
+async def _hang(_browser):
+    await asyncio.sleep(3600)
+
+
+def test_run_returns_result(renderer):
+    async def render(_browser):
+        return 'pdf'
+
+    assert renderer.run(render) == 'pdf'
+
+
+def test_run_raises_the_render_error(renderer):
+    async def render(_browser):
+        raise ValueError('bad page')
+
+    with pytest.raises(ValueError):
+        renderer.run(render)
+
+
+def test_hanging_render_times_out(renderer):
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        renderer.run(_hang)
+    assert time.monotonic() - started < 3
+
+
+def test_cancel_token_stops_waiting(renderer, monkeypatch):
+    monkeypatch.setitem(browser.SCANNER_CONFIG['pdf'], 'renderTimeoutSeconds', 60)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(ScanCancelled):
+        renderer.run(_hang, token)
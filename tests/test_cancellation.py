@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import cancellation
+from cancellation import ScanIdInUse, cancel_scan, register, unregister
+
+
+@pytest.fixture(autouse=True)
+def marker_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cancellation, 'CANCEL_MARKER_DIR', str(tmp_path))
+    yield tmp_path
+    cancellation._active.clear()
+
+
+def test_register_rejects_an_id_already_running_here():
+    token = register('scan-a')
+    with pytest.raises(ScanIdInUse):
+        register('scan-a')
+    assert cancel_scan('scan-a')
+    assert token.cancelled
+
+
+def test_register_rejects_an_id_running_on_another_worker(marker_dir):
+    (marker_dir / 'scan-a.running').write_text(str(os.getppid()))
+    with pytest.raises(ScanIdInUse):
+        register('scan-a')
+    # The rejected attempt must not touch the running scan's record
+    assert (marker_dir / 'scan-a.running').exists()
+
+
+def test_register_takes_over_a_dead_workers_record(marker_dir, monkeypatch):
+    (marker_dir / 'scan-a.running').write_text('12345')
+
+    def no_such_process(pid, sig):
+        raise ProcessLookupError
+
+    monkeypatch.setattr(cancellation.os, 'kill', no_such_process)
+    register('scan-a')
+    assert (marker_dir / 'scan-a.running').read_text() == str(os.getpid())
+
+
+def test_id_is_free_again_after_unregister(marker_dir):
+    register('scan-a')
+    unregister('scan-a')
+    assert not (marker_dir / 'scan-a.running').exists()
+    token = register('scan-a')
+    assert not token.cancelled
+
+
+def test_register_clears_a_stale_cancel_marker(marker_dir):
+    (marker_dir / 'scan-a').write_text('cancel requested')
+    register('scan-a')
+    assert not (marker_dir / 'scan-a').exists()
+
+
+def test_cancel_unknown_scan_leaves_no_marker(marker_dir):
+    assert not cancel_scan('scan-b')
+    assert not (marker_dir / 'scan-b').exists()
+
+
+def test_empty_record_blocks_only_during_the_grace_period(marker_dir):
+    record = marker_dir / 'scan-a.running'
+    record.write_text('')
+    with pytest.raises(ScanIdInUse):
+        register('scan-a')
+    old = record.stat().st_mtime - cancellation.RUNNING_GRACE_SECONDS - 1
+    os.utime(record, (old, old))
+    register('scan-a')
+    assert record.read_text() == str(os.getpid())
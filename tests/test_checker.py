@@ -0,0 +1,41 @@
+import pytest
+
+import checker
+
+
+def _response(url, status=200, error=None, redirects=()):
+    return {'url': url, 'statusCode': status, 'headers': {}, 'body': '', 'redirects': list(redirects), 'error': error}
+
+
+@pytest.fixture(autouse=True)
+def origin_cache():
+    checker.clear_origin_cache()
+    checker.cache_origin('http://example.com', 'https://www.example.com', 'https://www.example.com/', [])
+    yield
+    checker.clear_origin_cache()
+
+
+def _fake_fetch(home):
+    def fetch_resource(resource, base_url, cancel_token=None):
+        if resource.name == checker.HOME:
+            return home
+        return _response(f"{base_url}{resource.path}")
+    return fetch_resource
+
+
+def test_cached_origin_is_kept_when_the_homepage_loads(monkeypatch):
+    monkeypatch.setattr(checker, 'fetch_resource', _fake_fetch(_response('https://www.example.com/')))
+    probes = checker.probe_site('http://example.com')
+    assert probes['originCached']
+    assert checker.get_cached_origin('http://example.com') is not None
+
+
+@pytest.mark.parametrize('home', [
+    _response('https://www.example.com/', redirects=['https://www.example.com/']),
+    _response('https://www.example.com/', status=0, error='Connection refused'),
+    _response('https://www.example.com/', status=0),
+])
+def test_cached_origin_is_dropped_when_the_homepage_moves_or_fails(monkeypatch, home):
+    monkeypatch.setattr(checker, 'fetch_resource', _fake_fetch(home))
+    checker.probe_site('http://example.com')
+    assert checker.get_cached_origin('http://example.com') is None
@@ -0,0 +1,40 @@
+import pytest
+
+import checks
+from checks import CHECKS, HOME, RESOURCES, active_checks, register_check, required_resources
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(checks, 'CHECKS', dict(CHECKS))
+    monkeypatch.setattr(checks, 'RESOURCES', dict(RESOURCES))
+
+
+def test_built_in_checks_in_registration_order():
+    assert [c.key for c in active_checks()] == ['robots', 'ucpConfig', 'headers']
+
+
+def test_each_resource_is_fetched_once_in_order_of_first_use():
+    assert [r.name for r in required_resources(active_checks())] == ['robots', 'ucp', HOME]
+
+
+def test_resource_size_limits():
+    ucp_limit = checks.SCANNER_CONFIG['ucpValidation']['maxBytes']
+    # Twice the validator's limit: a UTF-16 body shrinks by about half once re-encoded as UTF-8
+    assert RESOURCES['ucp'].max_bytes == 2 * ucp_limit
+    assert RESOURCES['robots'].max_bytes is None
+    assert RESOURCES[HOME].max_bytes is None
+
+
+def test_only_weighted_checks_are_active(registry):
+    register_check('extra', 'Extra', ['robots'], lambda r: {}, lambda o: True, lambda o, c: ('', '', {}))
+    assert 'extra' not in [c.key for c in active_checks()]
+    cfg = {'scoring': {'weights': {'headers': 50, 'extra': 50}}}
+    assert [c.key for c in checks.active_checks(cfg)] == ['headers', 'extra']
+    # A new check on an existing resource adds nothing to fetch
+    assert [r.name for r in required_resources(checks.active_checks(cfg))] == [HOME, 'robots']
+
+
+def test_unknown_resource_is_rejected(registry):
+    with pytest.raises(ValueError, match='sitemap'):
+        register_check('sitemap', 'Sitemap', ['sitemap'], lambda r: {}, lambda o: True, lambda o, c: ('', '', {}))
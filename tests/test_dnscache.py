@@ -0,0 +1,141 @@
+import socket
+import threading
+
+import pytest
+
+from dnscache import Answer, DNSCache, StubResolver
+
+CFG = {
+    'resolver': 'system',
+    'defaultTtlSeconds': 300,
+    'minTtlSeconds': 30,
+    'maxTtlSeconds': 3600,
+    'negativeTtlSeconds': 60,
+    'maxEntries': 3,
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_cache(resolver, clock, **overrides):
+    return DNSCache(dict(CFG, **overrides), resolver, clock)
+
+
+def test_answers_are_cached_until_their_ttl(clock):
+    stub = StubResolver({'example.com': ['192.0.2.1']}, ttl=120)
+    cache = make_cache(stub, clock)
+    assert cache.lookup('Example.COM.') == ((socket.AF_INET, '192.0.2.1'),)
+    clock.now += 119
+    cache.lookup('example.com')
+    assert stub.calls['example.com'] == 1
+    clock.now += 2
+    cache.lookup('example.com')
+    assert stub.calls['example.com'] == 2
+
+
+@pytest.mark.parametrize('ttl, lifetime', [(1, 30), (86400, 3600), (None, 300)])
+def test_ttl_is_clamped(clock, ttl, lifetime):
+    stub = StubResolver({'example.com': ['192.0.2.1']}, ttl=ttl)
+    cache = make_cache(stub, clock)
+    cache.lookup('example.com')
+    clock.now += lifetime - 1
+    cache.lookup('example.com')
+    assert stub.calls['example.com'] == 1
+    clock.now += 2
+    cache.lookup('example.com')
+    assert stub.calls['example.com'] == 2
+
+
+def test_nxdomain_is_cached_for_the_negative_ttl(clock):
+    stub = StubResolver()
+    cache = make_cache(stub, clock)
+    for _ in range(3):
+        with pytest.raises(socket.gaierror) as e:
+            cache.lookup('missing.example')
+        assert e.value.errno == socket.EAI_NONAME
+    assert stub.calls['missing.example'] == 1
+    assert cache.stats()['negative_hits'] == 2
+    clock.now += 61
+    stub.add('missing.example', '192.0.2.7')
+    assert cache.lookup('missing.example') == ((socket.AF_INET, '192.0.2.7'),)
+
+
+def test_temporary_failures_are_not_cached(clock):
+    calls = []
+
+    def flaky(host):
+        calls.append(host)
+        raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+
+    cache = make_cache(flaky, clock)
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            cache.lookup('example.com')
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    stub = StubResolver({h: ['192.0.2.1'] for h in ('a.test', 'b.test', 'c.test', 'd.test')})
+    cache = make_cache(stub, clock)
+    for host in ('a.test', 'b.test', 'c.test'):
+        cache.lookup(host)
+    cache.lookup('a.test')  # now b.test is the oldest
+    cache.lookup('d.test')
+    assert cache.stats()['entries'] == 3
+    cache.lookup('a.test')
+    cache.lookup('b.test')
+    assert stub.calls['a.test'] == 1
+    assert stub.calls['b.test'] == 2
+
+
+def test_ip_literals_skip_the_resolver(clock):
+    stub = StubResolver()
+    cache = make_cache(stub, clock)
+    assert cache.lookup('2001:db8::1') == ((socket.AF_INET6, '2001:db8::1'),)
+    assert not stub.calls
+
+
+def test_concurrent_lookups_share_one_resolver_call(clock):
+    release = threading.Event()
+    calls = []
+
+    def slow(host):
+        calls.append(host)
+        release.wait(5)
+        return Answer(((socket.AF_INET, '192.0.2.1'),), 60)
+
+    cache = make_cache(slow, clock)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.lookup('example.com'))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    # Let every thread reach the cache before the one resolver call returns
+    for _ in range(500):
+        if cache.stats().get('coalesced', 0) == 7:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == ['example.com']
+    assert results == [((socket.AF_INET, '192.0.2.1'),)] * 8
+
+
+def test_getaddrinfo_filters_by_family(clock):
+    stub = StubResolver({'example.com': ['192.0.2.1', '2001:db8::1']})
+    cache = make_cache(stub, clock)
+    assert cache.getaddrinfo('example.com', 443, socket.AF_INET6) == [
+        (socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', ('2001:db8::1', 443, 0, 0))
+    ]
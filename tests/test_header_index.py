@@ -0,0 +1,34 @@
+import pytest
+
+import header_index
+from header_index import match_ucp_headers
+
+
+def test_matches_on_name_case_insensitively():
+    assert match_ucp_headers({'X-UCP-Version': '1.0', 'Content-Type': 'text/html'}) == [
+        {'header': 'X-UCP-Version', 'value': '1.0', 'matchedOn': 'name'}
+    ]
+
+
+@pytest.mark.parametrize('value, matched', [
+    ('UCP-Enabled', True),
+    ('noindex, ucp', True),
+    ('universal-content-protocol', True),
+    ('session=abcucp123', False),
+    ('', False),
+])
+def test_value_needs_ucp_as_a_token(value, matched):
+    assert bool(match_ucp_headers({'X-Robots-Tag': value})) is matched
+
+
+def test_none_values_and_missing_headers():
+    assert match_ucp_headers(None) == []
+    assert match_ucp_headers({'X-Robots-Tag': None}) == []
+
+
+def test_name_results_are_cached():
+    header_index._name_matches.cache_clear()
+    for _ in range(3):
+        match_ucp_headers({'Server': 'nginx', 'UCP-Config': '/.well-known/ucp'})
+    info = header_index._name_matches.cache_info()
+    assert info.misses == 2 and info.hits == 4
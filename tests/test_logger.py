@@ -0,0 +1,72 @@
+import json
+import logging
+import queue
+import sys
+import time
+
+import pytest
+
+import metrics
+from logger import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, TextFormatter, scan_context, ScanContextFilter
+
+
+def _record(msg='Request failed for %s', args=('https://a.test',), level=logging.WARNING, name='ucp_scanner'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    metrics.reset()
+    handler = NonBlockingQueueHandler(queue.Queue(2), TextFormatter())
+    started = time.monotonic()
+    for _ in range(5):
+        handler.handle(_record())
+    assert time.monotonic() - started < 0.5
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert metrics.snapshot()['counters']['log.dropped'] == 3
+
+
+def test_queued_records_are_preformatted():
+    handler = NonBlockingQueueHandler(queue.Queue(), TextFormatter())
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = _record(level=logging.ERROR)
+        record.exc_info = sys.exc_info()
+    handler.handle(record)
+    queued = handler.queue.get_nowait()
+    assert queued.msg == 'Request failed for https://a.test' and queued.args is None
+    assert queued.exc_info is None and 'ValueError: boom' in queued.exc_text
+
+
+def test_sampling_caps_warnings_per_template():
+    sampler = SamplingFilter(window_seconds=60, max_per_window=2)
+    passed = [sampler.filter(_record(args=(f"https://{i}.test",))) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Other templates and other levels are not affected
+    assert sampler.filter(_record(msg='Other warning %s'))
+    assert all(sampler.filter(_record(level=logging.ERROR)) for _ in range(5))
+    assert all(sampler.filter(_record(level=logging.INFO)) for _ in range(5))
+
+
+def test_next_window_reports_the_suppressed_count(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('logger.time.monotonic', lambda: now[0])
+    sampler = SamplingFilter(window_seconds=60, max_per_window=1)
+    for _ in range(4):
+        sampler.filter(_record())
+    now[0] += 61
+    record = _record()
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+    assert '(3 similar messages suppressed)' in TextFormatter('%(message)s').format(record)
+
+
+@pytest.mark.parametrize('scan_id', ['scan-1', None])
+def test_json_lines_carry_the_scan_id(scan_id):
+    record = _record()
+    with scan_context(scan_id):
+        ScanContextFilter().filter(record)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['msg'] == 'Request failed for https://a.test' and entry['level'] == 'WARNING'
+    assert entry.get('scan_id') == scan_id
@@ -0,0 +1,120 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NameResolutionError
+
+import checker
+
+URL = 'https://example.com/robots.txt'
+
+
+class FakeResponse:
+    def __init__(self, status, body=b'ok', headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.url = URL
+        self.history = []
+        self.encoding = 'utf-8'
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        yield self._body
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.acquired = 0
+        self.penalties = []
+
+    def acquire(self, url, cancel_token=None):
+        self.acquired += 1
+        return 0.0
+
+    def penalize(self, url, seconds):
+        self.penalties.append(seconds)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """Scripted outcomes for successive GETs: FakeResponse instances or exceptions to raise."""
+    state = type('State', (), {})()
+    state.outcomes = []
+    state.sleeps = []
+    state.limiter = FakeLimiter()
+
+    class Session:
+        def get(self, url, **kwargs):
+            outcome = state.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+    monkeypatch.setattr(checker, '_session', Session)
+    monkeypatch.setattr(checker, 'limiter', state.limiter)
+    monkeypatch.setattr(checker, '_sleep', lambda seconds, token: state.sleeps.append(seconds))
+    monkeypatch.setattr(checker, 'backoff_delay', lambda attempt: 0.5 * (attempt + 1))
+    return state
+
+
+def test_success_passes_through_the_limiter(fake):
+    fake.outcomes = [FakeResponse(200, b'User-agent: *')]
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 200 and res['body'] == 'User-agent: *'
+    assert fake.limiter.acquired == 1
+
+
+def test_connection_errors_are_retried_with_backoff(fake):
+    fake.outcomes = [requests.exceptions.ConnectionError('reset'), requests.exceptions.ConnectTimeout('slow'), FakeResponse(200)]
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 200
+    assert fake.sleeps == [0.5, 1.0]
+    assert fake.limiter.acquired == 3
+
+
+def test_retries_stop_at_max_retries(fake):
+    fake.outcomes = [requests.exceptions.ConnectionError('reset')] * 3
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 0 and res['error'] == 'reset'
+    assert len(fake.sleeps) == checker.SCANNER_CONFIG['rateLimit']['maxRetries']
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.SSLError('certificate verify failed'),
+    requests.exceptions.ReadTimeout('stalled'),
+    requests.exceptions.ConnectionError(MaxRetryError(None, URL, NameResolutionError('example.com', None, 'no such host'))),
+])
+def test_permanent_failures_are_not_retried(fake, error):
+    fake.outcomes = [error]
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 0
+    assert fake.sleeps == []
+
+
+def test_retry_after_pauses_the_host(fake):
+    fake.outcomes = [FakeResponse(429, headers={'Retry-After': '2'}), FakeResponse(200)]
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 200
+    assert fake.limiter.penalties == [2.0]
+
+
+def test_retry_after_beyond_the_cap_is_reported_as_is(fake):
+    fake.outcomes = [FakeResponse(503, headers={'Retry-After': '3600'})]
+    res = checker.make_request(URL, {})
+    assert res['statusCode'] == 503
+    assert fake.limiter.penalties == []
+
+
+def test_retries_that_would_pass_the_deadline_are_skipped(fake, monkeypatch):
+    monkeypatch.setitem(checker.SCANNER_CONFIG['rateLimit'], 'probeDeadlineSeconds', 1)
+    fake.outcomes = [FakeResponse(429, headers={'Retry-After': '5'})]
+    assert checker.make_request(URL, {})['statusCode'] == 429
+    fake.outcomes = [requests.exceptions.ConnectionError('reset'), requests.exceptions.ConnectionError('reset')]
+    res = checker.make_request(URL, {})
+    # The first backoff (0.5s) fits in the deadline, the second (1.0s) does not
+    assert res['statusCode'] == 0
+    assert fake.sleeps == [0.5]
@@ -0,0 +1,22 @@
+from pdf_native import MONO, build_pdf, hard_wrap, text_width
+from scorer import calculate_score
+
+
+def test_hard_wrap_keeps_spacing_and_fits():
+    line = '    "endpoint": "https://' + 'a' * 120 + '.example.com/.well-known/ucp"'
+    pieces = hard_wrap(line, MONO, 9, 200)
+    assert ''.join(pieces) == line
+    assert pieces[0].startswith('    "endpoint"')
+    assert all(text_width(p, MONO, 9) <= 200 for p in pieces)
+
+
+def test_hard_wrap_leaves_short_and_empty_lines_alone():
+    assert hard_wrap('  {', MONO, 9, 200) == ['  {']
+    assert hard_wrap('', MONO, 9, 200) == ['']
+
+
+def test_report_with_long_host_builds():
+    host = 'very-long-subdomain-name-for-testing.' * 4 + 'example.com'
+    failed = {'statusCode': 404, 'body': '', 'headers': {}, 'url': f"https://{host}", 'redirects': [], 'error': None}
+    result = calculate_score(f"https://{host}", host, False, failed, failed, failed)
+    assert build_pdf(result).startswith(b'%PDF')
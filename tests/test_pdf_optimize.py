@@ -0,0 +1,49 @@
+import pytest
+
+pikepdf = pytest.importorskip('pikepdf')
+
+import pdf_optimize
+from pdf_native import build_pdf
+from scorer import calculate_score
+
+CONTENT = b'BT /F1 12 Tf 72 720 Td (UCP compliance report) Tj ET\n' * 200
+
+
+def _bloated_pdf(path):
+    """Three pages drawing the same uncompressed content from separate streams."""
+    pdf = pikepdf.new()
+    for _ in range(3):
+        pdf.add_blank_page(page_size=(595, 842))
+        pdf.pages[-1].Contents = pdf.make_stream(CONTENT)
+    pdf.save(path, compress_streams=False, object_stream_mode=pikepdf.ObjectStreamMode.disable)
+
+
+def test_output_is_smaller_and_still_opens(tmp_path):
+    path = str(tmp_path / 'report.pdf')
+    _bloated_pdf(path)
+    stats = pdf_optimize.optimize_pdf(path)
+    assert stats['optimized'] and stats['bytesAfter'] < stats['bytesBefore'] / 4
+    assert stats['duplicateStreams'] == 2
+    with pikepdf.open(path) as pdf:
+        assert len(pdf.pages) == 3
+        assert all(page.Contents.read_bytes() == CONTENT for page in pdf.pages)
+
+
+def test_native_report_survives_optimization(tmp_path):
+    failed = {'statusCode': 404, 'body': '', 'headers': {}, 'url': 'https://example.com', 'redirects': [], 'error': None}
+    path = tmp_path / 'report.pdf'
+    path.write_bytes(build_pdf(calculate_score('https://example.com', 'example.com', False, failed, failed, failed)))
+    before = path.stat().st_size
+    stats = pdf_optimize.optimize_pdf(str(path))
+    assert stats['bytesAfter'] <= before == stats['bytesBefore']
+    with pikepdf.open(path) as pdf:
+        assert len(pdf.pages) >= 1
+
+
+def test_without_pikepdf_the_file_is_left_alone(tmp_path, monkeypatch):
+    path = tmp_path / 'report.pdf'
+    _bloated_pdf(str(path))
+    data = path.read_bytes()
+    monkeypatch.setattr(pdf_optimize, 'pikepdf', None)
+    stats = pdf_optimize.optimize_pdf(str(path))
+    assert not stats['optimized'] and path.read_bytes() == data
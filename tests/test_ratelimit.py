@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+import ratelimit
+from ratelimit import RateLimiter, TokenBucket, network_key, parse_retry_after
+
+CFG = {
+    'perHost': {'rate': 2, 'burst': 2},
+    'perNetwork': {'rate': 100, 'burst': 100},
+    'global': {'rate': 100, 'burst': 100},
+    'maxBuckets': 2,
+}
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate():
+    bucket = TokenBucket(rate=2, burst=2)
+    now = bucket.updated
+    for _ in range(2):
+        assert bucket.delay(now) == 0
+        bucket.take()
+    assert bucket.delay(now) == pytest.approx(0.5)
+    assert bucket.delay(now + 0.5) == 0
+    # Idle time never banks more than the burst
+    assert bucket.delay(now + 100) == 0 and bucket.tokens == 2
+
+
+def test_blocked_bucket_waits_for_retry_after():
+    bucket = TokenBucket(rate=2, burst=2)
+    now = bucket.updated
+    bucket.blocked_until = now + 3
+    assert bucket.delay(now) == pytest.approx(3)
+    assert not bucket.idle(now)
+
+
+def test_limiter_spaces_requests_to_one_host():
+    limiter = RateLimiter(CFG, resolver=lambda host: '192.0.2.1')
+    assert limiter.acquire('https://a.test/') == pytest.approx(0, abs=0.05)
+    assert limiter.acquire('https://a.test/x') == pytest.approx(0, abs=0.05)
+    assert limiter.acquire('https://a.test/y') == pytest.approx(0.5, abs=0.15)
+    # Another host on the same network is not held back by a.test's bucket
+    assert limiter.acquire('https://b.test/') == pytest.approx(0, abs=0.05)
+
+
+def test_penalize_pauses_only_that_host():
+    limiter = RateLimiter(CFG, resolver=lambda host: None)
+    limiter.penalize('https://a.test/', 0.3)
+    started = time.monotonic()
+    limiter.acquire('https://b.test/')
+    assert time.monotonic() - started < 0.1
+    assert limiter.acquire('https://a.test/') == pytest.approx(0.3, abs=0.15)
+
+
+def test_idle_buckets_are_evicted_at_max_buckets():
+    limiter = RateLimiter(CFG, resolver=lambda host: None)
+    limiter._bucket('host:a.test', CFG['perHost'])
+    limiter._bucket('host:b.test', CFG['perHost']).take()
+    limiter._bucket('host:c.test', CFG['perHost'])
+    assert set(limiter._buckets) == {'host:b.test', 'host:c.test'}
+
+
+def test_network_key_groups_by_prefix():
+    assert network_key('192.0.2.10') == network_key('192.0.2.200') == '192.0.2.0/24'
+    assert network_key('2001:db8:1:2::1') == '2001:db8:1::/48'
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('5', 5.0), (None, None), ('soon', None), ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_backoff_is_capped(monkeypatch):
+    monkeypatch.setattr(ratelimit.random, 'uniform', lambda low, high: high)
+    cfg = ratelimit.SCANNER_CONFIG['rateLimit']
+    assert ratelimit.backoff_delay(0) == cfg['backoffBaseSeconds']
+    assert ratelimit.backoff_delay(30) == cfg['backoffMaxSeconds']
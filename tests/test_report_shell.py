@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import pytest
+
+import app as app_module
+from report_shell import report_shell
+from reporter import report_view
+from scorer import calculate_score
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def _result():
+    ok = {'statusCode': 200, 'body': 'User-agent: *\nAllow: /', 'headers': {'X-UCP-Version': '1'}, 'url': 'https://example.com', 'redirects': [], 'error': None}
+    missing = dict(ok, statusCode=404, body='', headers={})
+    return calculate_score('https://example.com', 'example.com', False, ok, missing, ok)
+
+
+def test_version_is_a_hash_of_the_page():
+    shell = report_shell()
+    assert len(shell.version) == 12
+    assert report_shell() is shell
+    assert gzip.decompress(shell.encoded['gzip']) == shell.html
+
+
+def test_shell_is_served_compressed_and_cached(client):
+    version = report_shell().version
+    res = client.get(f"/report/{version}/", headers={'Accept-Encoding': 'gzip'})
+    assert res.status_code == 200 and res.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in res.headers['Cache-Control']
+    again = client.get(f"/report/{version}/", headers={'Accept-Encoding': 'gzip', 'If-None-Match': res.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_old_version_redirects_to_the_current_one(client):
+    res = client.get('/report/0123456789ab/')
+    assert res.status_code == 302
+    assert res.headers['Location'].endswith(f"/{report_shell().version}/")
+
+
+def test_report_view_has_what_the_shell_draws():
+    view = report_view(_result())
+    assert view['host'] == 'example.com' and view['status']['text']
+    assert {c['key'] for c in view['components']} >= {'robots', 'ucpConfig', 'headers'}
+    by_key = {c['key']: c for c in view['components']}
+    assert by_key['ucpConfig']['status'] != 'pass' and by_key['ucpConfig']['recommendation']['code']
+    assert by_key['headers']['status'] == 'pass' and by_key['headers']['recommendation'] is None
+    assert view['disclaimer']['paragraphs']
+    # Small and JSON-clean: no config snapshot travels with it
+    assert 'report' not in view
+    assert len(json.dumps(view)) < 8192
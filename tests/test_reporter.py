@@ -0,0 +1,20 @@
+import os
+
+import reporter
+from scorer import calculate_score
+
+
+def _result():
+    failed = {'statusCode': 404, 'body': '', 'headers': {}, 'url': 'https://example.com', 'redirects': [], 'error': None}
+    return calculate_score('https://example.com', 'example.com', False, failed, failed, failed)
+
+
+def test_playwright_backend_writes_html_with_variants(tmp_path, monkeypatch):
+    monkeypatch.setitem(reporter.SCANNER_CONFIG['pdf'], 'backend', 'playwright')
+    monkeypatch.setitem(reporter.SCANNER_CONFIG['pdf'], 'optimize', False)
+    printed = []
+    monkeypatch.setattr(reporter, 'generate_pdf', lambda html, pdf, token=None: printed.append(html))
+    html = str(tmp_path / 'report.html')
+    assert reporter.render_pdf(_result(), html, str(tmp_path / 'report.pdf')) == 'playwright'
+    assert printed == [html]
+    assert os.path.exists(html + '.gz')
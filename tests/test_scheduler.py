@@ -0,0 +1,35 @@
+import pytest
+
+import scheduler
+from scheduler import BULK, INTERACTIVE, issue_ui_token, resolve_priority
+
+
+def test_default_is_bulk():
+    assert resolve_priority(None, None) == BULK
+
+
+def test_unknown_class_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_priority('urgent', None)
+
+
+def test_interactive_with_ui_token():
+    assert resolve_priority(INTERACTIVE, issue_ui_token()) == INTERACTIVE
+
+
+@pytest.mark.parametrize('token', [None, '', 'garbage', '9999999999.deadbeef'])
+def test_interactive_without_valid_token_is_downgraded(token):
+    assert resolve_priority(INTERACTIVE, token) == BULK
+
+
+def test_expired_token_is_downgraded():
+    token = issue_ui_token(now=1000)
+    ttl = scheduler.SCANNER_CONFIG['scheduler']['uiTokenTtlSeconds']
+    assert resolve_priority(INTERACTIVE, token, now=1000 + ttl - 1) == INTERACTIVE
+    assert resolve_priority(INTERACTIVE, token, now=1000 + ttl + 1) == BULK
+
+
+def test_token_from_another_key_is_downgraded(monkeypatch):
+    token = issue_ui_token()
+    monkeypatch.setattr(scheduler, '_ui_secret', b'other')
+    assert resolve_priority(INTERACTIVE, token) == BULK
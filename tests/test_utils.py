@@ -0,0 +1,12 @@
+import pytest
+
+from utils import normalize_url
+
+
+def test_adds_https_and_keeps_the_port():
+    assert normalize_url('example.us:8443') == ('example.us:8443', 'https://example.us:8443', 'example.us', 'us', True)
+
+
+@pytest.mark.parametrize('raw', ['example.com:abc', 'example.com:99999', 'https://'])
+def test_rejects_malformed_urls(raw):
+    assert normalize_url(raw)[1] is None
@@ -0,0 +1,80 @@
+import json
+import time
+
+import pytest
+
+from validator import _exceeds_depth, validate_many, validate_ucp_config
+
+GOOD = json.dumps({'version': '1.0', 'publisher': 'Example', 'ai_training': 'opt-out'})
+
+
+def test_valid_config():
+    result = validate_ucp_config(GOOD)
+    assert result['valid'] and result['schemaValid']
+    assert result['findings'] == []
+    assert result['parsed']['publisher'] == 'Example'
+
+
+def test_size_limit_counts_utf8_bytes():
+    body = json.dumps({'version': '1.0', 'publisher': 'é' * 40}, ensure_ascii=False)
+    assert validate_ucp_config(body, max_bytes=len(body) + 40)['valid']
+    result = validate_ucp_config(body, max_bytes=len(body) + 20)
+    assert not result['valid']
+    assert 'limit is' in result['findings'][0]['message']
+
+
+def test_truncated_body_is_rejected_without_parsing():
+    result = validate_ucp_config('{"version": "1.', truncated=True)
+    assert not result['valid']
+    assert 'download stopped' in result['findings'][0]['message']
+
+
+def test_depth_limit():
+    assert validate_ucp_config('[' * 16 + ']' * 16, max_depth=16)['findings'][0]['message'].startswith('Top-level')
+    result = validate_ucp_config('[' * 17 + ']' * 17, max_depth=16)
+    assert 'depth limit' in result['findings'][0]['message']
+
+
+def test_brackets_inside_strings_do_not_count_toward_depth():
+    body = json.dumps({'version': '1.0', 'publisher': '[' * 100})
+    assert validate_ucp_config(body, max_depth=2)['schemaValid']
+
+
+@pytest.mark.parametrize('body, expected', [
+    (r'{"a": "\\\"[[["}', False),
+    (r'{"a": "x\\"}' + '[' * 3, True),
+])
+def test_escapes_inside_strings(body, expected):
+    assert _exceeds_depth(body, 2) is expected
+
+
+def test_depth_check_is_linear_on_hostile_quoting():
+    body = '"\\' * 32750 + '[' * 17
+    assert len(body.encode()) <= 65536
+    started = time.process_time()
+    validate_ucp_config(body)
+    assert time.process_time() - started < 0.5
+
+
+@pytest.mark.parametrize('body, message', [
+    ('not json', 'Body is not valid JSON'),
+    ('[]', 'Top-level value must be an object, got list'),
+])
+def test_malformed_bodies(body, message):
+    result = validate_ucp_config(body)
+    assert not result['valid']
+    assert result['findings'][0]['message'] == message
+
+
+def test_schema_findings():
+    result = validate_ucp_config(json.dumps({'version': 1, 'ai_training': 'maybe'}))
+    assert result['valid'] and not result['schemaValid']
+    by_field = {f['field']: f for f in result['findings']}
+    assert by_field['version']['message'] == 'Expected str, got int'
+    assert by_field['publisher']['message'] == 'Required field is missing'
+    assert by_field['ai_training']['severity'] == 'warning'
+
+
+def test_validate_many_matches_single():
+    bodies = [GOOD, 'not json', '{}']
+    assert validate_many(bodies) == [validate_ucp_config(b) for b in bodies]
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import warmup
+
+
+@pytest.fixture
+def fresh_worker(monkeypatch):
+    monkeypatch.setenv('UCP_WARMUP', '1')
+    monkeypatch.setitem(warmup.SCANNER_CONFIG['warmup'], 'browser', 'never')
+    monkeypatch.setattr(warmup, '_process_warm', False)
+    monkeypatch.setattr(warmup, '_process_ok', False)
+    warmup._reset_after_fork()
+    yield app_module.app.test_client()
+    warmup._reset_after_fork()
+
+
+def _wait_for(client, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        res = client.get('/readyz')
+        if res.status_code == status or time.monotonic() > deadline:
+            return res
+        time.sleep(0.02)
+
+
+def test_readyz_turns_200_once_warm(fresh_worker, monkeypatch):
+    release = threading.Event()
+    real_http = warmup.http_adapter
+    monkeypatch.setattr(warmup, 'http_adapter', lambda: (release.wait(5), real_http()))
+
+    res = fresh_worker.get('/readyz')
+    assert res.status_code == 503
+    assert res.get_json()['state'] in ('cold', 'warming')
+
+    release.set()
+    res = _wait_for(fresh_worker, 200)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body['state'] == 'ready'
+    assert {'templates', 'http'} <= set(body['steps'])
+
+
+def test_failed_required_step_stays_503(fresh_worker, monkeypatch):
+    def broken():
+        raise RuntimeError('no pool')
+
+    monkeypatch.setattr(warmup, 'http_adapter', broken)
+    res = _wait_for(fresh_worker, 200, timeout=0.5)
+    assert res.status_code == 503
+    body = _wait_for(fresh_worker, 200, timeout=0.5).get_json()
+    assert body['state'] == 'failed' and body['errors']['http'] == 'no pool'
+
+
+def test_disabled_warmup_is_ready_at_once(fresh_worker, monkeypatch):
+    monkeypatch.setenv('UCP_WARMUP', '0')
+    res = fresh_worker.get('/readyz')
+    assert res.status_code == 200 and res.get_json()['state'] == 'disabled'
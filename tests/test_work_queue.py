@@ -0,0 +1,78 @@
+import pytest
+
+from work_queue import DEAD, DONE, LEASED, PENDING, SQLiteWorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteWorkQueue(str(tmp_path / 'queue.db'), max_attempts=2)
+
+
+def test_enqueue_ignores_duplicates(queue):
+    assert queue.enqueue(['a.com', 'b.com']) == 2
+    assert queue.enqueue(['b.com', 'c.com']) == 1
+    assert queue.stats()[PENDING] == 3
+
+
+def test_a_job_is_leased_once(queue):
+    queue.enqueue(['a.com'])
+    [lease] = queue.lease('w1')
+    assert lease.domain == 'a.com' and lease.attempts == 1
+    assert queue.lease('w2') == []
+    assert queue.stats()[LEASED] == 1
+
+
+def test_complete_stores_the_result(queue):
+    queue.enqueue(['a.com'])
+    [lease] = queue.lease('w1')
+    assert queue.heartbeat(lease)
+    assert queue.complete(lease, {'weightedAverage': 80, 'status': 'COMPLIANT'})
+    assert queue.stats()[DONE] == 1
+    assert list(queue.results()) == [{'weightedAverage': 80, 'status': 'COMPLIANT'}]
+
+
+def test_expired_lease_is_fenced_out(queue):
+    queue.enqueue(['a.com'])
+    [stale] = queue.lease('w1', visibility_timeout=0)
+    [current] = queue.lease('w2')
+    assert current.attempts == 2
+    # The first worker came back after its lease expired
+    assert not queue.heartbeat(stale)
+    assert not queue.complete(stale, {'weightedAverage': 0})
+    assert not queue.fail(stale, 'late')
+    assert queue.complete(current, {'weightedAverage': 50})
+    assert [r['weightedAverage'] for r in queue.results()] == [50]
+
+
+def test_failures_retry_then_dead_letter(queue):
+    queue.enqueue(['a.com'])
+    [lease] = queue.lease('w1')
+    assert queue.fail(lease, 'boom', retry_delay=0)
+    assert queue.stats()[PENDING] == 1
+    [lease] = queue.lease('w1')
+    assert queue.fail(lease, 'boom again', retry_delay=0)
+    assert queue.stats()[DEAD] == 1
+    assert queue.lease('w1') == []
+
+
+def test_retry_waits_for_its_delay(queue):
+    queue.enqueue(['a.com'])
+    [lease] = queue.lease('w1')
+    queue.fail(lease, 'boom', retry_delay=3600)
+    assert queue.lease('w1') == []
+
+
+def test_crashed_workers_use_up_attempts(queue):
+    queue.enqueue(['a.com'])
+    queue.lease('w1', visibility_timeout=0)
+    queue.lease('w2', visibility_timeout=0)
+    assert queue.lease('w3') == []
+    assert queue.stats()[DEAD] == 1
+
+
+def test_release_does_not_use_an_attempt(queue):
+    queue.enqueue(['a.com'])
+    [lease] = queue.lease('w1')
+    assert queue.release(lease)
+    [again] = queue.lease('w2')
+    assert again.attempts == 1
@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+
+import metrics
+import worker
+from work_queue import DONE, PENDING, SQLiteWorkQueue
+
+
+class FlakyQueue(SQLiteWorkQueue):
+    """Raises 'database is locked' for the first call of each listed method."""
+
+    def __init__(self, path, failing):
+        super().__init__(path)
+        self.failing = set(failing)
+
+    def _maybe_fail(self, name):
+        if name in self.failing:
+            self.failing.discard(name)
+            raise sqlite3.OperationalError('database is locked')
+
+    def lease(self, *args, **kwargs):
+        self._maybe_fail('lease')
+        return super().lease(*args, **kwargs)
+
+    def complete(self, *args, **kwargs):
+        self._maybe_fail('complete')
+        return super().complete(*args, **kwargs)
+
+    def fail(self, *args, **kwargs):
+        self._maybe_fail('fail')
+        return super().fail(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fake_scan(monkeypatch):
+    metrics.reset()
+
+    def scan_domain(domain, cancel_token=None):
+        if 'bad' in domain:
+            raise ValueError('unreachable')
+        return {'weightedAverage': 90, 'status': 'COMPLIANT', 'url': domain}
+
+    monkeypatch.setattr(worker, 'scan_domain', scan_domain)
+
+
+def _run(queue, visibility_timeout=300):
+    w = worker.ScanWorker(queue, 'w1', concurrency=1, visibility_timeout=visibility_timeout, poll_interval=0.01, retry_delay=0)
+    w.run(drain=True)
+    return w
+
+
+def test_drains_the_queue(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / 'q.db'))
+    queue.enqueue(['https://a.com', 'https://b.com'])
+    _run(queue)
+    assert queue.stats()[DONE] == 2
+    assert metrics.snapshot()['counters']['worker.completed'] == 2
+
+
+def test_lease_error_is_survived(tmp_path):
+    queue = FlakyQueue(str(tmp_path / 'q.db'), ['lease'])
+    queue.enqueue(['https://a.com'])
+    _run(queue)
+    assert queue.stats()[DONE] == 1
+    assert metrics.snapshot()['counters']['worker.queue_errors'] == 1
+
+
+def test_complete_error_leaves_the_job_to_be_retried(tmp_path):
+    queue = FlakyQueue(str(tmp_path / 'q.db'), ['complete'])
+    queue.enqueue(['https://a.com'])
+    # A short visibility timeout lets the lost completion be re-leased
+    _run(queue, visibility_timeout=0.05)
+    assert queue.stats()[DONE] == 1
+    assert metrics.snapshot()['counters']['worker.queue_errors'] == 1
+
+
+def test_fail_error_is_survived(tmp_path):
+    queue = FlakyQueue(str(tmp_path / 'q.db'), ['fail'])
+    queue.enqueue(['https://bad.com', 'https://a.com'])
+    _run(queue, visibility_timeout=0.05)
+    stats = queue.stats()
+    assert stats[DONE] == 1 and stats[PENDING] == 0
+    assert metrics.snapshot()['counters']['worker.queue_errors'] == 1
+
+
+def test_lease_taken_after_stop_is_released(tmp_path):
+    class StoppingQueue(SQLiteWorkQueue):
+        def lease(self, *args, **kwargs):
+            leases = super().lease(*args, **kwargs)
+            w.stop()
+            return leases
+
+    queue = StoppingQueue(str(tmp_path / 'q.db'))
+    queue.enqueue(['https://a.com'])
+    w = worker.ScanWorker(queue, 'w1', concurrency=1, poll_interval=0.01)
+    w.run()
+    assert queue.stats()[PENDING] == 1
+    [lease] = queue.lease('w2')
+    assert lease.attempts == 1
@@ -13,12 +13,16 @@ def normalize_url(raw_url):
     try:
         parsed = urlparse(url_with_scheme)
         host = parsed.hostname
-        parts = host.split('.')
-        tld = parts[-1] if parts else 'com'
-        is_us_guess = tld == 'us'
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-        
-        return raw, base_url, host, tld, is_us_guess
-    except Exception:
-        # Fallback similar to n8n logic, though mostly urlparse will handle or raise
-        return raw, 'https://example.com', 'example.com', 'com', False
+        _ = parsed.port  # validates the port: ValueError if non-numeric or out of range
+    except ValueError:
+        host = None
+    if not host:
+        # Let callers reject the input instead of silently scanning a placeholder site
+        return raw, None, None, None, None
+
+    parts = host.split('.')
+    tld = parts[-1]
+    is_us_guess = tld == 'us'
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+
+    return raw, base_url, host, tld, is_us_guess
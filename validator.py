@@ -0,0 +1,143 @@
+import json
+import re
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        return orjson.loads(text)
+except ImportError:
+    _loads = json.loads
+
+# Field rules for /.well-known/ucp. Mirrors the sample config we recommend in the report.
+UCP_SCHEMA = {
+    "version": {"type": str, "required": True},
+    "publisher": {"type": str, "required": True},
+    "contact": {"type": str, "required": False},
+    "ai_training": {"type": str, "required": False, "enum": ("opt-in", "opt-out")},
+}
+
+# Characters the depth scan has to look at; everything else is skipped in bulk.
+_DEPTH_CHARS = re.compile(r'[\[\]{}"\\]')
+
+CompiledField = Tuple[str, bool, type, Optional[frozenset]]
+
+
+def compile_schema(schema: Dict[str, Dict[str, Any]]) -> Tuple[CompiledField, ...]:
+    """Flatten a schema dict into tuples so validation does no dict lookups per field."""
+    compiled = []
+    for name, rule in schema.items():
+        enum = rule.get('enum')
+        compiled.append((name, bool(rule.get('required')), rule['type'], frozenset(enum) if enum else None))
+    return tuple(compiled)
+
+
+_COMPILED_SCHEMA = compile_schema(UCP_SCHEMA)
+
+
+def _finding(field: str, severity: str, message: str) -> Dict[str, str]:
+    return {'field': field, 'severity': severity, 'message': message}
+
+
+def _exceeds_depth(body: str, max_depth: int) -> bool:
+    # Cheap bound first: a body with few brackets cannot be nested deeper than the limit.
+    if body.count('{') + body.count('[') <= max_depth:
+        return False
+    # One linear pass tracking string and escape state, so brackets inside
+    # strings are skipped and hostile quoting cannot make it backtrack.
+    depth = 0
+    in_string = escaped = False
+    for match in _DEPTH_CHARS.finditer(body):
+        ch = match.group()
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                # Only escapes the very next character, which may not be one we look at
+                escaped = body[match.end():match.end() + 1] in ('"', '\\')
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            depth += 1
+            if depth > max_depth:
+                return True
+        elif ch in '}]':
+            depth -= 1
+    return False
+
+
+def validate_ucp_config(
+    body: str,
+    max_bytes: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    truncated: bool = False
+) -> Dict[str, Any]:
+    """
+    Validate a /.well-known/ucp body against size/depth limits and the UCP schema.
+    `valid` means the body is a JSON object within limits; `schemaValid` additionally
+    requires no error-level findings. `truncated` marks a body whose download was
+    stopped for being too large.
+    """
+    limits = SCANNER_CONFIG['ucpValidation']
+    max_bytes = limits['maxBytes'] if max_bytes is None else max_bytes
+    max_depth = limits['maxDepth'] if max_depth is None else max_depth
+    body = body or ''
+    findings: List[Dict[str, str]] = []
+
+    if truncated:
+        findings.append(_finding('$', 'error', f"Body exceeds the {max_bytes}-byte limit; download stopped"))
+        return {'valid': False, 'schemaValid': False, 'findings': findings, 'parsed': None}
+
+    # len() in characters is a lower bound on the UTF-8 size, so only encode when it matters
+    size = len(body)
+    if size * 4 > max_bytes:
+        size = len(body.encode('utf-8'))
+    if size > max_bytes:
+        findings.append(_finding('$', 'error', f"Body is {size} bytes, limit is {max_bytes}"))
+        return {'valid': False, 'schemaValid': False, 'findings': findings, 'parsed': None}
+
+    if _exceeds_depth(body, max_depth):
+        findings.append(_finding('$', 'error', f"JSON nesting exceeds depth limit of {max_depth}"))
+        return {'valid': False, 'schemaValid': False, 'findings': findings, 'parsed': None}
+
+    try:
+        parsed = _loads(body)
+    except (ValueError, RecursionError) as e:
+        logger.debug("JSON parsing failed for UCP config: %s", e)
+        findings.append(_finding('$', 'error', 'Body is not valid JSON'))
+        return {'valid': False, 'schemaValid': False, 'findings': findings, 'parsed': None}
+
+    if not isinstance(parsed, dict):
+        findings.append(_finding('$', 'error', f"Top-level value must be an object, got {type(parsed).__name__}"))
+        return {'valid': False, 'schemaValid': False, 'findings': findings, 'parsed': None}
+
+    for name, required, expected_type, enum in _COMPILED_SCHEMA:
+        if name not in parsed:
+            if required:
+                findings.append(_finding(name, 'error', 'Required field is missing'))
+            continue
+        value = parsed[name]
+        if not isinstance(value, expected_type):
+            findings.append(_finding(name, 'error', f"Expected {expected_type.__name__}, got {type(value).__name__}"))
+        elif enum is not None and value not in enum:
+            findings.append(_finding(name, 'warning', f"Unexpected value {value!r}; expected one of {', '.join(sorted(enum))}"))
+
+    schema_valid = not any(f['severity'] == 'error' for f in findings)
+    return {'valid': True, 'schemaValid': schema_valid, 'findings': findings, 'parsed': parsed}
+
+
+def validate_many(bodies: Iterable[str]) -> List[Dict[str, Any]]:
+    """Validate a batch of UCP bodies, resolving the configured limits once."""
+    limits = SCANNER_CONFIG['ucpValidation']
+    max_bytes = limits['maxBytes']
+    max_depth = limits['maxDepth']
+    return [validate_ucp_config(body, max_bytes, max_depth) for body in bodies]
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Tuple
+try:
+    from .config import SCANNER_CONFIG
+    from .logger import logger
+    from .checker import http_adapter
+    from .browser import renderer
+    from .scorer import calculate_score
+    from .reporter import generate_report, report_view
+    from .report_shell import report_shell
+    from . import metrics
+except ImportError:
+    from config import SCANNER_CONFIG
+    from logger import logger
+    from checker import http_adapter
+    from browser import renderer
+    from scorer import calculate_score
+    from reporter import generate_report, report_view
+    from report_shell import report_shell
+    import metrics
+
+# Cold-start work taken off the first scans. warm_process() runs once in the
+# gunicorn master before workers fork (lazy imports, templates, caches), so
+# every worker inherits the result. warm_worker() runs in each worker after
+# fork, for what cannot cross a fork: the HTTP connection pool and the thread
+# that owns Chromium. /readyz reports ready once a worker is warm.
+
+# Canned probe responses for one scored result, so warming touches no network
+_SAMPLE_HOST = 'warmup.invalid'
+_SAMPLE_RESPONSES = {
+    'robots': {'statusCode': 200, 'body': "User-agent: *\nUCP-Config: /.well-known/ucp", 'headers': {}, 'error': None},
+    'ucp': {'statusCode': 200, 'body': '{"version": "1.0"}', 'headers': {}, 'error': None},
+    'home': {'statusCode': 200, 'body': '', 'headers': {'UCP-Config': '/.well-known/ucp'}, 'error': None},
+}
+
+_lock = threading.Lock()
+_process_warm = False
+_process_ok = False
+_started = False
+_ready = threading.Event()
+_status: Dict[str, Any] = {'state': 'cold', 'steps': {}, 'errors': {}}
+
+
+def enabled() -> bool:
+    env = os.environ.get('UCP_WARMUP')
+    if env is not None:
+        return env not in ('0', 'false', 'off')
+    return SCANNER_CONFIG['warmup']['enabled']
+
+
+def _pdf_backends() -> Tuple[str, ...]:
+    cfg = SCANNER_CONFIG['pdf']
+    return tuple(b for b in (cfg['backend'], cfg.get('fallback')) if b)
+
+
+def _browser_wanted() -> bool:
+    mode = SCANNER_CONFIG['warmup']['browser']
+    if mode == 'auto':
+        # Chromium costs memory per worker; keep it warm only when it renders every PDF
+        return SCANNER_CONFIG['pdf']['backend'] == 'playwright'
+    return mode == 'always'
+
+
+def _step(name: str, fn: Callable[[], Any], required: bool = True) -> bool:
+    started = time.monotonic()
+    try:
+        fn()
+    except Exception as e:
+        _status['errors'][name] = str(e)
+        if required:
+            logger.error("Warmup step %s failed: %s", name, e, exc_info=True)
+        else:
+            logger.warning("Optional warmup step %s failed: %s", name, e)
+        return not required
+    finally:
+        _status['steps'][name] = round(time.monotonic() - started, 4)
+    return True
+
+
+def _warm_templates(app: Any) -> None:
+    result = calculate_score(
+        f"https://{_SAMPLE_HOST}", _SAMPLE_HOST, False,
+        _SAMPLE_RESPONSES['robots'], _SAMPLE_RESPONSES['ucp'], _SAMPLE_RESPONSES['home']
+    )
+    generate_report(result)
+    report_view(result)
+    shell = report_shell()
+    if app is not None:
+        # Through the full Flask stack: URL map, Jinja environment, cached pages
+        with app.test_client() as client:
+            client.get('/')
+            client.get(f"/report/{shell.version}/")
+    if 'native' in _pdf_backends():
+        try:
+            from .pdf_native import build_pdf
+        except ImportError:
+            from pdf_native import build_pdf
+        build_pdf(result)
+
+
+def _warm_imports() -> None:
+    # Modules the render path otherwise imports on first use
+    if SCANNER_CONFIG['pdf'].get('optimize'):
+        try:
+            from . import pdf_optimize  # noqa: F401
+        except ImportError:
+            import pdf_optimize  # noqa: F401
+    if 'playwright' in _pdf_backends():
+        import playwright.async_api  # noqa: F401
+
+
+def warm_process(app: Any = None) -> bool:
+    """Fork-safe warmup: no threads, sockets or child processes. Runs once per process."""
+    global _process_warm, _process_ok
+    with _lock:
+        if _process_warm or not enabled():
+            return _process_ok
+        _process_warm = True
+    started = time.monotonic()
+    # Scoring and rendering a canned result is not traffic; workers would inherit its metrics
+    with metrics.suppressed():
+        _process_ok = _step('templates', lambda: _warm_templates(app))
+        _step('imports', _warm_imports, required=False)
+    logger.info("Process warmup finished in %.2fs", time.monotonic() - started)
+    return _process_ok
+
+
+def warm_worker(app: Any = None) -> bool:
+    """Warm this process (if the master did not) and its per-worker resources; returns readiness."""
+    started = time.monotonic()
+    _status['state'] = 'warming'
+    ok = warm_process(app)
+    ok = _step('http', http_adapter) and ok
+    if _browser_wanted():
+        timeout = SCANNER_CONFIG['warmup']['browserTimeoutSeconds']
+
+        def warm_browser():
+            renderer().start()
+            if not renderer().wait_ready(timeout):
+                raise TimeoutError(f"Chromium did not start within {timeout}s")
+
+        # Only a hard requirement when every PDF goes through the browser
+        ok = _step('browser', warm_browser, required=SCANNER_CONFIG['pdf']['backend'] == 'playwright') and ok
+
+    elapsed = time.monotonic() - started
+    metrics.observe('warmup.seconds', elapsed)
+    _status['state'] = 'ready' if ok else 'failed'
+    _status['seconds'] = round(elapsed, 4)
+    if ok:
+        _ready.set()
+        logger.info("Worker %s warm in %.2fs", os.getpid(), elapsed)
+    else:
+        logger.error("Worker %s failed to warm up: %s", os.getpid(), _status['errors'])
+    return ok
+
+
+def start_warmup(app: Any = None, background: bool = True) -> None:
+    """Warm this worker once; in a background thread by default so the server can answer /readyz."""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    if not enabled():
+        _status['state'] = 'disabled'
+        _ready.set()
+        return
+    if background:
+        threading.Thread(target=warm_worker, args=(app,), name='warmup', daemon=True).start()
+    else:
+        warm_worker(app)
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """Whether this worker is warm, and what each warmup step took (seconds) or why it failed."""
+    status = dict(_status, steps=dict(_status['steps']), errors=dict(_status['errors']))
+    status['pid'] = os.getpid()
+    return _ready.is_set(), status
+
+
+def _reset_after_fork() -> None:
+    # Per-worker state starts over in each child; process warmth is inherited
+    global _lock, _started, _ready, _status
+    _lock = threading.Lock()
+    _started = False
+    _ready = threading.Event()
+    _status = {'state': 'cold', 'steps': dict(_status['steps']), 'errors': dict(_status['errors'])}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, List, Iterable, Iterator
+try:
+    from .logger import logger
+except ImportError:
+    from logger import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+CREATE TABLE IF NOT EXISTS results (
+    domain TEXT PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    worker TEXT NOT NULL,
+    score INTEGER,
+    status TEXT,
+    result_json TEXT NOT NULL,
+    completed_at REAL NOT NULL
+);
+"""
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+
+
+class Lease:
+    """A worker's claim on one job. `token` fences out workers whose lease expired."""
+
+    __slots__ = ('job_id', 'domain', 'token', 'attempts', 'owner')
+
+    def __init__(self, job_id: int, domain: str, token: str, attempts: int, owner: str):
+        self.job_id = job_id
+        self.domain = domain
+        self.token = token
+        self.attempts = attempts
+        self.owner = owner
+
+    def __repr__(self) -> str:
+        return f"Lease({self.domain!r}, attempt={self.attempts}, owner={self.owner!r})"
+
+
+class SQLiteWorkQueue:
+    """
+    Lease-based work queue and result store backed by one SQLite file.
+    Any number of worker processes (or hosts sharing the file) can pull from it.
+    A leased job that is not completed or renewed within its visibility
+    timeout becomes available again. Completion is accepted only from the
+    current lease holder, so a job is scored at most once.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, wal: bool = True):
+        self.path = path
+        self.max_attempts = max_attempts
+        # WAL needs shared memory, so turn it off when the file lives on a network share
+        self.wal = wal
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            if self.wal:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so two workers cannot lease the same row
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def enqueue(self, domains: Iterable[str]) -> int:
+        """Add domains to the queue; domains already queued are ignored. Returns the number added."""
+        now = time.time()
+        added = 0
+        with self._transaction() as conn:
+            for domain in domains:
+                cur = conn.execute(
+                    'INSERT OR IGNORE INTO jobs (domain, enqueued_at, updated_at) VALUES (?, ?, ?)',
+                    (domain, now, now)
+                )
+                added += cur.rowcount
+        return added
+
+    def lease(self, owner: str, limit: int = 1, visibility_timeout: float = 300) -> List[Lease]:
+        """Claim up to `limit` ready jobs, including jobs whose previous lease expired."""
+        now = time.time()
+        leases = []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """SELECT id, domain, attempts FROM jobs
+                   WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?)
+                   ORDER BY id LIMIT ?""",
+                (PENDING, now, LEASED, now, limit)
+            ).fetchall()
+            for job_id, domain, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # The last holder died mid-scan too many times
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, lease_token = NULL, updated_at = ? WHERE id = ?',
+                        (DEAD, now, job_id)
+                    )
+                    logger.warning("Giving up on %s after %s attempts", domain, attempts)
+                    continue
+                token = uuid.uuid4().hex
+                conn.execute(
+                    """UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,
+                       lease_token = ?, lease_expires = ?, updated_at = ? WHERE id = ?""",
+                    (LEASED, owner, token, now + visibility_timeout, now, job_id)
+                )
+                leases.append(Lease(job_id, domain, token, attempts + 1, owner))
+        return leases
+
+    def heartbeat(self, lease: Lease, visibility_timeout: float = 300) -> bool:
+        """Extend a lease. Returns False if the lease was lost (expired and re-leased)."""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+                (now + visibility_timeout, now, lease.job_id, lease.token, LEASED)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        """Store the result and mark the job done, only if `lease` is still the current one."""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                'UPDATE jobs SET status = ?, lease_token = NULL, last_error = NULL, updated_at = ? WHERE id = ? AND lease_token = ? AND status = ?',
+                (DONE, now, lease.job_id, lease.token, LEASED)
+            )
+            if cur.rowcount != 1:
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO results (domain, job_id, worker, score, status, result_json, completed_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (lease.domain, lease.job_id, lease.owner, result.get('weightedAverage'), result.get('status'), json.dumps(result), now)
+            )
+            return True
+
+    def fail(self, lease: Lease, error: str, retry_delay: float = 30) -> bool:
+        """Record a failed attempt; the job is retried after `retry_delay` until max_attempts."""
+        now = time.time()
+        status = DEAD if lease.attempts >= self.max_attempts else PENDING
+        with self._transaction() as conn:
+            cur = conn.execute(
+                """UPDATE jobs SET status = ?, lease_token = NULL, available_at = ?, last_error = ?, updated_at = ?
+                   WHERE id = ? AND lease_token = ? AND status = ?""",
+                (status, now + retry_delay, error[:2000], now, lease.job_id, lease.token, LEASED)
+            )
+            return cur.rowcount == 1
+
+    def release(self, lease: Lease) -> bool:
+        """Hand a lease back untouched (e.g. on shutdown) without using up an attempt."""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                """UPDATE jobs SET status = ?, attempts = attempts - 1, lease_token = NULL, available_at = ?, updated_at = ?
+                   WHERE id = ? AND lease_token = ? AND status = ?""",
+                (PENDING, now, now, lease.job_id, lease.token, LEASED)
+            )
+            return cur.rowcount == 1
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._conn().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, DEAD: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def results(self) -> Iterable[Dict[str, Any]]:
+        """Yield stored results in completion order."""
+        cur = self._conn().execute('SELECT result_json FROM results ORDER BY completed_at')
+        for (result_json,) in cur:
+            yield json.loads(result_json)
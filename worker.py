@@ -0,0 +1,251 @@
+"""
+Batch scan worker. Several worker processes, on one machine or many, pull
+domains from a shared SQLiteWorkQueue and write scored results back to it.
+
+    python worker.py enqueue --db sweep.sqlite domains.txt
+    python worker.py run --db sweep.sqlite --concurrency 4
+    python worker.py stats --db sweep.sqlite
+    python worker.py export --db sweep.sqlite > results.jsonl
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional
+try:
+    from .checker import probe_site
+    from .scorer import score_probes
+    from .utils import normalize_url
+    from .logger import logger, scan_context
+    from .cancellation import CancelToken, ScanCancelled
+    from .work_queue import SQLiteWorkQueue, Lease
+    from .domain_list import stream_domains, DomainListReport
+    from . import metrics
+    from . import scheduler
+except ImportError:
+    from checker import probe_site
+    from scorer import score_probes
+    from utils import normalize_url
+    from logger import logger, scan_context
+    from cancellation import CancelToken, ScanCancelled
+    from work_queue import SQLiteWorkQueue, Lease
+    from domain_list import stream_domains, DomainListReport
+    import metrics
+    import scheduler
+
+
+def scan_domain(domain: str, cancel_token: Optional[CancelToken] = None) -> Dict[str, Any]:
+    """Probe and score one domain at bulk priority. No report files are written."""
+    raw_url, base_url, host, tld, is_us_guess = normalize_url(domain)
+    if not base_url:
+        raise ValueError(f"Invalid domain: {domain!r}")
+
+    with scheduler.stage_slot('probe', scheduler.BULK, cancel_token):
+        probes = probe_site(base_url, cancel_token)
+
+    result = score_probes(base_url, host, is_us_guess, probes)
+    # The config snapshot is identical for every row; keep stored results small
+    result.pop('report', None)
+    return result
+
+
+class ScanWorker:
+    """Runs `concurrency` scan threads against a queue, renewing leases while scans run."""
+
+    def __init__(
+        self,
+        queue: SQLiteWorkQueue,
+        worker_id: str,
+        concurrency: int = 4,
+        visibility_timeout: float = 300,
+        poll_interval: float = 2,
+        retry_delay: float = 60
+    ):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._active: Dict[str, Any] = {}
+        self._active_lock = threading.Lock()
+
+    def stop(self) -> None:
+        """
+        Stop leasing new work; in-flight scans finish and are recorded, and
+        jobs leased but not yet started are released without using an attempt.
+        """
+        if not self._stop.is_set():
+            logger.info("Worker %s stopping after in-flight scans", self.worker_id)
+        self._stop.set()
+
+    def _queue_error(self, action: str, error: sqlite3.Error) -> None:
+        # A locked or unreachable queue file must not kill the scan thread; the
+        # job's lease runs out and it is picked up again once the queue recovers
+        metrics.incr('worker.queue_errors')
+        logger.error("Queue %s failed on worker %s: %s", action, self.worker_id, error)
+
+    def _process(self, lease: Lease) -> bool:
+        """Scan one leased job and record the outcome. Returns False if the queue could not be updated."""
+        token = CancelToken(lease.domain)
+        with self._active_lock:
+            self._active[lease.token] = (lease, token)
+        started = time.monotonic()
+        action = 'complete'
+        try:
+            try:
+                with scan_context(f"job-{lease.job_id}"):
+                    result = scan_domain(lease.domain, token)
+            except ScanCancelled:
+                metrics.incr('worker.lost_leases')
+                logger.warning("Scan of %s abandoned: %s", lease.domain, token.reason)
+                return True
+            except Exception as e:
+                metrics.incr('worker.failed')
+                logger.warning("Scan of %s failed (attempt %s): %s", lease.domain, lease.attempts, e)
+                action = 'fail'
+                self.queue.fail(lease, str(e), self.retry_delay)
+                return True
+            if self.queue.complete(lease, result):
+                metrics.incr('worker.completed')
+                metrics.observe('worker.scan_seconds', time.monotonic() - started)
+            else:
+                # Our lease expired and someone else owns the job now; drop our result
+                metrics.incr('worker.lost_leases')
+                logger.warning("Lease on %s was lost; discarding result", lease.domain)
+            return True
+        except sqlite3.Error as e:
+            self._queue_error(f"{action} of {lease.domain}", e)
+            return False
+        finally:
+            with self._active_lock:
+                self._active.pop(lease.token, None)
+
+    def _scan_loop(self, drain: bool) -> None:
+        while not self._stop.is_set():
+            try:
+                leases = self.queue.lease(self.worker_id, 1, self.visibility_timeout)
+                if not leases and drain:
+                    stats = self.queue.stats()
+                    if stats['pending'] == 0 and stats['leased'] == 0:
+                        return
+            except sqlite3.Error as e:
+                self._queue_error('lease', e)
+                self._stop.wait(self.poll_interval)
+                continue
+            if not leases:
+                self._stop.wait(self.poll_interval)
+                continue
+            for lease in leases:
+                if self._stop.is_set():
+                    # Stopped after leasing but before the scan began: hand it straight back
+                    self._release(lease)
+                elif not self._process(lease):
+                    self._stop.wait(self.poll_interval)
+
+    def _release(self, lease: Lease) -> None:
+        try:
+            self.queue.release(lease)
+        except sqlite3.Error as e:
+            self._queue_error(f"release of {lease.domain}", e)
+
+    def _heartbeat_loop(self) -> None:
+        # Keeps running after stop() so in-flight scans hold their leases until they finish
+        interval = self.visibility_timeout / 3
+        while not self._finished.wait(interval):
+            with self._active_lock:
+                active = list(self._active.values())
+            for lease, token in active:
+                try:
+                    renewed = self.queue.heartbeat(lease, self.visibility_timeout)
+                except sqlite3.Error as e:
+                    # Try again next round; the lease only lapses after three misses
+                    self._queue_error(f"heartbeat of {lease.domain}", e)
+                    continue
+                if not renewed:
+                    token.cancel('lease lost')
+
+    def run(self, drain: bool = False) -> None:
+        """Process jobs until stop() is called, or until the queue is empty when `drain` is set."""
+        logger.info("Worker %s started with %s threads", self.worker_id, self.concurrency)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='lease-heartbeat', daemon=True)
+        heartbeat.start()
+        threads = [
+            threading.Thread(target=self._scan_loop, args=(drain,), name=f"scan-{i}")
+            for i in range(self.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self._finished.set()
+        logger.info("Worker %s finished: %s", self.worker_id, metrics.snapshot()['counters'])
+
+
+def _enqueue_file(queue: SQLiteWorkQueue, path: str, mode: str, batch_size: int = 10_000) -> Dict[str, Any]:
+    """Canonicalize, dedupe and enqueue a domain list without loading it into memory."""
+    report = DomainListReport()
+    added = 0
+    batch = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for entry in stream_domains(f, mode=mode, report=report):
+            batch.append(entry.base_url)
+            if len(batch) >= batch_size:
+                added += queue.enqueue(batch)
+                batch = []
+    if batch:
+        added += queue.enqueue(batch)
+    summary = report.as_dict()
+    summary['enqueued'] = added
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Distributed UCP scan worker')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_enqueue = sub.add_parser('enqueue', help='Add domains (one per line) to the queue')
+    p_enqueue.add_argument('file')
+    p_enqueue.add_argument('--dedupe', choices=('exact', 'bloom'), default='exact')
+
+    p_run = sub.add_parser('run', help='Pull and scan domains until stopped')
+    p_run.add_argument('--worker-id', default=f"{socket.gethostname()}:{os.getpid()}")
+    p_run.add_argument('--concurrency', type=int, default=4)
+    p_run.add_argument('--visibility-timeout', type=float, default=300)
+    p_run.add_argument('--drain', action='store_true', help='Exit once the queue is empty')
+
+    sub.add_parser('stats', help='Show job counts by status')
+    sub.add_parser('export', help='Write stored results as JSON lines to stdout')
+
+    for p in (p_enqueue, p_run) + tuple(sub.choices[name] for name in ('stats', 'export')):
+        p.add_argument('--db', required=True, help='Path to the shared SQLite queue file')
+        p.add_argument('--max-attempts', type=int, default=3)
+
+    args = parser.parse_args(argv)
+    queue = SQLiteWorkQueue(args.db, max_attempts=args.max_attempts)
+
+    if args.command == 'enqueue':
+        summary = _enqueue_file(queue, args.file, args.dedupe)
+        print(json.dumps(summary, indent=2))
+    elif args.command == 'run':
+        worker = ScanWorker(queue, args.worker_id, args.concurrency, args.visibility_timeout)
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+        worker.run(drain=args.drain)
+    elif args.command == 'stats':
+        print(json.dumps(queue.stats()))
+    elif args.command == 'export':
+        for result in queue.results():
+            sys.stdout.write(json.dumps(result) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())